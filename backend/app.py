@@ -1,50 +1,116 @@
 """The Freezer Door - Flask API server."""
 
 import os
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 
-from routes.api import api
-
-# Check if we're in production (static folder exists with built frontend)
-static_folder = os.path.join(os.path.dirname(__file__), 'static')
-has_static = os.path.exists(static_folder)
-
-if has_static:
-    app = Flask(__name__, static_folder='static', static_url_path='')
-else:
-    app = Flask(__name__)
-
-CORS(app)
-
-# Register blueprints
-app.register_blueprint(api, url_prefix='/api')
-
-
-@app.route('/')
-def index():
-    if has_static:
-        return send_from_directory(app.static_folder, 'index.html')
-    return {
-        "name": "The Freezer Door API",
-        "version": "1.0.0",
-        "endpoints": [
-            "GET /api/cocktails",
-            "GET /api/cocktails/<id>",
-            "GET /api/spirits",
-            "GET /api/spirits/<category>",
-            "POST /api/calculate",
-            "GET /api/presets"
-        ]
-    }
-
-
-@app.errorhandler(404)
-def not_found(e):
-    # For SPA routing - serve index.html for non-API routes
-    if has_static:
-        return send_from_directory(app.static_folder, 'index.html')
-    return {"error": "Not found"}, 404
+from routes.admin import init_admin
+from routes.admission import init_admission
+from routes.api import api, warm_catalog
+from routes.health import health
+from routes.metrics import init_metrics
+from routes.profiling import init_profiling
+from routes.static import asset_response, init_static, spa_response
+from routes.tenants import init_tenants
+from services.calculation_table import TABLE_FILE, precomputed_results
+from services.catalog import catalog_store, get_catalog, install_reload_signal
+from services.static_assets import INDEX_FILE, StaticAssets
+
+STATIC_FOLDER = os.path.join(os.path.dirname(__file__), 'static')
+
+
+def create_app(test_config=None):
+    """
+    Create and configure the Flask app.
+
+    The catalog is loaded (from the precompiled snapshot when there is a
+    current one) and its indexes and serialized responses are built here,
+    and the precomputed calculation table is memory-mapped, so with
+    gunicorn's preload_app they exist once in the master and are shared
+    copy-on-write by every forked worker.
+    """
+    config = test_config or {}
+    static_folder = config.get('STATIC_FOLDER', STATIC_FOLDER)
+
+    # Check if we're in production (static folder exists with built frontend);
+    # its files are read and compressed once, here
+    has_static = os.path.exists(os.path.join(static_folder, INDEX_FILE))
+    assets = StaticAssets(static_folder) if has_static else None
+
+    app = Flask(__name__, static_folder=None)
+    app.config.update(config)
+
+    CORS(app)
+
+    # Register blueprints
+    app.register_blueprint(api, url_prefix='/api')
+    app.register_blueprint(health)
+    init_metrics(app)
+    init_admission(app)
+    init_profiling(app)
+    init_tenants(app)
+    init_admin(app)
+    if assets:
+        init_static(app, assets)
+
+    @app.route('/')
+    def index():
+        if assets:
+            return asset_response(assets.index)
+        return {
+            "name": "The Freezer Door API",
+            "version": "1.0.0",
+            "endpoints": [
+                "GET /api/cocktails",
+                "GET /api/cocktails/<id>",
+                "GET /api/spirits",
+                "GET /api/spirits/search?q=&category=&limit=",
+                "GET /api/spirits/<category>",
+                "POST /api/calculate",
+                "POST /api/calculate/batch",
+                "POST /api/calculate/sweep",
+                "POST /api/calculate/compare",
+                "POST /api/calculate/max-volume",
+                "GET /api/calculate/cache",
+                "GET /api/presets",
+                "GET /api/tenants/cache",
+                "GET /api/t/<tenant>/... (or X-Tenant: <tenant>)",
+                "PUT|DELETE /api/admin/spirits/<category>/<brand>",
+                "PUT|DELETE /api/admin/cocktails/<id>/variations/<variation>",
+                "PUT|DELETE /api/admin/cocktails/<id>/presets/<preset>",
+                "GET /api/admin/journal",
+                "POST /api/admin/journal/compact",
+                "GET /api/admin/profiles",
+                "GET /api/admin/profiles/<file>",
+                "GET /metrics",
+                "GET /healthz",
+                "GET /readyz"
+            ]
+        }
+
+    @app.errorhandler(404)
+    def not_found(e):
+        # For SPA routing - serve index.html for non-API routes
+        if assets:
+            return spa_response(assets)
+        return {"error": "Not found"}, 404
+
+    with app.app_context():
+        warm_catalog(get_catalog())
+    # Mapped before the fork too, so workers share its pages
+    precomputed_results.load(
+        app.config.get('CALCULATION_TABLE', os.path.join(catalog_store.data_dir, TABLE_FILE))
+    )
+    # /readyz reports ready from here on
+    app.config['CATALOG_WARMED'] = True
+
+    return app
+
+
+app = create_app()
+
+# `kill -USR2 <pid>` reloads the catalog without waiting for the mtime check
+install_reload_signal()
 
 
 if __name__ == '__main__':
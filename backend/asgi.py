@@ -0,0 +1,308 @@
+"""
+The Freezer Door - ASGI entry point.
+
+Run on an async server, e.g.:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 8080 --workers 2
+
+The catalog and calculate endpoints are served by async handlers on the
+event loop, so a slow client costs a coroutine instead of a sync worker;
+catalog checks (which may reload the catalog) and calculations run in the
+default thread pool so they never block the loop.
+Every other route (and the SPA fallback) is delegated to the Flask app,
+which asgiref runs in a thread pool once the request body has arrived, as
+are requests for a tenant's catalog or asking to be profiled.
+"""
+
+import asyncio
+import json
+import time
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.http import parse_etags, quote_etag
+
+from app import app as flask_app
+from routes.admission import client_id
+from routes.api import (
+    ABV_PRESETS,
+    DEFAULT_CATALOG_MAX_AGE,
+    build_calculation,
+    cocktail_payload,
+    cocktails_payload,
+    search_spirits,
+    serialized_response,
+    spirits_payload,
+)
+from routes.profiling import PROFILE_HEADER
+from routes.tenants import TENANT_HEADER
+from services.catalog import get_catalog
+from services.metrics import registry as metrics
+from services.timing import report_timing, request_timer
+
+# Largest request body accepted by the async calculate handler
+MAX_BODY_BYTES = 64 * 1024
+
+# Requests with any of these headers are always served by the Flask app
+FLASK_HEADERS = (TENANT_HEADER.lower().encode(), PROFILE_HEADER.lower().encode())
+
+
+def _header(scope, name: bytes) -> str:
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def _cors_headers(scope) -> list:
+    # Same headers flask-cors adds with its default (allow all) settings
+    origin = _header(scope, b'origin')
+    if origin is None:
+        return [(b'access-control-allow-origin', b'*')]
+    return [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+
+
+async def _send(send, scope, status: int, body: bytes = b'', headers: list = ()):
+    headers = list(headers) + _cors_headers(scope)
+    if body or status != 304:
+        headers.append((b'content-length', str(len(body)).encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _json_body(payload) -> bytes:
+    # Serialized as Flask's jsonify() does
+    with flask_app.app_context():
+        return (flask_app.json.dumps(payload) + '\n').encode('utf-8')
+
+
+async def _send_json(send, scope, status: int, payload, headers: list = ()):
+    await _send(send, scope, status, _json_body(payload), [(b'content-type', b'application/json'), *headers])
+
+
+async def _read_body(receive) -> bytes:
+    """Read the request body, or return None if it exceeds MAX_BODY_BYTES."""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+async def _current_catalog():
+    # get_catalog() stats the data files and may reload them, so it runs in
+    # the thread pool rather than stalling the loop
+    return await asyncio.to_thread(get_catalog)
+
+
+async def catalog_response(scope, send, catalog, key, build):
+    """Async counterpart of routes.api.cached_json."""
+    with flask_app.app_context():
+        body, etag = serialized_response(catalog, key, lambda: build(catalog))
+
+    max_age = flask_app.config.get('CATALOG_MAX_AGE', DEFAULT_CATALOG_MAX_AGE)
+    headers = [
+        (b'etag', quote_etag(etag).encode()),
+        (b'cache-control', f'public, max-age={max_age}'.encode()),
+        (b'vary', TENANT_HEADER.encode()),
+    ]
+    if_none_match = _header(scope, b'if-none-match')
+    if if_none_match and parse_etags(if_none_match).contains(etag):
+        await _send(send, scope, 304, headers=headers)
+    else:
+        headers.append((b'content-type', b'application/json'))
+        await _send(send, scope, 200, body, headers)
+
+
+async def get_cocktails(scope, receive, send):
+    await catalog_response(scope, send, await _current_catalog(), ('cocktails',), cocktails_payload)
+
+
+async def get_cocktail(scope, receive, send, cocktail_id):
+    catalog = await _current_catalog()
+    if cocktail_id not in catalog.cocktails:
+        return await _send_json(send, scope, 404, {"error": "Cocktail not found"})
+    await catalog_response(
+        scope, send, catalog, ('cocktail', cocktail_id), lambda c: cocktail_payload(c, cocktail_id)
+    )
+
+
+async def get_spirits(scope, receive, send):
+    await catalog_response(scope, send, await _current_catalog(), ('spirits',), spirits_payload)
+
+
+async def get_spirits_by_category(scope, receive, send, category):
+    catalog = await _current_catalog()
+    if category not in catalog.spirits:
+        return await _send_json(send, scope, 404, {"error": "Category not found"})
+    await catalog_response(
+        scope, send, catalog, ('spirits', category), lambda c: c.spirits[category].to_list()
+    )
+
+
+async def get_spirits_search(scope, receive, send):
+    # First value wins for repeated parameters, as with Flask's request.args
+    params = {}
+    for key, value in parse_qsl(scope.get('query_string', b'').decode('latin-1')):
+        params.setdefault(key, value)
+    body, status = search_spirits(await _current_catalog(), params)
+    await _send_json(send, scope, status, body)
+
+
+async def get_presets(scope, receive, send):
+    await catalog_response(scope, send, await _current_catalog(), ('presets',), lambda c: ABV_PRESETS)
+
+
+def _calculate(data, timer):
+    # Off the event loop: a catalog check may reload it, and a cache miss
+    # runs the calculator
+    catalog = get_catalog()
+    timer.lap('catalog')
+    return build_calculation(data, catalog, timer)
+
+
+async def calculate(scope, receive, send):
+    content_type = _header(scope, b'content-type') or ''
+    if content_type.split(';')[0].strip().lower() != 'application/json':
+        return await _send_json(send, scope, 415, {"error": "Content-Type must be application/json"})
+
+    body = await _read_body(receive)
+    if body is None:
+        return await _send_json(send, scope, 413, {"error": "Request body too large"})
+    timer = request_timer(flask_app.config)
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return await _send_json(send, scope, 400, {"error": "Invalid JSON"})
+    timer.lap('parse')
+
+    result, status = await asyncio.to_thread(_calculate, data, timer)
+    body = _json_body(result)
+    timer.lap('serialize')
+    headers = [(b'content-type', b'application/json')]
+    server_timing = report_timing(timer, flask_app.config, 'POST', '/api/calculate', status)
+    if server_timing:
+        headers.append((b'server-timing', server_timing.encode()))
+    await _send(send, scope, status, body, headers)
+
+
+# (method, path) -> handler for exact paths
+EXACT_ROUTES = {
+    ('GET', '/api/cocktails'): get_cocktails,
+    ('GET', '/api/spirits'): get_spirits,
+    ('GET', '/api/spirits/search'): get_spirits_search,
+    ('GET', '/api/presets'): get_presets,
+    ('POST', '/api/calculate'): calculate,
+}
+
+# (method, prefix) -> (handler taking one more path segment, URL rule)
+PREFIX_ROUTES = {
+    ('GET', '/api/cocktails/'): (get_cocktail, '/api/cocktails/<cocktail_id>'),
+    ('GET', '/api/spirits/'): (get_spirits_by_category, '/api/spirits/<category>'),
+}
+
+
+class FreezerDoorASGI:
+    """Route the hot API endpoints to async handlers, the rest to Flask."""
+
+    def __init__(self, wsgi_app):
+        self.flask = WsgiToAsgi(wsgi_app)
+
+    def resolve(self, scope):
+        """
+        Return (handler, args, rule) for an async route, or (None, None, None).
+
+        ASGI servers pass the path already percent-decoded.
+        """
+        method, path = scope['method'], scope['path']
+        if any(_header(scope, name) is not None for name in FLASK_HEADERS):
+            # Tenant catalogs and profiling are handled by the Flask app;
+            # /api/t/<tenant>/ paths never match a route here
+            return None, None, None
+        handler = EXACT_ROUTES.get((method, path))
+        if handler:
+            return handler, (), path
+        for (route_method, prefix), (handler, rule) in PREFIX_ROUTES.items():
+            if method == route_method and path.startswith(prefix):
+                segment = path[len(prefix):]
+                if segment and '/' not in segment:
+                    return handler, (segment,), rule
+        return None, None, None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] == 'http':
+            handler, args, rule = self.resolve(scope)
+            if handler:
+                return await self.instrumented(handler, args, rule, scope, receive, send)
+        await self.flask(scope, receive, send)
+
+    def admit(self, scope, rule):
+        """Apply the Flask app's admission limits (routes.admission) to a request."""
+        controller = flask_app.extensions.get('admission')
+        if controller is None:
+            return None, None
+        client_header = flask_app.config.get('ADMISSION_CLIENT_HEADER')
+        forwarded = _header(scope, client_header.lower().encode('latin-1')) if client_header else None
+        remote_addr = scope['client'][0] if scope.get('client') else None
+        return controller, controller.admit(rule, client_id(remote_addr, forwarded))
+
+    async def instrumented(self, handler, args, rule, scope, receive, send):
+        """
+        Run an async handler behind admission control, recording the same
+        metrics as routes.metrics.
+        """
+        status = []
+
+        async def send_and_record_status(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            controller, rejection = self.admit(scope, rule)
+            if rejection:
+                await _send_json(
+                    send_and_record_status, scope, rejection.status, {"error": rejection.error},
+                    [(b'retry-after', str(rejection.retry_after).encode())],
+                )
+                return
+            try:
+                await handler(scope, receive, send_and_record_status, *args)
+            finally:
+                if controller is not None:
+                    controller.release(rule)
+        finally:
+            method = scope['method']
+            metrics.inc(
+                'freezer_http_requests_total',
+                (('method', method), ('route', rule), ('status', str(status[0] if status else 500))),
+            )
+            metrics.observe(
+                'freezer_http_request_duration_seconds', time.perf_counter() - start,
+                (('method', method), ('route', rule)),
+            )
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Load the catalog before the first request arrives
+                get_catalog()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+app = FreezerDoorASGI(flask_app)
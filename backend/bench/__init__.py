@@ -0,0 +1 @@
+"""Benchmarks for The Freezer Door backend."""
@@ -0,0 +1,159 @@
+"""
+Compare the sync gunicorn deployment with the ASGI entry point under load.
+
+Starts `gunicorn app:app` (sync workers, as in the Dockerfile) and
+`uvicorn asgi:app` on local ports, then runs the same workload against
+each: a number of slow clients that trickle their request bodies in, as
+phones on bad networks do, alongside fast clients measuring latency.
+
+    cd backend
+    python -m bench.asgi_concurrency --workers 2 --slow-clients 8 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from bench.common import BACKEND_DIR, free_port, percentile, wait_until_up
+
+CALCULATE_BODY = json.dumps({
+    "cocktail": "martini",
+    "variation": "classic",
+    "spirits": {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"},
+    "target_volume_ml": 750,
+    "target_abv": 24,
+}).encode()
+
+
+# Server name -> command line for (port, workers)
+SERVERS = {
+    "gunicorn (sync)": lambda port, workers: [
+        sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}',
+        '--workers', str(workers), '--log-level', 'warning', 'app:app',
+    ],
+    "uvicorn (asgi)": lambda port, workers: [
+        sys.executable, '-m', 'uvicorn', '--host', '127.0.0.1', '--port', str(port),
+        '--workers', str(workers), '--log-level', 'warning', 'asgi:app',
+    ],
+}
+
+
+async def http_request(port, method, path, body=b'', trickle=0.0):
+    """Send one HTTP/1.1 request and return the status code."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        ).encode()
+        writer.write(head)
+        if trickle and body:
+            # Dribble the body out a byte at a time over `trickle` seconds
+            delay = trickle / len(body)
+            for i in range(len(body)):
+                writer.write(body[i:i + 1])
+                await writer.drain()
+                await asyncio.sleep(delay)
+        else:
+            writer.write(body)
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def run_workload(port, duration, slow_clients, fast_clients, trickle):
+    deadline = time.monotonic() + duration
+    latencies = []
+    errors = 0
+    slow_done = 0
+
+    async def slow_client():
+        nonlocal slow_done
+        while time.monotonic() < deadline:
+            try:
+                await http_request(port, 'POST', '/api/calculate', CALCULATE_BODY, trickle=trickle)
+                slow_done += 1
+            except OSError:
+                pass
+
+    async def fast_client(i):
+        nonlocal errors
+        requests = [('GET', '/api/cocktails', b''), ('POST', '/api/calculate', CALCULATE_BODY)]
+        n = 0
+        while time.monotonic() < deadline:
+            method, path, body = requests[(i + n) % len(requests)]
+            n += 1
+            start = time.perf_counter()
+            try:
+                status = await http_request(port, method, path, body)
+            except OSError:
+                status = 0
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors += 1
+
+    await asyncio.gather(
+        *(slow_client() for _ in range(slow_clients)),
+        *(fast_client(i) for i in range(fast_clients)),
+    )
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / duration, 1),
+        "errors": errors,
+        "slow_requests_completed": slow_done,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round((latencies[-1] if latencies else 0) * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2, help="worker processes per server")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds per server")
+    parser.add_argument('--slow-clients', type=int, default=8, help="clients trickling their bodies")
+    parser.add_argument('--fast-clients', type=int, default=16, help="clients measuring latency")
+    parser.add_argument('--trickle', type=float, default=2.0, help="seconds a slow client takes to send its body")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, command in SERVERS.items():
+        port = free_port()
+        process = subprocess.Popen(
+            command(port, args.workers), cwd=BACKEND_DIR,
+            # Compare raw capacity rather than the admission limits, unless
+            # ADMISSION_ENABLED is set explicitly
+            env=dict(os.environ, ADMISSION_ENABLED=os.environ.get('ADMISSION_ENABLED', '0')),
+        )
+        try:
+            wait_until_up(port)
+            results[name] = asyncio.run(run_workload(
+                port, args.duration, args.slow_clients, args.fast_clients, args.trickle
+            ))
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    columns = ["requests", "throughput_rps", "errors", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    print(f"{'server':<18}" + "".join(f"{c:>16}" for c in columns))
+    for name, row in results.items():
+        print(f"{name:<18}" + "".join(f"{row[c]:>16}" for c in columns))
+
+
+if __name__ == '__main__':
+    main()
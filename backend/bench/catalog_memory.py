@@ -0,0 +1,110 @@
+"""
+Memory and walk time of the catalog: JSON dicts vs the typed model.
+
+Builds a synthetic brand database from data/spirits.json (every category
+padded out to --brands bottles) and loads it --tenants times, as a server
+holding one catalog per tenant would, keeping either the json.load() dicts
+or the services.models objects. Memory is what tracemalloc sees retained
+after the load; walk time is one pass over every ABV.
+
+    cd backend
+    python -m bench.catalog_memory
+    python -m bench.catalog_memory --tenants 20 --brands 2000 --json
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from bench.common import BACKEND_DIR
+from services.models import cocktails_from_json, spirits_from_json
+
+
+def synthetic_data(data_dir: str, brands_per_category: int) -> tuple:
+    """recipes.json text and a spirits.json text padded to brands_per_category."""
+    with open(os.path.join(data_dir, 'recipes.json')) as f:
+        recipes_text = f.read()
+    with open(os.path.join(data_dir, 'spirits.json')) as f:
+        spirits = json.load(f)
+
+    for category, spirit_list in spirits.items():
+        real = list(spirit_list) or [{"brand": category.title(), "abv": 0}]
+        for i in range(len(spirit_list), brands_per_category):
+            template = real[i % len(real)]
+            spirit_list.append({"brand": f"{template['brand']} No. {i}", "abv": round(template['abv'] + i % 7 * 0.1, 1)})
+    return recipes_text, json.dumps(spirits)
+
+
+def load_dicts(recipes_text: str, spirits_text: str):
+    return json.loads(recipes_text), json.loads(spirits_text)
+
+
+def load_model(recipes_text: str, spirits_text: str):
+    return cocktails_from_json(json.loads(recipes_text)), spirits_from_json(json.loads(spirits_text))
+
+
+def walk_dicts(catalog) -> float:
+    return sum(spirit['abv'] for spirit_list in catalog[1].values() for spirit in spirit_list)
+
+
+def walk_model(catalog) -> float:
+    return sum(sum(category.abvs) for category in catalog[1].values())
+
+
+def measure(load, walk, recipes_text: str, spirits_text: str, tenants: int) -> dict:
+    """Retained bytes and timings for `tenants` catalogs loaded with `load`."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    catalogs = [load(recipes_text, spirits_text) for _ in range(tenants)]
+    load_seconds = time.perf_counter() - start
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for catalog in catalogs:
+        walk(catalog)
+    walk_seconds = time.perf_counter() - start
+
+    return {"bytes": retained, "load_seconds": load_seconds, "walk_seconds": walk_seconds}
+
+
+def compare(tenants: int, brands_per_category: int, data_dir: str) -> dict:
+    recipes_text, spirits_text = synthetic_data(data_dir, brands_per_category)
+    bottles = sum(len(v) for v in json.loads(spirits_text).values())
+    return {
+        "tenants": tenants,
+        "bottles_per_tenant": bottles,
+        "dicts": measure(load_dicts, walk_dicts, recipes_text, spirits_text, tenants),
+        "model": measure(load_model, walk_model, recipes_text, spirits_text, tenants),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tenants', type=int, default=10, help="catalogs held at once")
+    parser.add_argument('--brands', type=int, default=1000, help="bottles per spirit category")
+    parser.add_argument('--data-dir', default=os.path.join(BACKEND_DIR, 'data'))
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = compare(args.tenants, args.brands, args.data_dir)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{results['tenants']} tenants x {results['bottles_per_tenant']} bottles")
+    print(f"{'form':<8}{'retained MiB':>16}{'load s':>12}{'walk ms':>12}")
+    for form in ("dicts", "model"):
+        row = results[form]
+        print(f"{form:<8}{row['bytes'] / 2**20:>16.1f}{row['load_seconds']:>12.2f}{row['walk_seconds'] * 1000:>12.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
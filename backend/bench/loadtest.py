@@ -0,0 +1,266 @@
+"""
+Load-generation harness for the deployed API.
+
+Starts the app the way the Docker image does (gunicorn with
+gunicorn.conf.py), or targets an already running server with --url, and
+replays a weighted mix of
+
+    GET  /api/cocktails
+    GET  /api/spirits/<category>
+    POST /api/calculate
+
+built from the real data/*.json catalog, at a target concurrency and
+(optionally) request rate. Reports throughput, error rate and p50/p95/p99
+latency per route. Everything runs locally with the standard library.
+
+    cd backend
+    python -m bench.loadtest --concurrency 32 --rate 500 --duration 30
+    python -m bench.loadtest --mix cocktails=1,spirits=1,calculate=8 --workers 4
+    python -m bench.loadtest --url http://127.0.0.1:8080 --json
+
+With --rate, requests are scheduled open-loop at fixed intervals and
+latency is measured from each request's scheduled start, so time spent
+queueing behind a saturated server is counted rather than hidden.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from bench.common import BACKEND_DIR, free_port, percentile, wait_until_up
+from services.calculation_table import STANDARD_VOLUMES
+
+DEFAULT_MIX = {"cocktails": 2, "spirits": 3, "calculate": 5}
+
+
+def parse_mix(spec: str) -> dict:
+    """Parse "cocktails=2,spirits=3,calculate=5" into route weights."""
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"unknown route {name!r} (expected one of {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("the mix needs at least one positive weight")
+    return mix
+
+
+class RequestFactory:
+    """Builds random requests for each route from the catalog data."""
+
+    def __init__(self, recipes: dict, spirits: dict, seed: int = None):
+        self.recipes = recipes
+        self.spirits = spirits
+        self.random = random.Random(seed)
+        self.categories = list(spirits)
+        self.variations = [
+            (cocktail_id, variation_id)
+            for cocktail_id, cocktail in recipes.items()
+            for variation_id in cocktail['variations']
+        ]
+
+    def build(self, route: str) -> tuple:
+        """Return (method, path, body bytes or None) for a route name."""
+        if route == 'cocktails':
+            return 'GET', '/api/cocktails', None
+        if route == 'spirits':
+            return 'GET', f'/api/spirits/{self.random.choice(self.categories)}', None
+        return 'POST', '/api/calculate', json.dumps(self.calculation()).encode()
+
+    def calculation(self) -> dict:
+        """A calculate payload with random brands, a preset ABV and a standard volume."""
+        cocktail_id, variation_id = self.random.choice(self.variations)
+        cocktail = self.recipes[cocktail_id]
+        ingredients = cocktail['variations'][variation_id]['ingredients']
+        presets = list(cocktail.get('presets', {}).values()) or [{"abv": 24}]
+        return {
+            "cocktail": cocktail_id,
+            "variation": variation_id,
+            "spirits": {
+                name: self.random.choice(self.spirits[name])['brand']
+                for name in ingredients if self.spirits.get(name)
+            },
+            "target_volume_ml": self.random.choice(STANDARD_VOLUMES),
+            "target_abv": self.random.choice(presets)['abv'],
+        }
+
+
+class Recorder:
+    """Thread-safe latency and status collection per route."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, latency: float, ok: bool):
+        with self._lock:
+            self.latencies.setdefault(route, []).append(latency)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        rows = {}
+        everything = []
+        for route, latencies in sorted(self.latencies.items()):
+            everything.extend(latencies)
+            rows[route] = summarize(sorted(latencies), self.errors.get(route, 0), elapsed)
+        total_errors = sum(self.errors.values())
+        rows["all"] = summarize(sorted(everything), total_errors, elapsed)
+        return rows
+
+
+def summarize(sorted_latencies: list, errors: int, elapsed: float) -> dict:
+    count = len(sorted_latencies)
+    return {
+        "requests": count,
+        "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "p50_ms": round(percentile(sorted_latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(sorted_latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(sorted_latencies, 99) * 1000, 2),
+        "max_ms": round((sorted_latencies[-1] if sorted_latencies else 0) * 1000, 2),
+    }
+
+
+def run_load(url: str, factory: RequestFactory, mix: dict, concurrency: int,
+             duration: float, rate: float = 0, timeout: float = 10.0) -> dict:
+    """
+    Drive `concurrency` keep-alive clients against url for `duration` seconds.
+
+    With rate > 0 the clients share one open-loop schedule of `rate`
+    requests per second; otherwise each sends its next request as soon as
+    the previous one completes.
+    """
+    target = urlsplit(url)
+    routes = [route for route, weight in mix.items() if weight > 0]
+    weights = [mix[route] for route in routes]
+    recorder = Recorder()
+    schedule_lock = threading.Lock()
+    factory_lock = threading.Lock()
+    sent = [0]
+    start = time.perf_counter()
+    deadline = start + duration
+
+    def next_slot():
+        with schedule_lock:
+            slot = start + sent[0] / rate
+            sent[0] += 1
+        return slot
+
+    def client():
+        connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=timeout)
+        try:
+            while True:
+                scheduled = next_slot() if rate else time.perf_counter()
+                if scheduled >= deadline:
+                    return
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+                with factory_lock:
+                    route = factory.random.choices(routes, weights)[0]
+                    method, path, body = factory.build(route)
+                headers = {'Content-Type': 'application/json'} if body else {}
+                try:
+                    connection.request(method, path, body=body, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status < 400
+                except (OSError, http.client.HTTPException):
+                    ok = False
+                    connection.close()
+                recorder.record(route, time.perf_counter() - scheduled, ok)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return recorder.report(time.perf_counter() - start)
+
+
+def start_server(workers: int) -> tuple:
+    """Start gunicorn as the Docker image does; returns (process, url)."""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning', 'app:app'],
+        cwd=BACKEND_DIR,
+        # Measure raw capacity rather than the admission limits, unless
+        # ADMISSION_ENABLED is set explicitly
+        env=dict(os.environ, ADMISSION_ENABLED=os.environ.get('ADMISSION_ENABLED', '0')),
+    )
+    try:
+        wait_until_up(port)
+    except RuntimeError:
+        process.terminate()
+        raise
+    return process, f'http://127.0.0.1:{port}'
+
+
+def load_catalog_data(data_dir: str) -> tuple:
+    with open(os.path.join(data_dir, 'recipes.json')) as f:
+        recipes = json.load(f)
+    with open(os.path.join(data_dir, 'spirits.json')) as f:
+        spirits = json.load(f)
+    return recipes, spirits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help="target a running server instead of starting gunicorn")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn workers when starting the server")
+    parser.add_argument('--concurrency', type=int, default=16, help="concurrent clients")
+    parser.add_argument('--rate', type=float, default=0, help="target requests/second (0 = as fast as possible)")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds of measured load")
+    parser.add_argument('--warmup', type=float, default=1.0, help="seconds of unmeasured load first")
+    parser.add_argument('--mix', default='cocktails=2,spirits=3,calculate=5', help="route weights")
+    parser.add_argument('--data-dir', default=os.path.join(BACKEND_DIR, 'data'))
+    parser.add_argument('--seed', type=int, help="random seed for reproducible request sequences")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    factory = RequestFactory(*load_catalog_data(args.data_dir), seed=args.seed)
+
+    process = None
+    url = args.url
+    if not url:
+        process, url = start_server(args.workers)
+    try:
+        if args.warmup > 0:
+            run_load(url, factory, mix, args.concurrency, args.warmup, args.rate)
+        results = run_load(url, factory, mix, args.concurrency, args.duration, args.rate)
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    columns = ["requests", "throughput_rps", "error_rate", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    print(f"{'route':<12}" + "".join(f"{c:>16}" for c in columns))
+    for route, row in results.items():
+        print(f"{route:<12}" + "".join(f"{row[c]:>16}" for c in columns))
+    return 1 if results["all"]["requests"] == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+Benchmark suite for the calculator and the API hot paths.
+
+Micro benchmarks time the calculator functions directly; endpoint benchmarks
+time full requests through the Flask test client, including POST
+/api/calculate for every cocktail/variation in recipes.json (with the
+result cache and the precomputed calculation table disabled, plus one
+cached case).
+
+    cd backend
+    python -m bench.suite --output bench-results.json
+    python -m bench.suite --compare bench/baseline.json --threshold 0.25
+
+Each benchmark is run in `repeat` rounds of enough loops to take at least
+`min_time` seconds; the best round's per-call time is what gets compared,
+as it is the least affected by other load on the machine. --compare exits
+with status 1 if any benchmark is slower than the baseline by more than the
+threshold (0.25 = 25%).
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+from services.calculator import calculate_initial_abv, calculate_recipe, calculate_variation, ml_to_oz
+from services.models import Variation, spirits_from_json
+from services.search import SpiritSearch
+
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_TIME = 0.05
+DEFAULT_THRESHOLD = 0.25
+
+MARTINI = {"gin": 2.4, "vermouth_dry": 0.6}
+MARTINI_ABVS = {"gin": 47.3, "vermouth_dry": 17.5}
+MARTINI_VARIATION = Variation("classic", "Classic", MARTINI)
+
+# Brands per category in the synthetic search index
+SEARCH_BRANDS = 5000
+
+
+def time_function(func, repeat: int = DEFAULT_REPEAT, min_time: float = DEFAULT_MIN_TIME) -> dict:
+    """
+    Time func() like timeit.autorange: calibrate a loop count, then repeat.
+
+    Returns:
+        dict with best/median seconds per call, loops per round and rounds
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    rounds = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        rounds.append((time.perf_counter() - start) / loops)
+
+    return {
+        "best": min(rounds),
+        "median": statistics.median(rounds),
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def micro_benchmarks() -> dict:
+    """Calculator and search functions called directly."""
+    search = synthetic_search()
+    return {
+        "search.prefix": lambda: search.search("tan"),
+        "search.substring": lambda: search.search("ymou"),
+        "search.fuzzy": lambda: search.search("plymuoth"),
+        "calculator.calculate_initial_abv": lambda: calculate_initial_abv(MARTINI, MARTINI_ABVS),
+        "calculator.calculate_recipe": lambda: calculate_recipe(MARTINI, MARTINI_ABVS, 750, 24),
+        "calculator.calculate_recipe.no_dilution": lambda: calculate_recipe(MARTINI, MARTINI_ABVS, 750, 45),
+        "calculator.calculate_variation": lambda: calculate_variation(MARTINI_VARIATION, (47.3, 17.5), 750, 24),
+        "calculator.ml_to_oz": lambda: ml_to_oz(750),
+    }
+
+
+def synthetic_search() -> SpiritSearch:
+    """A search index over two categories of SEARCH_BRANDS made-up brand names."""
+    rng = random.Random(0)
+    syllables = ["tan", "que", "ray", "bo", "ta", "nist", "mon", "key", "gor", "don", "hen", "drick",
+                 "sip", "smith", "ply", "mouth", "bee", "fea", "ter", "roku", "ash", "ford", "mar", "lo"]
+
+    def word():
+        return "".join(rng.choice(syllables) for _ in range(rng.randint(1, 3))).title()
+
+    spirits = {
+        category: [
+            {"brand": " ".join(word() for _ in range(rng.randint(1, 3))), "abv": 40 + i % 10}
+            for i in range(SEARCH_BRANDS)
+        ]
+        for category in ("gin", "whiskey")
+    }
+    return SpiritSearch(spirits_from_json(spirits))
+
+
+def endpoint_benchmarks(client, catalog) -> dict:
+    """Full requests through the Flask test client."""
+    benchmarks = {
+        "GET /api/cocktails": lambda: client.get('/api/cocktails'),
+        "GET /api/spirits": lambda: client.get('/api/spirits'),
+        "GET /api/presets": lambda: client.get('/api/presets'),
+    }
+
+    first_cocktail = next(iter(catalog.cocktails))
+    benchmarks["GET /api/cocktails/<id>"] = lambda: client.get(f'/api/cocktails/{first_cocktail}')
+    first_category = next(iter(catalog.spirits))
+    benchmarks["GET /api/spirits/<category>"] = lambda: client.get(f'/api/spirits/{first_category}')
+    benchmarks["GET /api/spirits/search"] = lambda: client.get('/api/spirits/search?q=tan')
+
+    etag = client.get('/api/cocktails').headers['ETag']
+    benchmarks["GET /api/cocktails (304)"] = lambda: client.get(
+        '/api/cocktails', headers={'If-None-Match': etag}
+    )
+
+    for cocktail_id, cocktail in catalog.cocktails.items():
+        for variation_id in cocktail.variations:
+            payload = calculation_payload(catalog, cocktail_id, variation_id)
+            benchmarks[f"POST /api/calculate {cocktail_id}/{variation_id}"] = (
+                lambda payload=payload: client.post('/api/calculate', json=payload)
+            )
+
+    return benchmarks
+
+
+def calculation_payload(catalog, cocktail_id: str, variation_id: str) -> dict:
+    """A calculate request using the first brand of every ingredient."""
+    cocktail = catalog.cocktails[cocktail_id]
+    ingredients = cocktail.variations[variation_id].ingredients
+    presets = list(cocktail.presets.values())
+    return {
+        "cocktail": cocktail_id,
+        "variation": variation_id,
+        "spirits": {
+            name: catalog.spirits[name].brands[0]
+            for name in ingredients if name in catalog.spirits and len(catalog.spirits[name])
+        },
+        "target_volume_ml": 750,
+        "target_abv": presets[0].abv if presets else 24,
+    }
+
+
+def run_benchmarks(pattern: str = None, repeat: int = DEFAULT_REPEAT, min_time: float = DEFAULT_MIN_TIME) -> dict:
+    """Run every benchmark whose name contains `pattern` and return the report."""
+    from app import create_app
+    from services.calculation_table import precomputed_results
+    from services.catalog import get_catalog
+    from services.result_cache import calculation_cache
+
+    client = create_app({"TESTING": True, "ADMISSION_ENABLED": False}).test_client()
+    catalog = get_catalog()
+
+    benchmarks = dict(micro_benchmarks())
+    benchmarks.update(endpoint_benchmarks(client, catalog))
+
+    # The endpoint timings should measure the calculation, not a cache hit
+    # or a precomputed table lookup
+    cached_payload = calculation_payload(catalog, *_first_variation(catalog))
+    maxsize = calculation_cache.maxsize
+    calculation_cache.configure(maxsize=0)
+    table, precomputed_results.table = precomputed_results.table, None
+
+    results = {}
+    try:
+        for name, func in benchmarks.items():
+            if pattern and pattern not in name:
+                continue
+            results[name] = time_function(func, repeat, min_time)
+
+        name = "POST /api/calculate (cached)"
+        if not pattern or pattern in name:
+            calculation_cache.configure(maxsize=max(maxsize, 1))
+            client.post('/api/calculate', json=cached_payload)
+            results[name] = time_function(
+                lambda: client.post('/api/calculate', json=cached_payload), repeat, min_time
+            )
+    finally:
+        calculation_cache.configure(maxsize=maxsize)
+        precomputed_results.table = table
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            "catalog_version": catalog.version,
+        },
+        "results": results,
+    }
+
+
+def _first_variation(catalog):
+    cocktail_id = next(iter(catalog.cocktails))
+    return cocktail_id, next(iter(catalog.cocktails[cocktail_id].variations))
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Compare two reports benchmark by benchmark.
+
+    Returns:
+        list of (name, baseline_seconds, current_seconds, ratio, regressed)
+        for benchmarks present in both, using the best round of each
+    """
+    rows = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        ratio = result["best"] / previous["best"] if previous["best"] else float('inf')
+        rows.append((name, previous["best"], result["best"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 1e-6:
+        return f"{seconds * 1e9:.0f} ns"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.2f} us"
+    return f"{seconds * 1e3:.3f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', metavar='BASELINE', help="compare against a stored results file")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a benchmark counts as regressed (0.25 = 25%%)")
+    parser.add_argument('--filter', help="only run benchmarks whose name contains this")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME,
+                        help="minimum seconds per timing round")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.filter, args.repeat, args.min_time)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+
+    if not args.compare:
+        width = max(len(name) for name in report["results"])
+        for name, result in report["results"].items():
+            print(f"{name:<{width}}  {format_seconds(result['best']):>12}  (median {format_seconds(result['median'])})")
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows = compare(report, baseline, args.threshold)
+    width = max((len(row[0]) for row in rows), default=10)
+    for name, before, after, ratio, regressed in rows:
+        flag = "REGRESSED" if regressed else ""
+        print(f"{name:<{width}}  {format_seconds(before):>12} -> {format_seconds(after):>12}  {ratio:6.2f}x  {flag}")
+
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
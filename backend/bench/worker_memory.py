@@ -0,0 +1,123 @@
+"""
+Measure per-worker memory of the gunicorn deployment.
+
+Starts gunicorn with gunicorn.conf.py, with and without preload_app, warms
+every worker with catalog and calculate requests, then reads each worker's
+/proc/<pid>/smaps_rollup. PSS (proportional set size) splits shared pages
+between the processes sharing them, so total PSS is what the container
+actually pays; private memory is what each extra worker would add.
+
+Linux only:
+
+    cd backend
+    python -m bench.worker_memory --workers 4
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+from bench.common import BACKEND_DIR, free_port, is_up
+
+SMAPS_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def read_smaps_rollup(pid: int) -> dict:
+    """Memory totals for a process in KiB."""
+    usage = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in SMAPS_FIELDS:
+                usage[name] = int(rest.split()[0])
+    return usage
+
+
+def child_pids(pid: int) -> list:
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(p) for p in f.read().split()]
+
+
+def warm(port: int, requests: int):
+    """Spread catalog and calculate requests over the workers."""
+    body = json.dumps({
+        "cocktail": "martini", "variation": "classic",
+        "spirits": {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"},
+        "target_volume_ml": 750, "target_abv": 24,
+    }).encode()
+    for i in range(requests):
+        if i % 2:
+            request = urllib.request.Request(
+                f'http://127.0.0.1:{port}/api/calculate', data=body,
+                headers={'Content-Type': 'application/json'},
+            )
+        else:
+            request = urllib.request.Request(f'http://127.0.0.1:{port}/api/cocktails')
+        urllib.request.urlopen(request, timeout=5).read()
+
+
+def measure(preload: bool, workers: int, requests: int) -> dict:
+    port = free_port()
+    # Admission limits would reject the warm-up requests
+    env = dict(os.environ, GUNICORN_PRELOAD='1' if preload else '0',
+               ADMISSION_ENABLED=os.environ.get('ADMISSION_ENABLED', '0'))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning', 'app:app'],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while len(child_pids(process.pid)) < workers or not is_up(port):
+            if time.monotonic() > deadline:
+                raise RuntimeError("gunicorn did not start")
+            time.sleep(0.1)
+        warm(port, requests)
+        time.sleep(0.5)
+
+        per_worker = [read_smaps_rollup(pid) for pid in child_pids(process.pid)]
+        master = read_smaps_rollup(process.pid)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    def mean(field):
+        return round(sum(w[field] for w in per_worker) / len(per_worker))
+
+    return {
+        "preload": preload,
+        "workers": len(per_worker),
+        "worker_rss_kib": mean('Rss'),
+        "worker_pss_kib": mean('Pss'),
+        "worker_private_kib": mean('Private_Clean') + mean('Private_Dirty'),
+        "worker_shared_kib": mean('Shared_Clean') + mean('Shared_Dirty'),
+        "total_pss_kib": master['Pss'] + sum(w['Pss'] for w in per_worker),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200, help="warm-up requests across all workers")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure(preload, args.workers, args.requests) for preload in (False, True)]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    columns = ["workers", "worker_rss_kib", "worker_pss_kib", "worker_private_kib", "total_pss_kib"]
+    print(f"{'mode':<12}" + "".join(f"{c:>20}" for c in columns))
+    for row in results:
+        mode = "preload" if row["preload"] else "per-worker"
+        print(f"{mode:<12}" + "".join(f"{row[c]:>20}" for c in columns))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Gunicorn settings for The Freezer Door.
+
+gunicorn picks this file up automatically when started from the backend
+directory (`gunicorn app:app`). The app is preloaded in the master, so the
+parsed catalog, its brand index and the serialized catalog responses are
+built once and shared copy-on-write by all workers.
+"""
+
+import gc
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+# Threads per worker (gthread when > 1), so catalog reads keep being served
+# while a worker runs calculations; admission control caps how many of
+# those each worker runs at once
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+# GUNICORN_PRELOAD=0 loads the app in each worker instead (for comparison)
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+# Workers write their metrics here so /metrics can report all of them.
+# Set before the app is imported, which is when services.metrics reads it.
+os.environ.setdefault('METRICS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'freezer-door-metrics'))
+
+
+def on_starting(server):
+    # Start each server with empty metrics rather than a previous run's
+    metrics_dir = os.environ['METRICS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before any fork. Move
+    # everything allocated so far out of the collector's generations so the
+    # workers' GC passes don't write to (and so un-share) those pages.
+    gc.collect()
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    # Workers reset signal handlers after a preloaded fork; reinstall ours
+    from services.catalog import install_reload_signal
+
+    install_reload_signal()
@@ -0,0 +1,144 @@
+"""
+Catalog admin API: edit single spirits, variations and presets, and fetch
+request profiles (see services.profiling).
+
+Every route needs `Authorization: Bearer <ADMIN_TOKEN>`; without an
+ADMIN_TOKEN (environment or app config) the routes aren't registered at all.
+An edit is live in the worker that handles it as soon as it responds, and
+in the others after their next catalog check, once the change is in the
+journal (see services.catalog.CatalogStore).
+"""
+
+import hmac
+import os
+
+from flask import Blueprint, abort, current_app, jsonify, request, send_from_directory
+
+from services.catalog import catalog_store
+from services.catalog_changes import ChangeError
+from services.profiling import DUMP_NAME, list_dumps
+
+DEFAULT_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+admin = Blueprint('admin', __name__)
+
+
+@admin.before_request
+def authenticate():
+    token = current_app.config['ADMIN_TOKEN']
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(credentials.strip().encode(), token.encode()):
+        response = jsonify({"error": "Unauthorized"})
+        response.status_code = 401
+        response.headers['WWW-Authenticate'] = 'Bearer'
+        return response
+    return None
+
+
+def edit_response(change: dict):
+    """Apply a change to the catalog and report the new version."""
+    try:
+        catalog = catalog_store.edit(change)
+    except ChangeError as e:
+        return jsonify({"error": str(e)}), e.status
+    return jsonify({"catalog_version": catalog.version, "change": change})
+
+
+def request_fields(*fields) -> dict:
+    """The named fields of the JSON request body (None where missing)."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    return {field: data.get(field) for field in fields}
+
+
+@admin.route('/spirits/<category>/<brand>', methods=['PUT'])
+def put_spirit(category, brand):
+    """
+    Add a brand to a spirit category (creating the category if new), or
+    change its ABV. Request body: {"abv": 41.2}
+    """
+    return edit_response({"op": "put_spirit", "category": category, "brand": brand, **request_fields('abv')})
+
+
+@admin.route('/spirits/<category>/<brand>', methods=['DELETE'])
+def delete_spirit(category, brand):
+    """Remove a brand; a category's last brand can only go if no recipe uses it."""
+    return edit_response({"op": "delete_spirit", "category": category, "brand": brand})
+
+
+@admin.route('/cocktails/<cocktail_id>/variations/<variation_id>', methods=['PUT'])
+def put_variation(cocktail_id, variation_id):
+    """
+    Add or replace a variation of a cocktail.
+
+    Request body: {"name": "Dry (5:1)", "ingredients": {"gin": 2.5, "vermouth_dry": 0.5}}
+    """
+    return edit_response({
+        "op": "put_variation", "cocktail": cocktail_id, "variation": variation_id,
+        **request_fields('name', 'ingredients'),
+    })
+
+
+@admin.route('/cocktails/<cocktail_id>/variations/<variation_id>', methods=['DELETE'])
+def delete_variation(cocktail_id, variation_id):
+    """Remove a variation; a cocktail keeps at least one."""
+    return edit_response({"op": "delete_variation", "cocktail": cocktail_id, "variation": variation_id})
+
+
+@admin.route('/cocktails/<cocktail_id>/presets/<preset_id>', methods=['PUT'])
+def put_preset(cocktail_id, preset_id):
+    """Add or replace an ABV preset. Request body: {"name": "Strong", "abv": 32}"""
+    return edit_response({
+        "op": "put_preset", "cocktail": cocktail_id, "preset": preset_id, **request_fields('name', 'abv'),
+    })
+
+
+@admin.route('/cocktails/<cocktail_id>/presets/<preset_id>', methods=['DELETE'])
+def delete_preset(cocktail_id, preset_id):
+    """Remove an ABV preset."""
+    return edit_response({"op": "delete_preset", "cocktail": cocktail_id, "preset": preset_id})
+
+
+@admin.route('/journal', methods=['GET'])
+def get_journal():
+    """The current catalog version and how many edits await compaction."""
+    return jsonify(catalog_store.journal_status())
+
+
+@admin.route('/journal/compact', methods=['POST'])
+def compact_journal():
+    """Write the journal's edits into the data files now and empty it."""
+    catalog_store.compact()
+    return jsonify(catalog_store.journal_status())
+
+
+@admin.route('/profiles', methods=['GET'])
+def get_profiles():
+    """
+    Recent request profiles, newest first (query: limit, default 50).
+
+    Dumps are read from PROFILE_DIR, so every worker's are listed, and
+    downloaded from /profiles/<file name>.
+    """
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({
+        "enabled": 'profiler' in current_app.extensions,
+        "directory": current_app.config['PROFILE_DIR'],
+        "profiles": list_dumps(current_app.config['PROFILE_DIR'], max(limit, 0)),
+    })
+
+
+@admin.route('/profiles/<filename>', methods=['GET'])
+def get_profile(filename):
+    """Download a .pstats or .tracemalloc dump."""
+    if not DUMP_NAME.match(filename):
+        abort(404)
+    return send_from_directory(current_app.config['PROFILE_DIR'], filename, as_attachment=True)
+
+
+def init_admin(app, url_prefix: str = '/api/admin'):
+    """Register the admin routes if an ADMIN_TOKEN is configured."""
+    app.config.setdefault('ADMIN_TOKEN', DEFAULT_TOKEN)
+    if app.config['ADMIN_TOKEN']:
+        app.register_blueprint(admin, url_prefix=url_prefix)
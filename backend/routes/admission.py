@@ -0,0 +1,66 @@
+"""Admission control hooks for the api blueprint."""
+
+from flask import g, jsonify, request
+
+from services.admission import DEFAULT_ENABLED, AdmissionController, route_limits
+
+
+def client_id(remote_addr: str, forwarded: str = None) -> str:
+    """
+    The client a request is rate limited as.
+
+    `forwarded` is the value of ADMISSION_CLIENT_HEADER when one is set
+    (e.g. X-Forwarded-For from a trusted proxy); its first entry wins.
+    """
+    if forwarded:
+        return forwarded.split(',')[0].strip()
+    return remote_addr or ''
+
+
+def rejection_response(rejection):
+    response = jsonify({"error": rejection.error})
+    response.status_code = rejection.status
+    response.headers['Retry-After'] = str(rejection.retry_after)
+    return response
+
+
+def init_admission(app, blueprint: str = 'api'):
+    """
+    Apply services.admission limits to every route of `blueprint`.
+
+    Reads ADMISSION_ENABLED, ADMISSION_LIMITS and ADMISSION_CLIENT_HEADER
+    from the app config. The controller is kept in
+    app.extensions['admission'] so the ASGI handlers share its limits.
+    """
+    if not app.config.get('ADMISSION_ENABLED', DEFAULT_ENABLED):
+        return
+    controller = AdmissionController(route_limits(app.config.get('ADMISSION_LIMITS')))
+    app.extensions['admission'] = controller
+    client_header = app.config.get('ADMISSION_CLIENT_HEADER')
+
+    @app.before_request
+    def admit():
+        if request.blueprint != blueprint or request.url_rule is None or request.method == 'OPTIONS':
+            return None
+        rule = request.url_rule.rule
+        forwarded = request.headers.get(client_header) if client_header else None
+        rejection = controller.admit(rule, client_id(request.remote_addr, forwarded))
+        if rejection:
+            return rejection_response(rejection)
+        g.admission_rule = rule
+        return None
+
+    @app.after_request
+    def hold_while_streaming(response):
+        # The request context is torn down before a streamed body is
+        # iterated, so its slot is held until the server closes the body
+        if response.is_streamed and 'admission_rule' in g:
+            rule = g.pop('admission_rule')
+            response.call_on_close(lambda: controller.release(rule))
+        return response
+
+    @app.teardown_request
+    def release(exc):
+        rule = g.pop('admission_rule', None)
+        if rule is not None:
+            controller.release(rule)
@@ -1,90 +1,350 @@
 """API routes for The Freezer Door."""
 
+import hashlib
 import json
-import os
-from flask import Blueprint, jsonify, request
 
-from services.calculator import calculate_recipe, ml_to_oz
+from flask import Blueprint, current_app, jsonify, request
 
-api = Blueprint('api', __name__)
+from routes.tenants import TENANT_HEADER, request_catalog
+from services.calculation_table import precomputed_results
+from services.calculator import MAX_BATCH_ML, calculate_variation, max_variation_volume, ml_to_oz
+from services.catalog import catalog_store
+from services.comparison import MAX_COMPARISON_ROWS, brand_axes, compare_brands, comparison_rows
+from services.metrics import registry as metrics
+from services.models import DEFAULT_SERVING_SIZE_ML, is_number
+from services.result_cache import calculation_cache, calculation_key
+from services.sweep import MAX_SWEEP_ROWS, expand_range, sweep_rows
+from services.tenants import tenant_catalogs
+from services.timing import NO_TIMER, report_timing, request_timer
 
-# Load data files
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+api = Blueprint('api', __name__)
 
+# Cached results are keyed by catalog version, so a reload already makes
+# them unreachable; clearing frees the memory straight away.
+catalog_store.subscribe(lambda catalog: calculation_cache.clear())
 
-def load_spirits():
-    with open(os.path.join(DATA_DIR, 'spirits.json'), 'r') as f:
-        return json.load(f)
 
+# Cache-Control for the read-only catalog endpoints. Clients revalidate with
+# the ETag afterwards, which is answered with a body-less 304.
+DEFAULT_CATALOG_MAX_AGE = 60
 
-def load_recipes():
-    with open(os.path.join(DATA_DIR, 'recipes.json'), 'r') as f:
-        return json.load(f)
+ABV_PRESETS = {
+    "weak": {"name": "Weak", "abv": 22},
+    "normal": {"name": "Normal", "abv": 24},
+    "strong": {"name": "Strong", "abv": 26}
+}
 
 
-@api.route('/cocktails', methods=['GET'])
-def get_cocktails():
-    """Get all available cocktails with their variations."""
-    recipes = load_recipes()
-
+def cocktails_payload(catalog):
+    """Summary of every cocktail, as served by GET /cocktails."""
     cocktails = []
-    for cocktail_id, cocktail in recipes.items():
+    for cocktail in catalog.cocktails.values():
         variations = [
-            {"id": var_id, "name": var["name"]}
-            for var_id, var in cocktail["variations"].items()
+            {"id": variation.id, "name": variation.name}
+            for variation in cocktail.variations.values()
         ]
         cocktails.append({
-            "id": cocktail_id,
-            "name": cocktail["name"],
+            "id": cocktail.id,
+            "name": cocktail.name,
             "variations": variations,
-            "garnish": cocktail.get("garnish", ""),
-            "presets": cocktail.get("presets", {}),
-            "serving_size_ml": cocktail.get("serving_size_ml", 90)
+            "garnish": cocktail.garnish or "",
+            "presets": cocktail.presets_dict(),
+            "serving_size_ml": cocktail.serving_size_ml or DEFAULT_SERVING_SIZE_ML
         })
+    return cocktails
+
+
+def cocktail_payload(catalog, cocktail_id):
+    """Details of one known cocktail, as served by GET /cocktails/<id>."""
+    cocktail = catalog.cocktails[cocktail_id]
+    return {
+        "id": cocktail.id,
+        "name": cocktail.name,
+        "variations": {
+            variation.id: {
+                "name": variation.name,
+                "ingredients": list(variation.ingredients)
+            }
+            for variation in cocktail.variations.values()
+        },
+        "garnish": cocktail.garnish or "",
+        "presets": cocktail.presets_dict()
+    }
+
+
+def spirits_payload(catalog):
+    """Every spirit category's brands, as served by GET /spirits."""
+    return {name: category.to_list() for name, category in catalog.spirits.items()}
+
+
+def serialized_response(catalog, key, build):
+    """
+    JSON body and strong ETag for a catalog response, built once per snapshot.
+
+    The bytes are memoized on the catalog under `key`, so they are rebuilt
+    only when a new catalog version is loaded. The ETag is a hash of the
+    body, so every worker hands out the same tag for the same data.
+    """
+    entry = catalog.responses.get(key)
+    if entry is None:
+        body = jsonify(build()).get_data()
+        entry = (body, hashlib.sha1(body).hexdigest())
+        catalog.responses[key] = entry
+    return entry
+
+
+def cached_json(catalog, key, build):
+    """Serve a memoized catalog response, or a 304 if the client has it."""
+    body, etag = serialized_response(catalog, key, build)
+
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    max_age = current_app.config.get('CATALOG_MAX_AGE', DEFAULT_CATALOG_MAX_AGE)
+    response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    # The same URL serves each tenant's catalog
+    response.vary.add(TENANT_HEADER)
+    return response
+
+
+def warm_catalog(catalog):
+    """
+    Serialize every catalog response for a snapshot ahead of the first request.
 
-    return jsonify(cocktails)
+    Must be called inside an app context.
+    """
+    serialized_response(catalog, ('cocktails',), lambda: cocktails_payload(catalog))
+    serialized_response(catalog, ('spirits',), lambda: spirits_payload(catalog))
+    serialized_response(catalog, ('presets',), lambda: ABV_PRESETS)
+    for cocktail_id in catalog.cocktails:
+        serialized_response(
+            catalog, ('cocktail', cocktail_id), lambda: cocktail_payload(catalog, cocktail_id)
+        )
+    for category in catalog.spirits.values():
+        serialized_response(catalog, ('spirits', category.name), category.to_list)
+
+
+@api.route('/cocktails', methods=['GET'])
+def get_cocktails():
+    """Get all available cocktails with their variations."""
+    catalog = request_catalog()
+    return cached_json(catalog, ('cocktails',), lambda: cocktails_payload(catalog))
 
 
 @api.route('/cocktails/<cocktail_id>', methods=['GET'])
 def get_cocktail(cocktail_id):
     """Get details for a specific cocktail."""
-    recipes = load_recipes()
+    catalog = request_catalog()
 
-    if cocktail_id not in recipes:
+    if cocktail_id not in catalog.cocktails:
         return jsonify({"error": "Cocktail not found"}), 404
 
-    cocktail = recipes[cocktail_id]
-    return jsonify({
-        "id": cocktail_id,
-        "name": cocktail["name"],
-        "variations": {
-            var_id: {
-                "name": var["name"],
-                "ingredients": list(var["ingredients"].keys())
-            }
-            for var_id, var in cocktail["variations"].items()
-        },
-        "garnish": cocktail.get("garnish", ""),
-        "presets": cocktail.get("presets", {})
-    })
+    return cached_json(
+        catalog, ('cocktail', cocktail_id), lambda: cocktail_payload(catalog, cocktail_id)
+    )
 
 
 @api.route('/spirits', methods=['GET'])
 def get_spirits():
     """Get all spirits organized by category."""
-    spirits = load_spirits()
-    return jsonify(spirits)
+    catalog = request_catalog()
+    return cached_json(catalog, ('spirits',), lambda: spirits_payload(catalog))
+
+
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+
+
+def search_spirits(catalog, params):
+    """
+    Run a brand search from query parameters against a catalog snapshot.
+
+    Args:
+        params: mapping with q, and optionally category and limit
+
+    Returns:
+        (body, status) where body is the ranked list of matches on success
+        or an {"error": ...} dict with a 4xx status.
+    """
+    query = params.get('q')
+    if not query or not query.strip():
+        return {"error": "Missing required parameter: q"}, 400
+    category = params.get('category') or None
+    if category is not None and category not in catalog.spirits:
+        return {"error": "Category not found"}, 404
+    try:
+        limit = int(params.get('limit', DEFAULT_SEARCH_LIMIT))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_SEARCH_LIMIT:
+        return {"error": f"Parameter limit must be between 1 and {MAX_SEARCH_LIMIT}"}, 400
+    return catalog.search.search(query, category, limit), 200
+
+
+@api.route('/spirits/search', methods=['GET'])
+def get_spirits_search():
+    """
+    Search spirit brands for autocomplete.
+
+    Query parameters: q (required), category, limit (default 10, max 50).
+    Matching ignores case and accents; results are ranked exact match,
+    prefix, word prefix, substring, then close misspellings:
+    [{"brand": "Tanqueray", "category": "gin", "abv": 47.3}, ...]
+    """
+    body, status = search_spirits(request_catalog(), request.args)
+    return jsonify(body), status
 
 
 @api.route('/spirits/<category>', methods=['GET'])
 def get_spirits_by_category(category):
     """Get spirits for a specific category."""
-    spirits = load_spirits()
+    catalog = request_catalog()
 
-    if category not in spirits:
+    if category not in catalog.spirits:
         return jsonify({"error": "Category not found"}), 404
 
-    return jsonify(spirits[category])
+    return cached_json(catalog, ('spirits', category), catalog.spirits[category].to_list)
+
+
+REQUIRED_CALCULATE_FIELDS = ['cocktail', 'variation', 'spirits', 'target_volume_ml', 'target_abv']
+MAX_VOLUME_FIELDS = ['cocktail', 'variation', 'spirits', 'target_abv']
+COMPARE_FIELDS = ['cocktail', 'variation', 'target_volume_ml', 'target_abv']
+
+# Largest number of payloads accepted by /calculate/batch
+MAX_BATCH_SIZE = 1000
+
+# Upper bound of each numeric target; both must also be above 0
+TARGET_LIMITS = {'target_volume_ml': MAX_BATCH_ML, 'target_abv': 100}
+
+
+def validate_calculation(data, numeric_targets: bool = True, fields=REQUIRED_CALCULATE_FIELDS):
+    """
+    Return an error message for a malformed calculate payload, or None.
+
+    With numeric_targets=False the target fields only have to be present,
+    for endpoints that accept lists or ranges there. `fields` lists the
+    required fields, for endpoints that don't take a target volume.
+    """
+    if not isinstance(data, dict):
+        return "Request body must be a JSON object"
+    for field in fields:
+        if field not in data:
+            return f"Missing required field: {field}"
+    if not isinstance(data['cocktail'], str) or not isinstance(data['variation'], str):
+        return "Fields cocktail and variation must be strings"
+    if 'spirits' in data and not isinstance(data['spirits'], dict):
+        return "Field spirits must be an object"
+    for field, limit in TARGET_LIMITS.items():
+        if not numeric_targets or field not in fields:
+            continue
+        if not is_number(data[field]):
+            return f"Field {field} must be a number"
+        # Also rejects NaN and infinities
+        if not 0 < data[field] <= limit:
+            return f"Field {field} must be above 0 and at most {limit}"
+    return None
+
+
+def find_variation(catalog, cocktail_id, variation_id):
+    """
+    Look up a cocktail and one of its variations.
+
+    Returns:
+        (Cocktail, Variation, None), or (None, None, (error_body, 404))
+    """
+    cocktail = catalog.cocktails.get(cocktail_id)
+    if cocktail is None:
+        return None, None, ({"error": "Cocktail not found"}, 404)
+    variation = cocktail.variations.get(variation_id)
+    if variation is None:
+        return None, None, ({"error": "Variation not found"}, 404)
+    return cocktail, variation, None
+
+
+def add_oz_conversions(result):
+    """Add the oz equivalents of a calculator result's volumes."""
+    result['ingredients_oz'] = {
+        ingredient: ml_to_oz(ml)
+        for ingredient, ml in result['ingredients'].items()
+    }
+    result['water_oz'] = ml_to_oz(result['water_ml'])
+    result['total_volume_oz'] = ml_to_oz(result['total_volume_ml'])
+
+
+def add_display_fields(result, data, cocktail, variation):
+    """Add spirit details and names to a calculator result."""
+    # Add selected spirit brands for display
+    result['spirit_brands'] = data['spirits']
+    result['cocktail_name'] = cocktail.name
+    result['variation_name'] = variation.name
+    result['garnish'] = cocktail.garnish or ''
+
+
+def build_calculation(data, catalog, timer=NO_TIMER):
+    """
+    Calculate one recipe payload against a catalog snapshot.
+
+    Successful results are served from and stored in the LRU result cache;
+    they are shared between requests and must not be modified (a hit is a
+    shallow copy carrying the request's own spirit_brands). Cache misses
+    that the precomputed calculation table covers are read from it rather
+    than calculated.
+
+    Args:
+        timer: a services.timing.PhaseTimer to lap each step on
+
+    Returns:
+        (body, status) where body is the result dict on success or an
+        {"error": ...} dict with a 4xx status.
+    """
+    error = validate_calculation(data)
+    timer.lap('validate')
+    if error:
+        return {"error": error}, 400
+
+    key = calculation_key(data, catalog.version)
+    if key is not None:
+        cached = calculation_cache.get(key)
+        timer.lap('cache')
+        if cached is not None:
+            # The key ignores the order of the selections, so echo this
+            # request's spirit_brands rather than the first requester's
+            return dict(cached, spirit_brands=data['spirits']), 200
+
+    # Get recipe
+    cocktail, variation, error = find_variation(catalog, data['cocktail'], data['variation'])
+    if error:
+        return error
+
+    result = precomputed_results.lookup(
+        catalog, cocktail.id, variation, data['spirits'], data['target_volume_ml'], data['target_abv']
+    )
+    timer.lap('lookup')
+    if result is None:
+        # Build spirit ABVs from user selections (unknown brands default to
+        # the first option in their category)
+        abvs = catalog.variation_abvs(variation, data['spirits'])
+        timer.lap('brands')
+
+        # Calculate recipe
+        with metrics.timer('freezer_calculate_recipe_seconds'):
+            result = calculate_variation(
+                variation,
+                abvs,
+                data['target_volume_ml'],
+                data['target_abv']
+            )
+        timer.lap('calculate')
+        add_oz_conversions(result)
+        timer.lap('convert')
+
+    add_display_fields(result, data, cocktail, variation)
+
+    if key is not None:
+        calculation_cache.put(key, result)
+    return result, 200
 
 
 @api.route('/calculate', methods=['POST'])
@@ -104,76 +364,286 @@ def calculate():
         "target_abv": 24
     }
     """
+    timer = request_timer(current_app.config)
     data = request.get_json()
+    timer.lap('parse')
+    catalog = request_catalog()
+    timer.lap('catalog')
+    body, status = build_calculation(data, catalog, timer)
+    response = jsonify(body)
+    response.status_code = status
+    timer.lap('serialize')
+    server_timing = report_timing(timer, current_app.config, request.method, request.url_rule.rule, status)
+    if server_timing:
+        response.headers['Server-Timing'] = server_timing
+    return response
+
+
+@api.route('/calculate/batch', methods=['POST'])
+def calculate_batch():
+    """
+    Calculate many freezer cocktail recipes in one request.
 
-    # Validate required fields
-    required = ['cocktail', 'variation', 'spirits', 'target_volume_ml', 'target_abv']
-    for field in required:
-        if field not in data:
-            return jsonify({"error": f"Missing required field: {field}"}), 400
+    Request body: a JSON array of /calculate payloads.
 
-    # Load data
-    recipes = load_recipes()
-    spirits_db = load_spirits()
+    Response: an array in the same order, one entry per payload:
+    {"status": 200, "result": {...}} or {"status": 404, "error": "..."}.
+    A bad item only fails its own entry.
+    """
+    items = request.get_json()
+    if not isinstance(items, list):
+        return jsonify({"error": "Request body must be a JSON array"}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Batch too large (max {MAX_BATCH_SIZE} items)"}), 413
+
+    # Every item sees the same catalog snapshot
+    catalog = request_catalog()
+
+    results = []
+    for item in items:
+        try:
+            body, status = build_calculation(item, catalog)
+        except (ArithmeticError, ValueError):
+            # Anything validation missed fails only its own entry
+            body, status = {"error": "Could not calculate this recipe"}, 400
+        if status == 200:
+            results.append({"status": status, "result": body})
+        else:
+            results.append({"status": status, "error": body["error"]})
 
-    # Get recipe
-    cocktail_id = data['cocktail']
-    variation_id = data['variation']
+    return jsonify(results)
 
-    if cocktail_id not in recipes:
-        return jsonify({"error": "Cocktail not found"}), 404
 
-    cocktail = recipes[cocktail_id]
-    if variation_id not in cocktail['variations']:
-        return jsonify({"error": "Variation not found"}), 404
-
-    recipe = cocktail['variations'][variation_id]
-    recipe_ingredients = recipe['ingredients']
-
-    # Build spirit ABVs from user selections
-    spirit_abvs = {}
-    for ingredient, brand in data['spirits'].items():
-        if ingredient in spirits_db:
-            spirit_list = spirits_db[ingredient]
-            spirit = next((s for s in spirit_list if s['brand'] == brand), None)
-            if spirit:
-                spirit_abvs[ingredient] = spirit['abv']
-            else:
-                # Default to first option if brand not found
-                spirit_abvs[ingredient] = spirit_list[0]['abv'] if spirit_list else 0
-        else:
-            spirit_abvs[ingredient] = 0
-
-    # Calculate recipe
-    result = calculate_recipe(
-        recipe_ingredients,
-        spirit_abvs,
-        data['target_volume_ml'],
-        data['target_abv']
-    )
+@api.route('/calculate/sweep', methods=['POST'])
+def calculate_sweep():
+    """
+    Calculate a recipe over a grid of target volumes and ABVs.
 
-    # Add oz conversions and spirit details
-    result['ingredients_oz'] = {
-        ingredient: ml_to_oz(ml)
-        for ingredient, ml in result['ingredients'].items()
+    Request body: a /calculate payload where target_volume_ml and target_abv
+    may each be a number, a list of numbers or an inclusive range:
+    {
+        "cocktail": "martini",
+        "variation": "classic",
+        "spirits": {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"},
+        "target_volume_ml": [750, 1000],
+        "target_abv": {"start": 20, "stop": 40, "step": 0.5}
     }
-    result['water_oz'] = ml_to_oz(result['water_ml'])
-    result['total_volume_oz'] = ml_to_oz(result['total_volume_ml'])
 
-    # Add selected spirit brands for display
-    result['spirit_brands'] = data['spirits']
-    result['cocktail_name'] = cocktail['name']
-    result['variation_name'] = recipe['name']
-    result['garnish'] = cocktail.get('garnish', '')
+    Response: newline-delimited JSON (application/x-ndjson), one result per
+    grid point ordered by volume then ABV, streamed as it is computed.
+    """
+    data = request.get_json()
+    error = validate_calculation(data, numeric_targets=False)
+    if error:
+        return jsonify({"error": error}), 400
+
+    try:
+        volumes = expand_range(data['target_volume_ml'], 'target_volume_ml')
+        abvs = expand_range(data['target_abv'], 'target_abv')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if len(volumes) * len(abvs) > MAX_SWEEP_ROWS:
+        return jsonify({"error": f"Sweep too large (max {MAX_SWEEP_ROWS} rows)"}), 413
+
+    catalog = request_catalog()
+    cocktail, variation, error = find_variation(catalog, data['cocktail'], data['variation'])
+    if error:
+        body, status = error
+        return jsonify(body), status
+    spirit_abvs = catalog.spirit_abvs(data['spirits'])
+
+    def generate():
+        for row in sweep_rows(variation.ingredient_parts(), spirit_abvs, volumes, abvs):
+            # Raise rather than stream NaN or Infinity, which aren't JSON
+            yield json.dumps(row, separators=(',', ':'), allow_nan=False) + '\n'
+
+    return current_app.response_class(generate(), mimetype='application/x-ndjson')
+
+
+@api.route('/calculate/compare', methods=['POST'])
+def calculate_compare():
+    """
+    Calculate a recipe for every combination of brands at once.
 
-    return jsonify(result)
+    Request body: a /calculate payload where spirits is optional and each
+    entry may list brands to compare; categories left out compare all of
+    their brands:
+    {
+        "cocktail": "martini",
+        "variation": "classic",
+        "spirits": {"gin": ["Tanqueray", "Plymouth", "Beefeater London Dry"]},
+        "target_volume_ml": 750,
+        "target_abv": 24
+    }
+
+    Response: the recipe for each combination in columns. brands lists the
+    compared brands of each spirit ingredient and axes their order; row
+    sum(i_k * strides[k]) of every column is the recipe with brand i_k of
+    the k-th ingredient in axes:
+    {
+        "cocktail": "martini", "variation": "classic",
+        "target_volume_ml": 750, "target_abv": 24,
+        "total_volume_ml": 750.0, "total_volume_oz": 25.36,
+        "brands": {"gin": ["Tanqueray", ...], "vermouth_dry": ["Dolin Dry", ...]},
+        "abvs": {"gin": [47.3, ...], "vermouth_dry": [17.5, ...]},
+        "axes": ["gin", "vermouth_dry"], "shape": [3, 12], "strides": [12, 1],
+        "columns": {
+            "ingredients": {"gin": [...], "vermouth_dry": [...]},
+            "ingredients_oz": {...}, "water_ml": [...], "water_oz": [...],
+            "initial_abv": [...], "final_abv": [...]
+        }
+    }
+    """
+    data = request.get_json()
+    error = validate_calculation(data, fields=COMPARE_FIELDS)
+    if error:
+        return jsonify({"error": error}), 400
+
+    catalog = request_catalog()
+    cocktail, variation, error = find_variation(catalog, data['cocktail'], data['variation'])
+    if error:
+        body, status = error
+        return jsonify(body), status
+    try:
+        axes = brand_axes(catalog, variation, data.get('spirits', {}))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if comparison_rows(axes) > MAX_COMPARISON_ROWS:
+        return jsonify({"error": f"Comparison too large (max {MAX_COMPARISON_ROWS} combinations)"}), 413
+
+    comparison = compare_brands(variation, axes, data['target_volume_ml'], data['target_abv'])
+    return jsonify({
+        "cocktail": cocktail.id,
+        "variation": variation.id,
+        "target_volume_ml": data['target_volume_ml'],
+        "target_abv": data['target_abv'],
+        "total_volume_ml": round(data['target_volume_ml'], 1),
+        "total_volume_oz": ml_to_oz(round(data['target_volume_ml'], 1)),
+        "brands": {ingredient: [brand for brand, _ in brands] for ingredient, brands in axes.items()},
+        "abvs": {ingredient: [abv for _, abv in brands] for ingredient, brands in axes.items()},
+        **comparison,
+    })
+
+
+def validate_inventory(inventory):
+    """Return an error message for a malformed inventory, or None."""
+    if not isinstance(inventory, dict):
+        return "Inventory must be an object"
+    for ingredient, ml in inventory.items():
+        if not is_number(ml) or not 0 <= ml <= MAX_BATCH_ML:
+            return f"Inventory for {ingredient} must be a number from 0 to {MAX_BATCH_ML} ml"
+    return None
+
+
+def solve_inventory(inventory, data, cocktail, variation, abvs):
+    """
+    Find the largest batch of a variation one inventory can make.
+
+    Returns:
+        (body, status) where body is the calculate result at the maximum
+        volume plus max_volume_ml, limiting_ingredient and remaining_ml,
+        or an {"error": ...} dict with a 400 status.
+    """
+    error = validate_inventory(inventory)
+    if error:
+        return {"error": error}, 400
+    try:
+        volume, limiting = max_variation_volume(variation, abvs, inventory, data['target_abv'])
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    result = calculate_variation(variation, abvs, volume, data['target_abv'])
+    add_oz_conversions(result)
+    add_display_fields(result, data, cocktail, variation)
+    result['max_volume_ml'] = volume
+    result['limiting_ingredient'] = limiting
+
+    used = dict(result['ingredients'], water=result['water_ml'])
+    result['remaining_ml'] = {
+        ingredient: max(0, round(ml - used[ingredient], 1))
+        for ingredient, ml in inventory.items()
+        if ingredient in used
+    }
+    return result, 200
+
+
+@api.route('/calculate/max-volume', methods=['POST'])
+def calculate_max_volume():
+    """
+    Calculate the largest batch the bottles on hand can make.
+
+    Request body: a /calculate payload without target_volume_ml, plus the ml
+    available of each ingredient, as one inventory or a list of them:
+    {
+        "cocktail": "martini",
+        "variation": "classic",
+        "spirits": {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"},
+        "target_abv": 24,
+        "inventory": {"gin": 700, "vermouth_dry": 375}
+    }
+
+    Ingredients missing from an inventory are treated as unlimited; a
+    "water" entry limits the dilution water.
+
+    Response: for "inventory", the /calculate result at the maximum volume
+    plus max_volume_ml, limiting_ingredient and remaining_ml. For
+    "inventories", an array in the same order with entries like
+    /calculate/batch: {"status": 200, "result": {...}} or
+    {"status": 400, "error": "..."}.
+    """
+    data = request.get_json()
+    error = validate_calculation(data, fields=MAX_VOLUME_FIELDS)
+    if error:
+        return jsonify({"error": error}), 400
+    if ('inventory' in data) == ('inventories' in data):
+        return jsonify({"error": "Provide exactly one of inventory or inventories"}), 400
+    inventories = data.get('inventories')
+    if 'inventories' in data:
+        if not isinstance(inventories, list):
+            return jsonify({"error": "Field inventories must be an array"}), 400
+        if len(inventories) > MAX_BATCH_SIZE:
+            return jsonify({"error": f"Too many inventories (max {MAX_BATCH_SIZE})"}), 413
+
+    catalog = request_catalog()
+    cocktail, variation, error = find_variation(catalog, data['cocktail'], data['variation'])
+    if error:
+        body, status = error
+        return jsonify(body), status
+    abvs = catalog.variation_abvs(variation, data['spirits'])
+
+    if inventories is None:
+        body, status = solve_inventory(data['inventory'], data, cocktail, variation, abvs)
+        return jsonify(body), status
+
+    results = []
+    for inventory in inventories:
+        body, status = solve_inventory(inventory, data, cocktail, variation, abvs)
+        if status == 200:
+            results.append({"status": status, "result": body})
+        else:
+            results.append({"status": status, "error": body["error"]})
+    return jsonify(results)
+
+
+@api.route('/calculate/cache', methods=['GET'])
+def get_calculate_cache_stats():
+    """
+    Get hit/miss/eviction statistics for the calculate result cache, and
+    under "table" those of the precomputed calculation table.
+    """
+    stats = calculation_cache.stats()
+    stats["catalog_version"] = request_catalog().version
+    stats["table"] = precomputed_results.stats()
+    return jsonify(stats)
+
+
+@api.route('/tenants/cache', methods=['GET'])
+def get_tenant_cache_stats():
+    """Get size, hit-rate and memory statistics for the tenant catalog cache."""
+    return jsonify(tenant_catalogs.stats())
 
 
 @api.route('/presets', methods=['GET'])
 def get_presets():
     """Get ABV strength presets."""
-    return jsonify({
-        "weak": {"name": "Weak", "abv": 22},
-        "normal": {"name": "Normal", "abv": 24},
-        "strong": {"name": "Strong", "abv": 26}
-    })
+    return cached_json(request_catalog(), ('presets',), lambda: ABV_PRESETS)
@@ -0,0 +1,38 @@
+"""Liveness and readiness probes for The Freezer Door."""
+
+from flask import Blueprint, current_app, jsonify
+
+from services.catalog import catalog_store
+
+health = Blueprint('health', __name__)
+
+
+def probe_response(body: dict, status: int = 200):
+    response = jsonify(body)
+    response.status_code = status
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@health.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return probe_response({"status": "ok"})
+
+
+@health.route('/readyz', methods=['GET'])
+def readyz():
+    """
+    Readiness: the catalog is loaded and its responses are pre-serialized.
+
+    Returns 503 until then, so the orchestrator only routes traffic to
+    warmed workers. Never loads the catalog itself.
+    """
+    catalog = catalog_store.peek()
+    if catalog is None or not current_app.config.get('CATALOG_WARMED'):
+        return probe_response({"status": "starting"}, 503)
+    return probe_response({
+        "status": "ready",
+        "catalog_version": catalog.version,
+        "catalog_source": catalog_store.source,
+    })
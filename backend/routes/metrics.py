@@ -0,0 +1,48 @@
+"""Prometheus metrics for The Freezer Door."""
+
+import time
+
+from flask import Blueprint, current_app, g, request
+
+from services.metrics import registry
+
+metrics = Blueprint('metrics', __name__)
+
+
+@metrics.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Expose request and internal timing metrics in Prometheus text format."""
+    return current_app.response_class(
+        registry.render(), mimetype='text/plain', content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+def init_metrics(app, blueprint: str = 'api'):
+    """
+    Record a request count and latency for every route of `blueprint`.
+
+    Routes are labelled by their URL rule (e.g. /api/cocktails/<cocktail_id>)
+    so label cardinality stays bounded whatever the clients request.
+    """
+    @app.before_request
+    def start_timer():
+        if request.blueprint == blueprint:
+            g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            elapsed = time.perf_counter() - start
+            route = request.url_rule.rule if request.url_rule else request.path
+            registry.inc(
+                'freezer_http_requests_total',
+                (('method', request.method), ('route', route), ('status', str(response.status_code))),
+            )
+            registry.observe(
+                'freezer_http_request_duration_seconds', elapsed,
+                (('method', request.method), ('route', route)),
+            )
+        return response
+
+    app.register_blueprint(metrics)
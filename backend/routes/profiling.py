@@ -0,0 +1,72 @@
+"""Per-request profiling hooks for the api blueprint (see services.profiling)."""
+
+import random
+
+from flask import g, request
+
+from services.profiling import (
+    DEFAULT_DIR,
+    DEFAULT_ENABLED,
+    DEFAULT_KEEP,
+    DEFAULT_MEMORY,
+    DEFAULT_SAMPLE_RATE,
+    DEFAULT_SECRET,
+    Profiler,
+    verify,
+)
+
+PROFILE_HEADER = 'X-Profile'
+# Response header naming the dump a profiled request was written to
+DUMP_HEADER = 'X-Profile-Dump'
+
+
+def init_profiling(app, blueprint: str = 'api'):
+    """
+    Profile requests to `blueprint` that ask for it with a signed X-Profile
+    header or are sampled.
+
+    Reads PROFILE_ENABLED, PROFILE_DIR, PROFILE_SECRET, PROFILE_SAMPLE_RATE,
+    PROFILE_MEMORY and PROFILE_KEEP from the app config, falling back to the
+    environment. The profiler is kept in app.extensions['profiler'].
+    """
+    for key, default in (('PROFILE_DIR', DEFAULT_DIR), ('PROFILE_SECRET', DEFAULT_SECRET)):
+        app.config.setdefault(key, default)
+    if not app.config.get('PROFILE_ENABLED', DEFAULT_ENABLED):
+        return
+    profiler = Profiler(
+        app.config['PROFILE_DIR'],
+        memory=app.config.get('PROFILE_MEMORY', DEFAULT_MEMORY),
+        keep=app.config.get('PROFILE_KEEP', DEFAULT_KEEP),
+    )
+    app.extensions['profiler'] = profiler
+    secret = app.config['PROFILE_SECRET']
+    sample_rate = app.config.get('PROFILE_SAMPLE_RATE', DEFAULT_SAMPLE_RATE)
+
+    def stop(route):
+        session = g.pop('profile', None)
+        if session is None:
+            return None
+        return profiler.stop(session, request.method, route)
+
+    @app.before_request
+    def start_profile():
+        if request.blueprint != blueprint or request.url_rule is None:
+            return
+        token = request.headers.get(PROFILE_HEADER)
+        if (token and verify(secret, token)) or (sample_rate and random.random() < sample_rate):
+            session = profiler.start()
+            if session is not None:
+                g.profile = session
+
+    @app.after_request
+    def write_profile(response):
+        name = stop(request.url_rule.rule) if 'profile' in g else None
+        if name:
+            response.headers[DUMP_HEADER] = name
+        return response
+
+    @app.teardown_request
+    def release_profile(exc):
+        # after_request doesn't run when the view raised
+        if 'profile' in g:
+            stop(request.url_rule.rule)
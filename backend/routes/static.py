@@ -0,0 +1,55 @@
+"""Serving the bundled single-page frontend from memory."""
+
+from flask import abort, current_app, request
+
+from services.static_assets import HASHED_ASSET_DIR
+
+# Content-hashed bundles never change under the same name
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+# Everything else (index.html, favicon) is revalidated with its ETag
+REVALIDATE_CACHE = 'no-cache'
+
+
+def asset_response(asset):
+    """
+    Serve an Asset, negotiating its encoding and honouring If-None-Match.
+
+    Each encoding has its own strong ETag, so a cached gzip body is never
+    revalidated as the plain one.
+    """
+    encoding, body, etag = asset.variant(request.accept_encodings)
+
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(body, mimetype=asset.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE if asset.immutable else REVALIDATE_CACHE
+    if asset.compressed:
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def spa_response(assets):
+    """
+    Response for a path no route matched.
+
+    Client-side routes get index.html so they work on reload; a missing
+    bundle under assets/ is a real 404 rather than HTML the browser would
+    try to run as a script.
+    """
+    if request.path.startswith(f'/{HASHED_ASSET_DIR}/'):
+        return {"error": "Not found"}, 404
+    return asset_response(assets.index)
+
+
+def init_static(app, assets):
+    """Serve the files of a StaticAssets store at the site root."""
+    @app.route('/<path:filename>', methods=['GET'])
+    def static_file(filename):
+        asset = assets.get(filename)
+        if asset is None:
+            abort(404)
+        return asset_response(asset)
@@ -0,0 +1,68 @@
+"""
+Tenant selection for the api blueprint.
+
+A request is served from a tenant's catalog (see services.tenants) when it
+names the tenant in the path, /api/t/<tenant>/cocktails, or in the X-Tenant
+header; the path wins if both are given. Requests naming neither are served
+from the shared catalog, and an unknown tenant is a 404.
+"""
+
+from flask import g, jsonify, request
+
+from services.catalog import get_catalog
+from services.tenants import tenant_catalogs
+
+TENANT_HEADER = 'X-Tenant'
+
+# WSGI environ key the path prefix's tenant is passed on in
+ENVIRON_KEY = 'freezer.tenant'
+
+
+class TenantPathMiddleware:
+    """
+    Strip the /t/<tenant> segment after `prefix` from request paths, so
+    /api/t/<tenant>/... is routed exactly like /api/... (with the same url
+    rules for metrics and admission limits), and record the tenant in the
+    environ.
+    """
+
+    def __init__(self, wsgi_app, prefix: str = '/api'):
+        self.wsgi_app = wsgi_app
+        self.marker = f"{prefix}/t/"
+        self.prefix = prefix
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path.startswith(self.marker):
+            tenant, slash, rest = path[len(self.marker):].partition('/')
+            if tenant and slash:
+                environ[ENVIRON_KEY] = tenant
+                environ['PATH_INFO'] = f"{self.prefix}/{rest}"
+        return self.wsgi_app(environ, start_response)
+
+
+def request_catalog():
+    """The catalog the current request is served from: its tenant's, or the shared one."""
+    catalog = g.get('catalog')
+    return catalog if catalog is not None else get_catalog()
+
+
+def init_tenants(app, blueprint: str = 'api'):
+    """Select the catalog of every request to `blueprint` by its tenant."""
+    app.wsgi_app = TenantPathMiddleware(app.wsgi_app)
+
+    @app.before_request
+    def select_tenant():
+        tenant = request.environ.get(ENVIRON_KEY)
+        if tenant is None:
+            tenant = request.headers.get(TENANT_HEADER)
+            if tenant is None or request.blueprint != blueprint:
+                return None
+        elif request.blueprint != blueprint:
+            # Only the api routes exist per tenant
+            return jsonify({"error": "Not found"}), 404
+        catalog = tenant_catalogs.get(tenant)
+        if catalog is None:
+            return jsonify({"error": "Tenant not found"}), 404
+        g.catalog = catalog
+        return None
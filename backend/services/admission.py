@@ -0,0 +1,165 @@
+"""
+Admission control for expensive API routes.
+
+Each limited route has a per-client token bucket (`rate` requests a second
+with bursts of up to `burst`) and a cap on how many of its requests a
+worker runs at once (`max_in_flight`). A request over its client's rate is
+rejected with 429, one arriving while the route is at its in-flight cap
+with 503; both are decided before the body is read, and both carry a
+Retry-After. Routes without limits (the catalog reads) are never counted,
+so bursts of batch calculations can't starve them.
+
+State is per worker process: with N workers a client can get up to N times
+its rate through. Limits are keyed by URL rule and can be overridden with
+the ADMISSION_LIMITS environment variable (JSON, e.g.
+{"/api/calculate/batch": {"rate": 1, "burst": 2, "max_in_flight": 1}},
+null to unlimit a route) or the app's ADMISSION_LIMITS config;
+ADMISSION_ENABLED=0 turns admission control off.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from services.metrics import registry as metrics
+
+DEFAULT_ENABLED = os.environ.get('ADMISSION_ENABLED', '1') != '0'
+
+# Buckets kept per process; the least recently seen client is dropped first
+MAX_TRACKED_CLIENTS = int(os.environ.get('ADMISSION_MAX_CLIENTS', 10_000))
+
+
+class RouteLimit:
+    """Rate and concurrency limits for one route."""
+
+    __slots__ = ('rate', 'burst', 'max_in_flight')
+
+    def __init__(self, rate: float = None, burst: float = None, max_in_flight: int = None):
+        """
+        Args:
+            rate: sustained requests per second per client (None: unlimited)
+            burst: bucket size, the requests a client may make at once;
+                defaults to one second's worth of `rate`
+            max_in_flight: concurrent requests per worker (None: unlimited)
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.max_in_flight = max_in_flight
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RouteLimit':
+        return cls(data.get('rate'), data.get('burst'), data.get('max_in_flight'))
+
+    def __repr__(self):
+        return f"<RouteLimit rate={self.rate} burst={self.burst} max_in_flight={self.max_in_flight}>"
+
+
+DEFAULT_LIMITS = {
+    '/api/calculate': RouteLimit(rate=20, burst=40, max_in_flight=32),
+    '/api/calculate/max-volume': RouteLimit(rate=5, burst=10, max_in_flight=8),
+    '/api/calculate/batch': RouteLimit(rate=2, burst=5, max_in_flight=4),
+    '/api/calculate/sweep': RouteLimit(rate=2, burst=5, max_in_flight=4),
+    '/api/calculate/compare': RouteLimit(rate=5, burst=10, max_in_flight=8),
+}
+
+
+def route_limits(overrides: dict = None) -> dict:
+    """
+    DEFAULT_LIMITS with ADMISSION_LIMITS from the environment and then
+    `overrides` applied; each maps URL rule -> {"rate", "burst",
+    "max_in_flight"} (or a RouteLimit), or None to remove a route's limits.
+
+    Raises:
+        ValueError: if ADMISSION_LIMITS isn't valid JSON
+    """
+    limits = dict(DEFAULT_LIMITS)
+    for layer in (json.loads(os.environ.get('ADMISSION_LIMITS') or '{}'), overrides or {}):
+        for rule, limit in layer.items():
+            if limit is None:
+                limits.pop(rule, None)
+            else:
+                limits[rule] = limit if isinstance(limit, RouteLimit) else RouteLimit.from_dict(limit)
+    return limits
+
+
+class Rejection:
+    """Why a request was turned away."""
+
+    __slots__ = ('status', 'error', 'retry_after')
+
+    def __init__(self, status: int, error: str, retry_after: int):
+        self.status = status
+        self.error = error
+        self.retry_after = retry_after
+
+    def __repr__(self):
+        return f"<Rejection {self.status} retry_after={self.retry_after}>"
+
+
+class AdmissionController:
+    """Token buckets and in-flight counts for a set of route limits."""
+
+    def __init__(self, limits: dict, max_clients: int = MAX_TRACKED_CLIENTS, clock=time.monotonic):
+        self.limits = limits
+        self.max_clients = max_clients
+        self.clock = clock
+        # (rule, client) -> [tokens, last refill time]
+        self._buckets = OrderedDict()
+        self._in_flight = dict.fromkeys(limits, 0)
+        self._lock = threading.Lock()
+
+    def admit(self, rule: str, client: str) -> Rejection:
+        """
+        Decide whether to run a request.
+
+        Returns:
+            None if it is admitted (call release(rule) when it finishes),
+            otherwise a Rejection
+        """
+        limit = self.limits.get(rule)
+        if limit is None:
+            return None
+        with self._lock:
+            if limit.rate is not None:
+                wait = self._take_token(rule, client, limit)
+                if wait:
+                    metrics.inc('freezer_admission_rejected_total', (('route', rule), ('reason', 'rate')))
+                    return Rejection(429, "Rate limit exceeded", max(1, math.ceil(wait)))
+            if limit.max_in_flight is not None:
+                if self._in_flight[rule] >= limit.max_in_flight:
+                    metrics.inc('freezer_admission_rejected_total', (('route', rule), ('reason', 'busy')))
+                    return Rejection(503, "Server busy", 1)
+                self._in_flight[rule] += 1
+        return None
+
+    def release(self, rule: str):
+        """Mark an admitted request for `rule` as finished."""
+        limit = self.limits.get(rule)
+        if limit is None or limit.max_in_flight is None:
+            return
+        with self._lock:
+            self._in_flight[rule] -= 1
+
+    def in_flight(self, rule: str) -> int:
+        return self._in_flight.get(rule, 0)
+
+    def _take_token(self, rule: str, client: str, limit: RouteLimit) -> float:
+        # Returns 0 if a token was taken, else seconds until one is available
+        now = self.clock()
+        key = (rule, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [limit.burst, now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0
+        return (1 - bucket[0]) / limit.rate
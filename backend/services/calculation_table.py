@@ -0,0 +1,383 @@
+"""
+Precomputed calculate results in a memory-mapped table.
+
+The input space of /api/calculate is small: cocktail x variation x a brand
+for each ingredient x the cocktail's preset ABVs x a few standard batch
+volumes. `python -m services.calculation_table` enumerates all of it with a
+process pool and writes every calculate_recipe() result, with its oz
+conversions, to data/calculations.table:
+
+    preamble   magic, header length, record count, index slots,
+               ingredient slots (K)
+    header     JSON: catalog version, cocktail and variation ids, volumes
+    records    fixed-size: key (cocktail, variation, K brand positions,
+               target ABV, volume), then a dilution flag and the K
+               ingredient ml and oz, water ml and oz, initial ABV and
+               total oz
+    index      open-addressing hash table of (key hash, record number + 1)
+
+The API memory-maps the table at startup, so the pages are shared by every
+worker, and answers calculate requests that fall inside it with one probe
+and a key comparison. Anything else (other volumes, ABVs or brands, or a
+catalog that changed since the table was built) is calculated live.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+
+from services.calculator import calculate_initial_abv, calculate_recipe, ml_to_oz
+from services.catalog import DATA_DIR, JsonBackend, catalog_version
+from services.metrics import registry as metrics
+
+logger = logging.getLogger(__name__)
+
+TABLE_FILE = os.environ.get('CALCULATION_TABLE', 'calculations.table')
+
+MAGIC = b'FDCALC01'
+# magic, header length, record count, index slots, ingredient slots
+PREAMBLE = struct.Struct('<8sIIII')
+INDEX_SLOT = struct.Struct('<QQ')
+
+# Batch sizes staff actually use, in ml
+STANDARD_VOLUMES = (375, 500, 700, 750, 1000, 1750)
+
+# Brand position of an ingredient that isn't a spirit category (or of an
+# unused ingredient slot). Positions are stored as uint16, so brands at
+# NO_BRAND or beyond aren't tabled and are calculated live
+NO_BRAND = 0xFFFF
+
+DILUTED = 1
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def key_struct(slots: int) -> struct.Struct:
+    # cocktail, variation, brand position per ingredient, target ABV, volume
+    return struct.Struct(f'<HH{slots}Hdd')
+
+
+def value_struct(slots: int) -> struct.Struct:
+    # flags, ingredient ml, ingredient oz, water ml, water oz, initial ABV, total oz
+    return struct.Struct(f'<B{slots}d{slots}ddddd')
+
+
+def key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+
+# Data shared with the pool's workers, set by _init_worker
+_job = {}
+
+
+def _init_worker(recipes: dict, spirits: dict, volumes: tuple, slots: int):
+    _job.update(recipes=recipes, spirits=spirits, volumes=volumes, slots=slots)
+
+
+def _brand_choices(spirits: dict, ingredient: str) -> list:
+    # (position, ABV) of each distinct brand; duplicates resolve to the
+    # first entry, as SpiritCategory.position does
+    if ingredient not in spirits:
+        return [(NO_BRAND, 0)]
+    seen = set()
+    choices = []
+    for position, spirit in enumerate(spirits[ingredient][:NO_BRAND]):
+        if spirit['brand'] not in seen:
+            seen.add(spirit['brand'])
+            choices.append((position, spirit['abv']))
+    return choices
+
+
+def _variation_records(task) -> tuple:
+    """Every record of one variation; returns (records bytes, key hashes)."""
+    cocktail_index, cocktail_id, variation_index, variation_id = task
+    recipes, spirits, volumes, slots = _job['recipes'], _job['spirits'], _job['volumes'], _job['slots']
+    cocktail = recipes[cocktail_id]
+    ingredients = cocktail['variations'][variation_id]['ingredients']
+    names = list(ingredients)
+    padding = slots - len(names)
+    abvs = sorted({preset['abv'] for preset in cocktail.get('presets', {}).values()})
+    keys, values = key_struct(slots), value_struct(slots)
+
+    records = bytearray()
+    hashes = []
+    for combo in itertools.product(*(_brand_choices(spirits, name) for name in names)):
+        positions = [position for position, _ in combo] + [NO_BRAND] * padding
+        spirit_abvs = {name: abv for name, (_, abv) in zip(names, combo)}
+        initial_abv = calculate_initial_abv(ingredients, spirit_abvs)
+        for target_abv in abvs:
+            for volume in volumes:
+                result = calculate_recipe(ingredients, spirit_abvs, volume, target_abv)
+                ml = list(result['ingredients'].values()) + [0.0] * padding
+                key = keys.pack(cocktail_index, variation_index, *positions, target_abv, volume)
+                records += key
+                records += values.pack(
+                    DILUTED if target_abv < initial_abv else 0,
+                    *ml,
+                    *(ml_to_oz(amount) for amount in ml),
+                    result['water_ml'],
+                    ml_to_oz(result['water_ml']),
+                    result['initial_abv'],
+                    ml_to_oz(result['total_volume_ml']),
+                )
+                hashes.append(key_hash(key))
+    return bytes(records), hashes
+
+
+def build_table(data_dir: str = DATA_DIR, output: str = None, volumes=STANDARD_VOLUMES,
+                workers: int = None) -> int:
+    """
+    Enumerate every standard calculation of a catalog and write the table.
+
+    Args:
+        output: table file; defaults to CALCULATION_TABLE in data_dir
+        workers: processes to calculate with (default: one per CPU); 1
+            calculates in this process
+
+    Returns:
+        the number of records written
+    """
+    source = JsonBackend(data_dir)
+    recipes, spirits = source.load_recipes(), source.load_spirits()
+    output = output or os.path.join(data_dir, TABLE_FILE)
+
+    tasks = []
+    for cocktail_index, (cocktail_id, cocktail) in enumerate(recipes.items()):
+        for variation_index, (variation_id, variation) in enumerate(cocktail['variations'].items()):
+            # A recipe with no parts has nothing to scale
+            if sum(variation['ingredients'].values()) > 0:
+                tasks.append((cocktail_index, cocktail_id, variation_index, variation_id))
+    slots = max((len(recipes[task[1]]['variations'][task[3]]['ingredients']) for task in tasks), default=0)
+    job = (recipes, spirits, tuple(volumes), slots)
+
+    if workers == 1:
+        _init_worker(*job)
+        chunks = list(map(_variation_records, tasks))
+    else:
+        # Only the build needs a pool; keep it out of the API's imports
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=job) as pool:
+            chunks = list(pool.map(_variation_records, tasks))
+
+    hashes = [h for _, chunk_hashes in chunks for h in chunk_hashes]
+    index_slots = 8
+    while index_slots < 2 * len(hashes):
+        index_slots *= 2
+    index = [(0, 0)] * index_slots
+    for record, h in enumerate(hashes):
+        slot = h & (index_slots - 1)
+        while index[slot][1]:
+            slot = (slot + 1) & (index_slots - 1)
+        index[slot] = (h, record + 1)
+
+    header = json.dumps({
+        "catalog_version": catalog_version(recipes, spirits),
+        "cocktails": {cocktail_id: list(cocktail['variations']) for cocktail_id, cocktail in recipes.items()},
+        "volumes": list(volumes),
+    }).encode('utf-8')
+
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, len(header), len(hashes), index_slots, slots))
+        f.write(header)
+        f.write(bytes(_align(f.tell()) - f.tell()))
+        for records, _ in chunks:
+            f.write(records)
+        f.write(bytes(_align(f.tell()) - f.tell()))
+        for h, record in index:
+            f.write(INDEX_SLOT.pack(h, record))
+    os.replace(tmp_path, output)
+    return len(hashes)
+
+
+class CalculationTable:
+    """A memory-mapped table written by build_table()."""
+
+    def __init__(self, path: str):
+        """
+        Raises:
+            OSError: if the file can't be opened or mapped
+            ValueError, struct.error: if it isn't a calculation table
+        """
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, header_size, self.records, self._index_slots, self.slots = PREAMBLE.unpack_from(self._map)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a calculation table")
+            header = json.loads(self._map[PREAMBLE.size:PREAMBLE.size + header_size])
+        except (ValueError, struct.error):
+            self._map.close()
+            raise
+
+        self.path = path
+        self.version = header['catalog_version']
+        self.volumes = header['volumes']
+        # (cocktail id, variation id) -> (cocktail index, variation index)
+        self._indexes = {
+            (cocktail_id, variation_id): (cocktail_index, variation_index)
+            for cocktail_index, (cocktail_id, variations) in enumerate(header['cocktails'].items())
+            for variation_index, variation_id in enumerate(variations)
+        }
+        self._key = key_struct(self.slots)
+        self._value = value_struct(self.slots)
+        self._record_size = self._key.size + self._value.size
+        self._records_offset = _align(PREAMBLE.size + header_size)
+        self._index_offset = _align(self._records_offset + self.records * self._record_size)
+
+    def lookup(self, catalog, cocktail_id: str, variation, selections: dict,
+               target_volume_ml: float, target_abv: float) -> dict:
+        """
+        The calculate_recipe() result for a request, with its oz conversions,
+        or None if the table doesn't cover it.
+
+        The result is what build_calculation() computes live before adding
+        the display fields: ingredients, ingredients_oz, water_ml, water_oz,
+        initial_abv, final_abv, total_volume_ml and total_volume_oz.
+        """
+        if catalog.version != self.version:
+            return None
+        indexes = self._indexes.get((cocktail_id, variation.id))
+        if indexes is None:
+            return None
+
+        positions = []
+        for ingredient in variation.ingredients:
+            category = catalog.spirits.get(ingredient)
+            if category is None:
+                positions.append(NO_BRAND)
+                continue
+            # Only exact brand selections; unknown or missing ones fall back
+            # differently and are calculated live
+            position = category.position(selections.get(ingredient))
+            if position is None or position >= NO_BRAND:
+                return None
+            positions.append(position)
+        positions += [NO_BRAND] * (self.slots - len(positions))
+        key = self._key.pack(*indexes, *positions, float(target_abv), float(target_volume_ml))
+
+        offset = self._find(key)
+        if offset is None:
+            return None
+        values = self._value.unpack_from(self._map, offset + self._key.size)
+        count = len(variation.ingredients)
+        slots = self.slots
+        flags = values[0]
+        ml = values[1:1 + count]
+        oz = values[1 + slots:1 + slots + count]
+        water_ml, water_oz, initial_abv, total_volume_oz = values[1 + 2 * slots:]
+
+        diluted = flags & DILUTED
+        return {
+            "ingredients": dict(zip(variation.ingredients, ml)),
+            "ingredients_oz": dict(zip(variation.ingredients, oz)),
+            # Typed exactly as calculate_recipe() returns them
+            "water_ml": water_ml if diluted else 0,
+            "water_oz": water_oz,
+            "initial_abv": initial_abv,
+            "final_abv": round(target_abv, 1) if diluted else initial_abv,
+            "total_volume_ml": round(target_volume_ml, 1),
+            "total_volume_oz": total_volume_oz,
+        }
+
+    def _find(self, key: bytes) -> int:
+        # Offset of the record with this key, or None
+        h = key_hash(key)
+        mask = self._index_slots - 1
+        slot = h & mask
+        while True:
+            slot_hash, record = INDEX_SLOT.unpack_from(self._map, self._index_offset + slot * INDEX_SLOT.size)
+            if not record:
+                return None
+            if slot_hash == h:
+                offset = self._records_offset + (record - 1) * self._record_size
+                if self._map[offset:offset + self._key.size] == key:
+                    return offset
+            slot = (slot + 1) & mask
+
+    def close(self):
+        self._map.close()
+
+    def __repr__(self):
+        return f"<CalculationTable {self.path} ({self.records} records, catalog {self.version})>"
+
+
+class PrecomputedResults:
+    """The installed CalculationTable, if any, and how often it answers."""
+
+    def __init__(self):
+        self.table = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def load(self, path: str) -> CalculationTable:
+        """Map the table at `path`; a missing or invalid file leaves none installed."""
+        try:
+            table = CalculationTable(path)
+        except FileNotFoundError:
+            table = None
+        except (OSError, ValueError, struct.error):
+            logger.exception("Can't load calculation table %s", path)
+            table = None
+        self.table = table
+        if table is not None:
+            logger.info("Loaded %r", table)
+        return table
+
+    def lookup(self, catalog, cocktail_id: str, variation, selections: dict,
+               target_volume_ml: float, target_abv: float) -> dict:
+        """CalculationTable.lookup() against the installed table."""
+        table = self.table
+        if table is None:
+            return None
+        result = table.lookup(catalog, cocktail_id, variation, selections, target_volume_ml, target_abv)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        metrics.inc('freezer_calculation_table_lookups_total', (('result', 'miss' if result is None else 'hit'),))
+        return result
+
+    def stats(self) -> dict:
+        table = self.table
+        return {
+            "loaded": table is not None,
+            "records": table.records if table else 0,
+            "catalog_version": table.version if table else None,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+precomputed_results = PrecomputedResults()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute every standard calculation into a lookup table.")
+    parser.add_argument('data_dir', nargs='?', default=DATA_DIR, help="directory with recipes.json and spirits.json")
+    parser.add_argument('--output', help=f"table file (default: DATA_DIR/{TABLE_FILE})")
+    parser.add_argument('--volumes', default=','.join(map(str, STANDARD_VOLUMES)),
+                        help="comma-separated batch volumes in ml")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    volumes = [float(v) if '.' in v else int(v) for v in args.volumes.split(',')]
+    output = args.output or os.path.join(args.data_dir, TABLE_FILE)
+    count = build_table(args.data_dir, output, volumes, args.workers)
+    print(f"Wrote {count} calculations ({os.path.getsize(output) // 1024} KiB) to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
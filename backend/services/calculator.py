@@ -4,8 +4,17 @@ Freezer cocktail dilution calculator.
 Core formula:
 - Initial ABV = weighted average of spirit ABVs based on recipe ratios
 - Water to add = (spirit_volume * initial_abv / target_abv) - spirit_volume
+
+Solved the other way round, each ingredient's share of the final volume is
+fixed by the recipe and the ABVs, so the largest batch a set of bottles can
+make is bounded by whichever ingredient runs out first.
 """
 
+import math
+
+# Largest batch max_batch_volume() will size (1,000 litres)
+MAX_BATCH_ML = 1_000_000
+
 
 def calculate_initial_abv(ingredients: dict, spirit_abvs: dict) -> float:
     """
@@ -75,18 +84,49 @@ def calculate_recipe(
         - final_abv: target ABV
         - total_volume_ml: final volume
     """
-    # Calculate initial ABV
-    initial_abv = calculate_initial_abv(recipe_ingredients, spirit_abvs)
+    names = list(recipe_ingredients)
+    return _calculate(
+        names,
+        [recipe_ingredients[name] for name in names],
+        [spirit_abvs.get(name, 0) for name in names],
+        target_volume_ml,
+        target_abv,
+    )
+
 
-    # Calculate the ratio of spirits to water needed
-    total_parts = sum(recipe_ingredients.values())
+def calculate_variation(variation, abvs, target_volume_ml: float, target_abv: float) -> dict:
+    """
+    calculate_recipe() for a catalog Variation.
+
+    Args:
+        variation: a services.models.Variation
+        abvs: ABV of each of variation.ingredients, in the same order
+            (see Catalog.variation_abvs)
+        target_volume_ml: Desired final batch volume in ml
+        target_abv: Target ABV percentage
+
+    Returns:
+        the same dict as calculate_recipe()
+    """
+    return _calculate(variation.ingredients, variation.parts, abvs, target_volume_ml, target_abv)
+
+
+def _calculate(names, parts, abvs, target_volume_ml: float, target_abv: float) -> dict:
+    # names, parts and abvs are aligned sequences, one entry per ingredient
+    total_parts = sum(parts)
+
+    # Calculate initial ABV
+    if total_parts == 0:
+        initial_abv = 0
+    else:
+        initial_abv = sum(p * abv for p, abv in zip(parts, abvs)) / total_parts
 
     if target_abv >= initial_abv:
         # No dilution needed, just scale the recipe
         scale_factor = target_volume_ml / total_parts if total_parts > 0 else 0
         scaled_ingredients = {
-            ingredient: parts * scale_factor
-            for ingredient, parts in recipe_ingredients.items()
+            ingredient: p * scale_factor
+            for ingredient, p in zip(names, parts)
         }
         return {
             "ingredients": scaled_ingredients,
@@ -107,8 +147,8 @@ def calculate_recipe(
     # Scale recipe ingredients to the spirit volume
     scale_factor = spirit_volume_ml / total_parts if total_parts > 0 else 0
     scaled_ingredients = {
-        ingredient: round(parts * scale_factor, 1)
-        for ingredient, parts in recipe_ingredients.items()
+        ingredient: round(p * scale_factor, 1)
+        for ingredient, p in zip(names, parts)
     }
 
     return {
@@ -120,6 +160,93 @@ def calculate_recipe(
     }
 
 
+def max_batch_volume(
+    recipe_ingredients: dict,
+    spirit_abvs: dict,
+    available_ml: dict,
+    target_abv: float
+) -> tuple:
+    """
+    Calculate the largest batch that can be made from the bottles on hand.
+
+    Args:
+        recipe_ingredients: dict of ingredient_type -> parts
+        spirit_abvs: dict of ingredient_type -> ABV percentage
+        available_ml: dict of ingredient_type -> ml on hand; ingredients
+            that are not listed are unlimited, and "water" limits the
+            dilution water
+        target_abv: Target ABV percentage
+
+    Returns:
+        (target_volume_ml, limiting_ingredient), the volume rounded down to
+        0.1 ml so calculate_recipe() at that volume stays within stock,
+        rounded amounts included
+
+    Raises:
+        ValueError: if nothing in available_ml limits the batch, the
+            mixture would have to be diluted to 0% ABV, or the stock or the
+            batch is over MAX_BATCH_ML
+    """
+    names = list(recipe_ingredients)
+    return _max_volume(
+        names,
+        [recipe_ingredients[name] for name in names],
+        [spirit_abvs.get(name, 0) for name in names],
+        available_ml,
+        target_abv,
+    )
+
+
+def max_variation_volume(variation, abvs, available_ml: dict, target_abv: float) -> tuple:
+    """max_batch_volume() for a catalog Variation (see calculate_variation)."""
+    return _max_volume(variation.ingredients, variation.parts, abvs, available_ml, target_abv)
+
+
+def _max_volume(names, parts, abvs, available_ml: dict, target_abv: float) -> tuple:
+    total_parts = sum(parts)
+    initial_abv = sum(p * abv for p, abv in zip(parts, abvs)) / total_parts if total_parts > 0 else 0
+
+    if not math.isfinite(target_abv):
+        raise ValueError("target_abv must be a finite number")
+    for name, ml in available_ml.items():
+        if not 0 <= ml <= MAX_BATCH_ML:
+            raise ValueError(f"Inventory for {name} must be from 0 to {MAX_BATCH_ML} ml")
+
+    # Fraction of the final volume that is recipe rather than water
+    if target_abv >= initial_abv:
+        spirit_fraction = 1
+    elif target_abv > 0:
+        spirit_fraction = target_abv / initial_abv
+    else:
+        raise ValueError("target_abv must be greater than 0")
+
+    # Each ingredient is volume * spirit_fraction * p / total_parts of the
+    # batch, so it caps the volume at available * total_parts / (p * fraction).
+    # Stock is floored to the 0.1 ml amounts are rounded to first, so no
+    # rounded amount can come out above what is on hand (700.07 ml of gin
+    # allows 700.0, not 700.1)
+    limits = [
+        (_floor_tenth(available_ml[name]) * total_parts / (p * spirit_fraction), name)
+        for name, p in zip(names, parts)
+        if p > 0 and name in available_ml
+    ]
+    if spirit_fraction < 1 and 'water' in available_ml:
+        limits.append((_floor_tenth(available_ml['water']) / (1 - spirit_fraction), 'water'))
+    if not limits:
+        raise ValueError("Inventory must list at least one ingredient of the recipe")
+
+    volume, limiting = min(limits)
+    # Diluting to a target near 0% needs an unbounded amount of water
+    if not volume <= MAX_BATCH_ML:
+        raise ValueError(f"Batch would be over {MAX_BATCH_ML} ml")
+    return _floor_tenth(volume), limiting
+
+
+def _floor_tenth(ml: float) -> float:
+    # The epsilon keeps exact values like 1000.0 from flooring to 999.9
+    return math.floor(ml * 10 + 1e-9) / 10
+
+
 def ml_to_oz(ml: float) -> float:
     """Convert milliliters to fluid ounces."""
     return round(ml / 29.5735, 2)
@@ -0,0 +1,538 @@
+"""
+In-memory catalog of cocktail recipes and spirits.
+
+The data is read once into an immutable snapshot. Request handlers read the
+current snapshot without touching the filesystem; the store swaps in a new
+snapshot when the data changes on disk or when a reload is requested.
+
+Where the data is read from is set by CATALOG_BACKEND: "json" (the default)
+reads recipes.json and spirits.json from the data directory, "sqlite" reads
+the database CATALOG_DB (default catalog.db, relative to the data
+directory) built by services.sqlite_catalog.
+
+The first load in a process uses the precompiled snapshot CATALOG_SNAPSHOT
+(default catalog.snapshot in the data directory, built by services.snapshot)
+when it matches the backend's data, which skips parsing and indexing on a
+cold start.
+
+Edits made through the admin API are journaled next to the data and
+replayed over it (see CatalogStore).
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from array import array
+
+from services.journal import CatalogJournal
+from services.metrics import registry as metrics
+from services.models import cocktails_from_json, spirits_from_json
+from services.search import SpiritSearch
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+RECIPES_FILE = 'recipes.json'
+SPIRITS_FILE = 'spirits.json'
+
+# Seconds between mtime checks of the data files
+DEFAULT_CHECK_INTERVAL = float(os.environ.get('CATALOG_CHECK_INTERVAL', 2.0))
+
+DEFAULT_BACKEND = os.environ.get('CATALOG_BACKEND', 'json')
+SQLITE_FILE = os.environ.get('CATALOG_DB', 'catalog.db')
+SNAPSHOT_FILE = os.environ.get('CATALOG_SNAPSHOT', 'catalog.snapshot')
+JOURNAL_FILE = os.environ.get('CATALOG_JOURNAL', 'catalog.journal')
+
+# Journal entries after which it is compacted into the data files
+COMPACT_AFTER = int(os.environ.get('CATALOG_JOURNAL_COMPACT', 100))
+
+
+class JsonBackend:
+    """Reads the catalog from recipes.json and spirits.json."""
+
+    # Errors a load raises for missing or half-written data
+    errors = (OSError, ValueError)
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+
+    def paths(self) -> tuple:
+        """Files whose mtime changes when the catalog does."""
+        return (
+            os.path.join(self.data_dir, RECIPES_FILE),
+            os.path.join(self.data_dir, SPIRITS_FILE),
+        )
+
+    def load_spirits(self) -> dict:
+        with open(os.path.join(self.data_dir, SPIRITS_FILE), 'r') as f:
+            return json.load(f)
+
+    def load_recipes(self) -> dict:
+        with open(os.path.join(self.data_dir, RECIPES_FILE), 'r') as f:
+            return json.load(f)
+
+    def save(self, recipes: dict, spirits: dict):
+        """
+        Replace both files, in the layout they are edited in by hand. Each
+        is written next to itself and renamed over the old one, so readers
+        never see half a file.
+        """
+        for name, text in ((RECIPES_FILE, recipes_text(recipes)), (SPIRITS_FILE, spirits_text(spirits))):
+            path = os.path.join(self.data_dir, name)
+            with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(f'{path}.tmp', path)
+
+
+def _inline(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def recipes_text(recipes: dict) -> str:
+    """recipes.json as it is laid out by hand: indented, each preset on one line."""
+    # Presets are swapped for placeholder strings, which are replaced by the
+    # one-line form after indenting
+    presets = []
+    data = {}
+    for cocktail_id, cocktail in recipes.items():
+        if 'presets' in cocktail:
+            placeholders = {}
+            for preset_id, preset in cocktail['presets'].items():
+                placeholders[preset_id] = f'\0{len(presets)}'
+                presets.append(preset)
+            cocktail = dict(cocktail, presets=placeholders)
+        data[cocktail_id] = cocktail
+    text = json.dumps(data, indent=2, ensure_ascii=False)
+    for i, preset in enumerate(presets):
+        text = text.replace(f'"\\u0000{i}"', _inline(preset), 1)
+    return text + '\n'
+
+
+def spirits_text(spirits: dict) -> str:
+    """spirits.json as it is laid out by hand: one spirit per line."""
+    categories = ',\n'.join(
+        f'  {_inline(category)}: [\n' + ',\n'.join(f'    {_inline(spirit)}' for spirit in spirit_list) + '\n  ]'
+        for category, spirit_list in spirits.items()
+    )
+    return '{\n' + categories + '\n}\n'
+
+
+# (backend, path) -> backend instance, so the SQLite connection pool is
+# shared by every load in the process
+_backends = {}
+
+
+def get_backend(data_dir: str = DATA_DIR, backend: str = None):
+    """
+    The catalog backend for a data directory.
+
+    Args:
+        backend: "json" or "sqlite"; defaults to CATALOG_BACKEND
+
+    Raises:
+        ValueError: for an unknown backend name
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'json':
+        key = (backend, data_dir)
+        factory = JsonBackend
+    elif backend == 'sqlite':
+        # Imported here so JSON deployments don't load it at startup
+        from services.sqlite_catalog import SqliteBackend
+
+        key = (backend, os.path.join(data_dir, SQLITE_FILE))
+        factory = SqliteBackend
+    else:
+        raise ValueError(f"Unknown catalog backend {backend!r} (expected json or sqlite)")
+    instance = _backends.get(key)
+    if instance is None:
+        instance = _backends[key] = factory(key[1])
+    return instance
+
+
+def load_spirits(data_dir: str = DATA_DIR, backend: str = None) -> dict:
+    """Read the spirits, in the spirits.json form, from the configured backend."""
+    return get_backend(data_dir, backend).load_spirits()
+
+
+def load_recipes(data_dir: str = DATA_DIR, backend: str = None) -> dict:
+    """Read the recipes, in the recipes.json form, from the configured backend."""
+    return get_backend(data_dir, backend).load_recipes()
+
+
+def catalog_version(recipes: dict, spirits: dict) -> str:
+    """Content hash identifying a catalog, stable across processes."""
+    payload = json.dumps([recipes, spirits], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class Catalog:
+    """
+    Immutable snapshot of the recipe and spirit data.
+
+    The JSON is converted once into the typed model in services.models:
+    `cocktails` maps cocktail id -> Cocktail and `spirits` maps category ->
+    SpiritCategory. Both are shared by every request that holds this
+    snapshot and must be treated as read-only. A changed catalog is always
+    a new Catalog, so anything derived from one (serialized responses, the
+    brand search index) is valid for as long as the snapshot is.
+    """
+
+    __slots__ = ('cocktails', 'spirits', 'version', 'loaded_at', 'responses', 'search')
+
+    def __init__(self, recipes: dict, spirits: dict, version: str = None, previous: 'Catalog' = None):
+        """
+        Args:
+            previous: the snapshot this one replaces, if any; its search
+                index is reused for unchanged spirit categories
+        """
+        self._build(
+            cocktails_from_json(recipes),
+            spirits_from_json(spirits),
+            version or catalog_version(recipes, spirits),
+            previous,
+        )
+
+    @classmethod
+    def from_model(cls, cocktails: dict, spirits: dict, version: str, previous: 'Catalog' = None) -> 'Catalog':
+        """
+        A snapshot of model objects that already exist, typically most of
+        them shared with `previous` (see services.catalog_changes).
+        """
+        catalog = cls.__new__(cls)
+        catalog._build(cocktails, spirits, version, previous)
+        return catalog
+
+    def _build(self, cocktails: dict, spirits: dict, version: str, previous):
+        self.version = version
+        self.cocktails = cocktails
+        self.spirits = spirits
+        self.search = SpiritSearch(self.spirits, previous.search if previous else None)
+        self.loaded_at = time.time()
+        # Serialized API responses for this version, filled in by the routes
+        self.responses = {}
+
+    def to_json(self) -> tuple:
+        """The (recipes, spirits) data of this snapshot, in the JSON files' form."""
+        recipes = {cocktail_id: cocktail.to_dict() for cocktail_id, cocktail in self.cocktails.items()}
+        spirits = {name: category.to_list() for name, category in self.spirits.items()}
+        return recipes, spirits
+
+    def brand_abv(self, category: str, brand) -> float:
+        """
+        ABV of a brand in a spirit category.
+
+        Unknown brands fall back to the category's first brand; ingredients
+        that aren't a spirit category (or unhashable selections) are 0%.
+        """
+        spirit_category = self.spirits.get(category)
+        if spirit_category is None:
+            return 0
+        return spirit_category.abv(brand)
+
+    def spirit_abvs(self, selections: dict) -> dict:
+        """Resolve ingredient -> brand selections to ingredient -> ABV."""
+        return {
+            ingredient: self.brand_abv(ingredient, brand)
+            for ingredient, brand in selections.items()
+        }
+
+    def variation_abvs(self, variation, selections: dict) -> array:
+        """
+        ABV of each ingredient of a Variation, in its ingredient order.
+
+        Ingredients without a brand selection count as 0%, as they do in
+        calculate_recipe() with spirit_abvs(selections).
+        """
+        abvs = array('d', bytes(8 * len(variation.ingredients)))
+        for i, ingredient in enumerate(variation.ingredients):
+            if ingredient in selections:
+                abvs[i] = self.brand_abv(ingredient, selections[ingredient])
+        return abvs
+
+    def __repr__(self):
+        return f"<Catalog {self.version}>"
+
+
+class CatalogStore:
+    """
+    Holds the current Catalog and replaces it when the data changes.
+
+    current() is cheap: it returns the held snapshot and only stats the
+    backend's files once every `check_interval` seconds. A reload requested with
+    request_reload() (safe to call from a signal handler) is picked up by
+    the next current() call. Swapping is a single reference assignment, so
+    readers always see either the old or the new snapshot, never a mix.
+
+    The current snapshot is the backend's data (the base) with the changes
+    in the journal (CATALOG_JOURNAL, default catalog.journal in the data
+    directory) replayed over it, and then this process's edits that aren't
+    written yet. edit() makes a change current straight away and leaves
+    writing it to a background thread, which appends it to the journal and,
+    every `compact_after` entries, compacts the journal into the backend's
+    files. Other processes pick edits up from the journal on their next
+    check.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR, check_interval: float = DEFAULT_CHECK_INTERVAL,
+                 backend: str = None, compact_after: int = COMPACT_AFTER):
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self.backend = backend or DEFAULT_BACKEND
+        self.compact_after = compact_after
+        self._catalog = None
+        # Where the current snapshot came from: "snapshot" or the backend name
+        self.source = None
+        self._base = None
+        self._mtimes = None
+        self._journal_stat = None
+        # Changes made by edit() that aren't in the journal yet
+        self._pending = []
+        self.compactions = 0
+        self._next_check = 0.0
+        self._reload_requested = False
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._writer = None
+        self._wake = threading.Event()
+
+    def configure(self, data_dir: str = None, check_interval: float = None, backend: str = None,
+                  compact_after: int = None):
+        """Point the store at a different data directory, interval or backend."""
+        with self._lock:
+            if (data_dir is not None and data_dir != self.data_dir) or (
+                    backend is not None and backend != self.backend):
+                # Edits belong to the data they were made to
+                self._write_pending()
+            if data_dir is not None and data_dir != self.data_dir:
+                self.data_dir = data_dir
+                self._catalog = self._base = None
+            if backend is not None and backend != self.backend:
+                get_backend(self.data_dir, backend)
+                self.backend = backend
+                self._catalog = self._base = None
+            if check_interval is not None:
+                self.check_interval = check_interval
+            if compact_after is not None:
+                self.compact_after = compact_after
+            self._next_check = 0.0
+
+    def subscribe(self, callback):
+        """Call callback(catalog) whenever a new snapshot is swapped in."""
+        self._listeners.append(callback)
+
+    def current(self) -> Catalog:
+        """Return the current snapshot, reloading it first if it is stale."""
+        catalog = self._catalog
+        if (catalog is not None and not self._reload_requested
+                and time.monotonic() < self._next_check):
+            return catalog
+        return self._refresh()
+
+    def peek(self) -> Catalog:
+        """The snapshot loaded so far, or None; never loads or checks mtimes."""
+        return self._catalog
+
+    def reload(self) -> Catalog:
+        """Reload the data files (and replay the journal) now, regardless of mtimes."""
+        with self._lock:
+            return self._load(self._stat())
+
+    def request_reload(self):
+        """Ask for a reload on the next current() call."""
+        self._reload_requested = True
+
+    def edit(self, change: dict) -> Catalog:
+        """
+        Apply one change (see services.catalog_changes) and make the result
+        the current snapshot. It is written to the journal in the background;
+        flush() writes it straight away.
+
+        Raises:
+            ChangeError: if the change is invalid for the current snapshot
+        """
+        from services.catalog_changes import apply_changes
+
+        self.current()
+        with self._lock:
+            catalog = apply_changes(self._catalog, [change])
+            self._pending.append(change)
+            self._swap(catalog, self.source)
+        if self._writer is None or not self._writer.is_alive():
+            # Started on first use, so each forked worker gets its own
+            self._writer = threading.Thread(target=self._write_loop, name='catalog-journal', daemon=True)
+            self._writer.start()
+        self._wake.set()
+        return catalog
+
+    def flush(self):
+        """Write edits to the journal now, compacting it if it is due."""
+        with self._lock:
+            if self._write_pending() >= self.compact_after:
+                self._compact()
+
+    def compact(self) -> Catalog:
+        """
+        Fold the journal into the backend's files and empty it.
+
+        The files written are the backend's current data with the whole
+        journal replayed, under the journal's lock, so edits made through
+        other processes are kept.
+        """
+        with self._lock:
+            self._write_pending()
+            return self._compact()
+
+    def journal_status(self) -> dict:
+        """The current version and the state of the journal."""
+        return {
+            "catalog_version": self._catalog.version if self._catalog else None,
+            "source": self.source,
+            "pending": len(self._pending),
+            "journal_entries": len(self._journal().read()),
+            "compact_after": self.compact_after,
+            "compactions": self.compactions,
+        }
+
+    def _paths(self):
+        return get_backend(self.data_dir, self.backend).paths()
+
+    def _journal(self) -> CatalogJournal:
+        return CatalogJournal(os.path.join(self.data_dir, JOURNAL_FILE))
+
+    def _stat(self):
+        try:
+            return tuple(os.stat(path).st_mtime_ns for path in self._paths())
+        except OSError:
+            return None
+
+    def _refresh(self) -> Catalog:
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            mtimes = self._stat()
+            if self._catalog is None:
+                return self._load(mtimes)
+            if self._reload_requested or mtimes != self._mtimes:
+                try:
+                    return self._load(mtimes)
+                except get_backend(self.data_dir, self.backend).errors:
+                    # A half-written file shouldn't take the API down; keep
+                    # serving the last good snapshot and retry next interval.
+                    logger.exception("Catalog reload failed, keeping %r", self._catalog)
+                    self._mtimes = mtimes
+            elif self._journal().stat() != self._journal_stat:
+                return self._replay(self.source)
+            return self._catalog
+
+    def _load(self, mtimes) -> Catalog:
+        self._reload_requested = False
+        with metrics.timer('freezer_catalog_load_seconds'):
+            base = self._load_snapshot() if self._catalog is None else None
+            source = 'snapshot' if base is not None else self.backend
+            if base is None:
+                base = Catalog(
+                    load_recipes(self.data_dir, self.backend),
+                    load_spirits(self.data_dir, self.backend),
+                    previous=self._catalog,
+                )
+        self._mtimes = mtimes
+        self._base = base
+        return self._replay(source)
+
+    def _replay(self, source) -> Catalog:
+        # The base with the journal and then pending edits applied
+        from services.catalog_changes import apply_changes
+
+        journal = self._journal()
+        self._journal_stat = journal.stat()
+        return self._swap(apply_changes(self._base, journal.read() + self._pending, strict=False), source)
+
+    def _swap(self, catalog, source) -> Catalog:
+        if self._catalog is None or catalog.version != self._catalog.version:
+            self._catalog = catalog
+            self.source = source
+            logger.info("Loaded catalog %s from %s (%s)", catalog.version, self.data_dir, source)
+            for callback in self._listeners:
+                callback(catalog)
+        return self._catalog
+
+    def _write_loop(self):
+        while True:
+            # Retry failed writes every few seconds until they succeed
+            self._wake.wait(5 if self._pending else None)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Writing the catalog journal failed; will retry")
+
+    def _write_pending(self) -> int:
+        # Append pending edits to the journal; returns how many entries it
+        # holds (0 if nothing was written). The caller holds self._lock.
+        if not self._pending:
+            return 0
+        journal = self._journal()
+        with journal.locked():
+            journal.append(self._pending)
+            entries = len(journal.read())
+        self._pending = []
+        return entries
+
+    def _compact(self) -> Catalog:
+        # The caller holds self._lock and has written pending edits
+        journal = self._journal()
+        with journal.locked():
+            mtimes = self._stat()
+            if mtimes != self._mtimes:
+                # Another process compacted first; build on its files
+                self._load(mtimes)
+            else:
+                self._replay(self.source)
+            catalog = self._catalog
+            recipes, spirits = catalog.to_json()
+            get_backend(self.data_dir, self.backend).save(recipes, spirits)
+            journal.clear()
+            self._mtimes = self._stat()
+            self._journal_stat = journal.stat()
+            # Versioned like a fresh load of the files, as other processes will
+            self._base = Catalog.from_model(
+                catalog.cocktails, catalog.spirits, catalog_version(recipes, spirits), previous=catalog
+            )
+            self.compactions += 1
+        logger.info("Compacted the catalog journal into %s", self.data_dir)
+        return self._swap(self._base, self.backend)
+
+    def _load_snapshot(self):
+        from services.snapshot import load_snapshot
+
+        path = os.path.join(self.data_dir, SNAPSHOT_FILE)
+        return load_snapshot(path, self.backend, self._paths())
+
+
+catalog_store = CatalogStore()
+
+# Edits not yet journaled are written on a clean exit
+atexit.register(catalog_store.flush)
+
+
+def get_catalog() -> Catalog:
+    """Return the current catalog snapshot."""
+    return catalog_store.current()
+
+
+def install_reload_signal(signum=getattr(signal, 'SIGUSR2', None)):
+    """
+    Reload the catalog when the process receives `signum` (SIGUSR2).
+
+    Signal handlers can only be installed from the main thread; elsewhere,
+    or on platforms without the signal, this does nothing.
+    """
+    if signum is None or threading.current_thread() is not threading.main_thread():
+        return
+    signal.signal(signum, lambda received, frame: catalog_store.request_reload())
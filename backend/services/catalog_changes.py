@@ -0,0 +1,187 @@
+"""
+Incremental edits to a catalog snapshot.
+
+A change is a JSON object that puts (adds or replaces) or deletes one spirit
+brand, recipe variation or ABV preset:
+
+    {"op": "put_spirit", "category": "gin", "brand": "Plymouth", "abv": 41.2}
+    {"op": "delete_spirit", "category": "gin", "brand": "Plymouth"}
+    {"op": "put_variation", "cocktail": "martini", "variation": "dry",
+     "name": "Dry (5:1)", "ingredients": {"gin": 2.5, "vermouth_dry": 0.5}}
+    {"op": "delete_variation", "cocktail": "martini", "variation": "dry"}
+    {"op": "put_preset", "cocktail": "martini", "preset": "strong", "name": "Strong", "abv": 32}
+    {"op": "delete_preset", "cocktail": "martini", "preset": "strong"}
+
+apply_changes() returns a new Catalog that shares every Cocktail, Variation
+and SpiritCategory the changes don't touch (and their search indexes) with
+the old one, so an edit costs the size of what it edits rather than a
+re-parse of the data. The old snapshot is left as it was for the requests
+still reading it.
+
+Putting the same thing twice gives the same data, so replaying a journal
+over data that already holds some of its changes is harmless. A derived
+snapshot's version hashes its parent's version and the change, so every
+worker replaying the same journal over the same data reaches the same
+version (and ETags).
+"""
+
+import hashlib
+import json
+import logging
+
+from services.catalog import Catalog
+from services.models import Preset, SpiritCategory, Variation, is_number
+from services.snapshot import ZERO_ABV_INGREDIENTS
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeError(ValueError):
+    """A change that can't be applied; `status` is the HTTP status it maps to."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def _string(change: dict, field: str) -> str:
+    value = change.get(field)
+    if not isinstance(value, str) or not value:
+        raise ChangeError(f"Field {field} must be a non-empty string")
+    return value
+
+
+def _abv(change: dict) -> float:
+    abv = change.get('abv')
+    if not is_number(abv) or not 0 <= abv <= 100:
+        raise ChangeError("Field abv must be a number from 0 to 100")
+    return abv
+
+
+def _cocktail(cocktails: dict, change: dict):
+    cocktail = cocktails.get(_string(change, 'cocktail'))
+    if cocktail is None:
+        raise ChangeError("Cocktail not found", 404)
+    return cocktail
+
+
+def _put_spirit(cocktails: dict, spirits: dict, change: dict):
+    name, brand, abv = _string(change, 'category'), _string(change, 'brand'), _abv(change)
+    category = spirits.get(name)
+    if category is None:
+        spirits[name] = SpiritCategory(name, [brand], [abv])
+    elif brand in category:
+        # Every listing of the brand, as services.sqlite_catalog.put_spirit does
+        abvs = [abv if listed == brand else listed_abv for listed, listed_abv in zip(category.brands, category.abvs)]
+        spirits[name] = SpiritCategory(name, category.brands, abvs)
+    else:
+        spirits[name] = SpiritCategory(name, category.brands + (brand,), list(category.abvs) + [abv])
+
+
+def _delete_spirit(cocktails: dict, spirits: dict, change: dict):
+    name, brand = _string(change, 'category'), _string(change, 'brand')
+    category = spirits.get(name)
+    if category is None or brand not in category:
+        raise ChangeError("Spirit not found", 404)
+    kept = [(listed, abv) for listed, abv in zip(category.brands, category.abvs) if listed != brand]
+    if kept:
+        spirits[name] = SpiritCategory(name, [listed for listed, _ in kept], [abv for _, abv in kept])
+        return
+    for cocktail in cocktails.values():
+        for variation in cocktail.variations.values():
+            if name in variation.ingredients:
+                raise ChangeError(f"{brand} is the last {name}, used by {cocktail.id}.{variation.id}", 409)
+    del spirits[name]
+
+
+def _put_variation(cocktails: dict, spirits: dict, change: dict):
+    cocktail = _cocktail(cocktails, change)
+    variation_id, name = _string(change, 'variation'), _string(change, 'name')
+    ingredients = change.get('ingredients')
+    if not isinstance(ingredients, dict) or not ingredients:
+        raise ChangeError("Field ingredients must be a non-empty object")
+    for ingredient, parts in ingredients.items():
+        if ingredient not in spirits and ingredient not in ZERO_ABV_INGREDIENTS:
+            raise ChangeError(f"Unknown ingredient {ingredient!r}")
+        if not is_number(parts) or parts < 0:
+            raise ChangeError(f"Parts of {ingredient!r} must be a non-negative number")
+    variations = dict(cocktail.variations)
+    variations[variation_id] = Variation(variation_id, name, ingredients)
+    cocktails[cocktail.id] = cocktail.replace(variations=variations)
+
+
+def _delete_variation(cocktails: dict, spirits: dict, change: dict):
+    cocktail = _cocktail(cocktails, change)
+    variation_id = _string(change, 'variation')
+    if variation_id not in cocktail.variations:
+        raise ChangeError("Variation not found", 404)
+    if len(cocktail.variations) == 1:
+        raise ChangeError(f"Can't delete the only variation of {cocktail.id}", 409)
+    variations = dict(cocktail.variations)
+    del variations[variation_id]
+    cocktails[cocktail.id] = cocktail.replace(variations=variations)
+
+
+def _put_preset(cocktails: dict, spirits: dict, change: dict):
+    cocktail = _cocktail(cocktails, change)
+    preset_id, name, abv = _string(change, 'preset'), _string(change, 'name'), _abv(change)
+    presets = dict(cocktail.presets)
+    presets[preset_id] = Preset(name, abv)
+    cocktails[cocktail.id] = cocktail.replace(presets=presets)
+
+
+def _delete_preset(cocktails: dict, spirits: dict, change: dict):
+    cocktail = _cocktail(cocktails, change)
+    preset_id = _string(change, 'preset')
+    if preset_id not in cocktail.presets:
+        raise ChangeError("Preset not found", 404)
+    presets = dict(cocktail.presets)
+    del presets[preset_id]
+    cocktails[cocktail.id] = cocktail.replace(presets=presets)
+
+
+OPERATIONS = {
+    'put_spirit': _put_spirit,
+    'delete_spirit': _delete_spirit,
+    'put_variation': _put_variation,
+    'delete_variation': _delete_variation,
+    'put_preset': _put_preset,
+    'delete_preset': _delete_preset,
+}
+
+
+def change_version(version: str, change: dict) -> str:
+    """Version of the snapshot made by applying `change` to version `version`."""
+    payload = json.dumps(change, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(f"{version}:{payload}".encode('utf-8')).hexdigest()[:16]
+
+
+def apply_changes(catalog: Catalog, changes: list, strict: bool = True) -> Catalog:
+    """
+    A new snapshot with `changes` applied in order; `catalog` is unchanged.
+
+    Args:
+        strict: raise for the first change that is invalid or names a
+            cocktail, variation, preset or brand that doesn't exist;
+            otherwise (replaying a journal) skip it with a warning
+
+    Raises:
+        ChangeError: in strict mode, with the HTTP status for the problem
+    """
+    if not changes:
+        return catalog
+    cocktails = dict(catalog.cocktails)
+    spirits = dict(catalog.spirits)
+    version = catalog.version
+    for change in changes:
+        try:
+            if not isinstance(change, dict) or change.get('op') not in OPERATIONS:
+                raise ChangeError(f"Field op must be one of {', '.join(OPERATIONS)}")
+            OPERATIONS[change['op']](cocktails, spirits, change)
+        except ChangeError as e:
+            if strict:
+                raise
+            logger.warning("Skipping catalog change %s: %s", change, e)
+            continue
+        version = change_version(version, change)
+    return Catalog.from_model(cocktails, spirits, version, previous=catalog)
@@ -0,0 +1,122 @@
+"""
+Brand comparisons: one recipe over every combination of brands.
+
+A comparison calculates a variation at one target volume and ABV for the
+cartesian product of brand choices of its spirit ingredients, in a single
+vectorized pass, and returns it in columns so a client can switch brands
+without another request.
+
+numpy is imported on the first comparison rather than with the module, so
+it stays off the app's startup path.
+"""
+
+import math
+
+from services.sweep import MAX_SWEEP_ROWS
+
+# Largest product a single comparison may produce
+MAX_COMPARISON_ROWS = MAX_SWEEP_ROWS
+
+
+def brand_axes(catalog, variation, selections: dict) -> dict:
+    """
+    The brands to compare for each of a variation's spirit ingredients.
+
+    Args:
+        selections: ingredient -> list of brands to compare, or one brand to
+            hold fixed; ingredients left out compare every brand of their
+            category
+
+    Returns:
+        ingredient -> [(brand, abv)], in the variation's ingredient order;
+        ingredients that aren't spirit categories have no axis
+
+    Raises:
+        ValueError: for a selection that isn't an ingredient of the
+            variation, a listed or held brand its category doesn't have, or
+            an ingredient left out whose category has no brands
+    """
+    for ingredient in selections:
+        if ingredient not in variation.ingredients:
+            raise ValueError(f"{ingredient!r} is not an ingredient of this variation")
+
+    axes = {}
+    for ingredient in variation.ingredients:
+        category = catalog.spirits.get(ingredient)
+        if category is None:
+            continue
+        selection = selections.get(ingredient)
+        if selection is None:
+            if not len(category):
+                raise ValueError(f"Spirit category {ingredient!r} has no brands to compare")
+            brands = list(dict.fromkeys(category.brands))
+        elif isinstance(selection, list):
+            if not selection:
+                raise ValueError(f"Brands of {ingredient!r} must be a non-empty list")
+            for brand in selection:
+                if not isinstance(brand, str) or brand not in category:
+                    raise ValueError(f"Unknown {ingredient} brand {brand!r}")
+            brands = list(dict.fromkeys(selection))
+        elif isinstance(selection, str) and selection in category:
+            brands = [selection]
+        else:
+            raise ValueError(f"Unknown {ingredient} brand {selection!r}")
+        axes[ingredient] = [(brand, category.abv(brand)) for brand in brands]
+    return axes
+
+
+def comparison_rows(axes: dict) -> int:
+    """How many combinations a set of brand axes makes."""
+    return math.prod(len(brands) for brands in axes.values())
+
+
+def compare_brands(variation, axes: dict, target_volume_ml: float, target_abv: float) -> dict:
+    """
+    Calculate a variation for every combination of brands on `axes`.
+
+    Rows enumerate the combinations in row-major order of the axes (the
+    last ingredient's brand changes fastest), so the row of brand indexes
+    (i_0, ..., i_n) is sum(i_k * strides[k]). Every row equals what
+    calculate_recipe() returns for those brands.
+
+    Returns:
+        {"axes", "shape", "strides", "columns"}: axes names the axis
+        ingredients in order (JSON objects don't keep it) and columns holds
+        per-row lists: ingredients and ingredients_oz (ingredient -> list),
+        water_ml, water_oz, initial_abv and final_abv
+    """
+    import numpy as np
+
+    from services.vectorized import calculate_recipes, ml_to_oz
+
+    names = list(variation.ingredients)
+    shape = [len(brands) for brands in axes.values()]
+    rows = math.prod(shape)
+    strides = [math.prod(shape[k + 1:]) for k in range(len(shape))]
+
+    # ABV of every ingredient on every row: axis ingredients take their
+    # brand's ABV for the row's index on that axis, the rest are 0%
+    abvs = np.zeros((rows, len(names)))
+    for (ingredient, brands), stride, size in zip(axes.items(), strides, shape):
+        brand_abvs = np.array([abv for _, abv in brands], dtype=np.float64)
+        abvs[:, names.index(ingredient)] = brand_abvs[(np.arange(rows) // stride) % size]
+
+    result = calculate_recipes(np.array(variation.parts, dtype=np.float64), abvs, target_volume_ml, target_abv)
+    ingredients = result["ingredients"]
+    ingredients_oz = ml_to_oz(ingredients)
+    # Undiluted recipes have an int 0 of water, as from calculate_recipe()
+    water_ml = [water if diluted else 0 for water, diluted in
+                zip(result["water_ml"].tolist(), result["diluted"].tolist())]
+    return {
+        "axes": list(axes),
+        "shape": shape,
+        "strides": strides,
+        "columns": {
+            "ingredients": {name: ingredients[:, k].tolist() for k, name in enumerate(names)},
+            "ingredients_oz": {name: ingredients_oz[:, k].tolist() for k, name in enumerate(names)},
+            "water_ml": water_ml,
+            "water_oz": ml_to_oz(result["water_ml"]).tolist(),
+            "initial_abv": result["initial_abv"].tolist(),
+            "final_abv": result["final_abv"].tolist(),
+        },
+    }
@@ -0,0 +1,96 @@
+"""
+Append-only journal of catalog changes.
+
+Admin edits (see services.catalog_changes) are appended to a JSON-lines file
+next to the data, one {"at": <unix time>, "change": {...}} per line, and
+folded into the data files when the journal is compacted. Every worker
+replays the journal over the data it loaded, so an edit made through one
+worker reaches the others on their next catalog check.
+
+Appends and compaction hold an exclusive lock on the journal file, so
+several processes can write to it safely. Readers don't lock: a line that
+is still being written has no newline yet and is left for the next read.
+"""
+
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogJournal:
+    """The journal file at `path`; it is created on the first append."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def stat(self):
+        """(mtime, size) of the file, which changes with every write; None if absent."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def read(self) -> list:
+        """Every complete change in the journal, oldest first."""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        changes = []
+        for line in data.split(b'\n')[:-1]:
+            if not line.strip():
+                continue
+            try:
+                changes.append(json.loads(line)['change'])
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Skipping malformed journal line in %s: %r", self.path, line[:200])
+        return changes
+
+    @contextmanager
+    def locked(self):
+        """Hold the journal's exclusive write lock."""
+        with open(self.path, 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def append(self, changes: list):
+        """
+        Write changes to the end of the journal and fsync it.
+
+        The caller must hold locked().
+        """
+        now = time.time()
+        lines = ''.join(
+            json.dumps({"at": now, "change": change}, ensure_ascii=False, separators=(',', ':')) + '\n'
+            for change in changes
+        )
+        with open(self.path, 'a') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        """Empty the journal once its changes are in the data. The caller must hold locked()."""
+        with open(self.path, 'r+') as f:
+            f.truncate(0)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __repr__(self):
+        return f"<CatalogJournal {self.path}>"
@@ -0,0 +1,229 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters and latency histograms are kept in plain dicts behind one lock,
+which costs a few microseconds per observation. Under gunicorn each worker
+has its own registry; when METRICS_MULTIPROC_DIR is set, a background
+thread in every process writes its totals to a file in that directory once
+a second and a scrape merges all of them, so /metrics reports the whole
+server whichever worker answers it.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Seconds between background writes of this process's totals to
+# METRICS_MULTIPROC_DIR (only when something was recorded)
+FLUSH_INTERVAL = 1.0
+
+
+class Registry:
+    """Counters and histograms keyed by metric name and label values."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, multiproc_dir: str = None):
+        self.buckets = tuple(buckets)
+        self.multiproc_dir = multiproc_dir
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flusher_pid = None
+
+    def describe(self, name: str, help_text: str):
+        """Set the HELP text shown for a metric."""
+        self._help[name] = help_text
+
+    def inc(self, name: str, labels: tuple = (), amount: float = 1):
+        """Increment a counter. labels is a tuple of (label, value) pairs."""
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        self._maybe_flush()
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        """Record one observation in a histogram."""
+        key = (name, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Per-bucket counts (plus +Inf), sum, count
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+        self._maybe_flush()
+
+    @contextmanager
+    def timer(self, name: str, labels: tuple = ()):
+        """Time a block of code into a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, labels)
+
+    def snapshot(self) -> dict:
+        """This process's totals in a JSON-serializable form."""
+        with self._lock:
+            return {
+                "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                "histograms": [
+                    [name, list(labels), list(h[0]), h[1], h[2]]
+                    for (name, labels), h in self._histograms.items()
+                ],
+            }
+
+    def reset(self):
+        """Drop all recorded values."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _maybe_flush(self):
+        if self.multiproc_dir:
+            self._dirty = True
+            if self._flusher_pid != os.getpid():
+                self._start_flusher()
+
+    def _start_flusher(self):
+        # Threads don't survive fork, so each worker starts its own
+        self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._flusher_pid == pid:
+            time.sleep(FLUSH_INTERVAL)
+            if self._dirty:
+                self.flush()
+
+    def flush(self):
+        """Write this process's totals to the multiprocess directory."""
+        if not self.multiproc_dir:
+            return
+        self._dirty = False
+        path = os.path.join(self.multiproc_dir, f'metrics-{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def collect(self) -> dict:
+        """
+        Totals for the whole server.
+
+        With a multiprocess directory this merges every process's file
+        (including exited workers, so counters never go backwards);
+        otherwise it is this process's snapshot.
+        """
+        if not self.multiproc_dir:
+            return self.snapshot()
+
+        self.flush()
+        counters = {}
+        histograms = {}
+        for filename in os.listdir(self.multiproc_dir):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.multiproc_dir, filename)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in data["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, buckets, total, count in data["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+                merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+                merged[1] += total
+                merged[2] += count
+        return {
+            "counters": [[name, list(labels), value] for (name, labels), value in counters.items()],
+            "histograms": [[name, list(labels), h[0], h[1], h[2]] for (name, labels), h in histograms.items()],
+        }
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        data = self.collect()
+        lines = []
+        described = set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for name, labels, value in sorted(data["counters"]):
+            header(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for name, labels, buckets, total, count in sorted(data["histograms"]):
+            header(name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), buckets):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels + [['le', le]])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry(multiproc_dir=os.environ.get('METRICS_MULTIPROC_DIR') or None)
+
+
+def _before_fork():
+    registry.flush()
+
+
+def _after_fork_in_child():
+    # Whatever the parent recorded is already in the parent's file; start
+    # the child from zero so it isn't counted twice.
+    if registry.multiproc_dir:
+        registry.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=_before_fork, after_in_child=_after_fork_in_child)
+
+registry.describe('freezer_http_requests_total', "HTTP requests to the api blueprint")
+registry.describe('freezer_http_request_duration_seconds', "Latency of api blueprint requests")
+registry.describe('freezer_catalog_load_seconds', "Time to load and index the catalog")
+registry.describe('freezer_calculate_recipe_seconds', "Time spent in calculate_recipe")
+registry.describe('freezer_admission_rejected_total', "Requests turned away by admission control")
+registry.describe('freezer_calculation_table_lookups_total', "Calculate requests looked up in the precomputed table")
+registry.describe('freezer_tenant_catalog_lookups_total', "Tenant catalog lookups, by whether the cached catalog was current")
@@ -0,0 +1,237 @@
+"""
+Typed, compact catalog model.
+
+The JSON data files are converted once per catalog load into small
+`__slots__` objects: category, brand and ingredient names are interned so
+every occurrence shares one string, and ABVs and recipe parts are stored in
+contiguous array('d') tables instead of lists of per-bottle dicts. The
+objects are shared by every request holding a Catalog snapshot and must be
+treated as read-only.
+"""
+
+import math
+import sys
+from array import array
+
+# serving_size_ml reported for cocktails that don't set one
+DEFAULT_SERVING_SIZE_ML = 90
+
+
+def is_number(value) -> bool:
+    """
+    A JSON number usable as a float: an int or float, but not a bool, NaN,
+    infinity or an int too large for a float.
+    """
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return False
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        return False
+
+
+def json_number(value: float):
+    """A stored float as JSON would have it: 40.0 -> 40, 47.3 -> 47.3."""
+    return int(value) if value.is_integer() else value
+
+
+class SpiritCategory:
+    """
+    The brands of one spirit category and their ABVs.
+
+    brands[i] has ABV abvs[i]; the order is the order of spirits.json,
+    and the first brand is the category default.
+    """
+
+    __slots__ = ('name', 'brands', 'abvs', '_positions')
+
+    def __init__(self, name: str, brands, abvs):
+        self.name = sys.intern(name)
+        self.brands = tuple(sys.intern(brand) for brand in brands)
+        self.abvs = array('d', abvs)
+        # If a brand is listed twice the first entry wins
+        positions = {}
+        for position, brand in enumerate(self.brands):
+            positions.setdefault(brand, position)
+        self._positions = positions
+
+    @classmethod
+    def from_json(cls, name: str, spirit_list: list) -> 'SpiritCategory':
+        """Build a category from its spirits.json list of {"brand", "abv"}."""
+        return cls(
+            name,
+            [spirit['brand'] for spirit in spirit_list],
+            [spirit['abv'] for spirit in spirit_list],
+        )
+
+    @property
+    def default_abv(self) -> float:
+        """ABV of the first listed brand, or 0 for an empty category."""
+        return self.abvs[0] if self.abvs else 0
+
+    def position(self, brand) -> int:
+        """Index of a brand in brands, or None if unknown (or unhashable)."""
+        try:
+            return self._positions.get(brand)
+        except TypeError:
+            return None
+
+    def abv(self, brand) -> float:
+        """ABV of a brand; unknown (or unhashable) brands get the default."""
+        position = self.position(brand)
+        if position is None:
+            return self.default_abv
+        return self.abvs[position]
+
+    def to_list(self) -> list:
+        """The spirits.json form: a list of {"brand", "abv"} dicts."""
+        return [
+            {"brand": brand, "abv": json_number(abv)}
+            for brand, abv in zip(self.brands, self.abvs)
+        ]
+
+    def __len__(self):
+        return len(self.brands)
+
+    def __contains__(self, brand):
+        try:
+            return brand in self._positions
+        except TypeError:
+            return False
+
+    def __repr__(self):
+        return f"<SpiritCategory {self.name} ({len(self)} brands)>"
+
+
+class Variation:
+    """One recipe of a cocktail: ingredients and their parts, in order."""
+
+    __slots__ = ('id', 'name', 'ingredients', 'parts')
+
+    def __init__(self, variation_id: str, name: str, ingredients: dict):
+        self.id = sys.intern(variation_id)
+        self.name = name
+        self.ingredients = tuple(sys.intern(ingredient) for ingredient in ingredients)
+        self.parts = array('d', ingredients.values())
+
+    @classmethod
+    def from_json(cls, variation_id: str, data: dict) -> 'Variation':
+        return cls(variation_id, data['name'], data['ingredients'])
+
+    def ingredient_parts(self) -> dict:
+        """Ingredient -> parts, as calculate_recipe() takes them."""
+        return dict(zip(self.ingredients, self.parts))
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "ingredients": {
+                ingredient: json_number(parts)
+                for ingredient, parts in zip(self.ingredients, self.parts)
+            },
+        }
+
+    def __repr__(self):
+        return f"<Variation {self.id}>"
+
+
+class Preset:
+    """A named target ABV."""
+
+    __slots__ = ('name', 'abv')
+
+    def __init__(self, name: str, abv: float):
+        self.name = name
+        self.abv = abv
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "abv": self.abv}
+
+
+class Cocktail:
+    """
+    A cocktail with its variations and ABV presets.
+
+    Optional fields missing from recipes.json are None (presets: empty).
+    """
+
+    __slots__ = ('id', 'name', 'base_spirit', 'serving_size_ml', 'garnish', 'presets', 'variations')
+
+    def __init__(self, cocktail_id: str, name: str, variations: dict, presets: dict = None,
+                 base_spirit: str = None, serving_size_ml: float = None, garnish: str = None):
+        self.id = sys.intern(cocktail_id)
+        self.name = name
+        self.variations = variations
+        self.presets = presets or {}
+        self.base_spirit = sys.intern(base_spirit) if base_spirit else base_spirit
+        self.serving_size_ml = serving_size_ml
+        self.garnish = garnish
+
+    @classmethod
+    def from_json(cls, cocktail_id: str, data: dict) -> 'Cocktail':
+        """Build a cocktail from its recipes.json entry."""
+        return cls(
+            cocktail_id,
+            data['name'],
+            _by_id(
+                Variation.from_json(variation_id, variation)
+                for variation_id, variation in data['variations'].items()
+            ),
+            presets={
+                preset_id: Preset(preset.get('name'), preset.get('abv'))
+                for preset_id, preset in data.get('presets', {}).items()
+            },
+            base_spirit=data.get('base_spirit'),
+            serving_size_ml=data.get('serving_size_ml'),
+            garnish=data.get('garnish'),
+        )
+
+    def replace(self, **fields) -> 'Cocktail':
+        """A copy with some fields replaced; the rest, variations included, are shared."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(fields)
+        return Cocktail(values.pop('id'), **values)
+
+    def presets_dict(self) -> dict:
+        return {preset_id: preset.to_dict() for preset_id, preset in self.presets.items()}
+
+    def to_dict(self) -> dict:
+        """The recipes.json form, without the optional fields that are unset."""
+        data = {"name": self.name}
+        if self.base_spirit is not None:
+            data["base_spirit"] = self.base_spirit
+        if self.serving_size_ml is not None:
+            data["serving_size_ml"] = self.serving_size_ml
+        if self.presets:
+            data["presets"] = self.presets_dict()
+        data["variations"] = {
+            variation_id: variation.to_dict() for variation_id, variation in self.variations.items()
+        }
+        if self.garnish is not None:
+            data["garnish"] = self.garnish
+        return data
+
+    def __repr__(self):
+        return f"<Cocktail {self.id}>"
+
+
+def cocktails_from_json(recipes: dict) -> dict:
+    """recipes.json -> {cocktail_id: Cocktail}."""
+    return _by_id(
+        Cocktail.from_json(cocktail_id, cocktail)
+        for cocktail_id, cocktail in recipes.items()
+    )
+
+
+def spirits_from_json(spirits: dict) -> dict:
+    """spirits.json -> {category: SpiritCategory}."""
+    categories = (
+        SpiritCategory.from_json(category, spirit_list)
+        for category, spirit_list in spirits.items()
+    )
+    return {category.name: category for category in categories}
+
+
+def _by_id(items) -> dict:
+    # Keyed by the objects' own interned ids, so the keys cost nothing extra
+    return {item.id: item for item in items}
@@ -0,0 +1,212 @@
+"""
+On-demand request profiling.
+
+Off unless PROFILE_ENABLED=1. A profiled request runs under cProfile and,
+with PROFILE_MEMORY=1, tracemalloc; its stats are written to PROFILE_DIR as
+<time>-<pid>-<seq>-<METHOD>-<route>-<ms>ms.pstats, plus a .tracemalloc
+snapshot next to it. Only the last PROFILE_KEEP dumps are kept.
+
+A request is profiled when it carries a valid signed token in the
+X-Profile header (see sign(); PROFILE_SECRET must be set) or is picked by
+PROFILE_SAMPLE_RATE (0 to 1). One request per process is profiled at a
+time; others arriving meanwhile run normally. Read a dump with:
+
+    python -m pstats <dump>.pstats
+    tracemalloc.Snapshot.load('<dump>.tracemalloc').statistics('lineno')
+
+Mint a token valid for five minutes with:
+
+    PROFILE_SECRET=... python -m services.profiling sign --ttl 300
+"""
+
+import argparse
+import cProfile
+import hashlib
+import hmac
+import itertools
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENABLED = os.environ.get('PROFILE_ENABLED', '0') != '0'
+DEFAULT_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'freezer-profiles'))
+DEFAULT_SECRET = os.environ.get('PROFILE_SECRET')
+DEFAULT_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+DEFAULT_MEMORY = os.environ.get('PROFILE_MEMORY', '0') != '0'
+DEFAULT_KEEP = int(os.environ.get('PROFILE_KEEP', 200))
+
+# Stack depth recorded for each traced allocation
+TRACEMALLOC_FRAMES = 25
+
+DUMP_EXTENSIONS = ('.pstats', '.tracemalloc')
+DUMP_NAME = re.compile(
+    r'(?P<time>\d{8}T\d{6})-(?P<pid>\d+)-(?P<seq>\d+)-(?P<method>[A-Z]+)-(?P<route>[\w.-]*)-(?P<ms>\d+)ms'
+    r'(?P<ext>\.pstats|\.tracemalloc)\Z'
+)
+
+
+def sign(secret: str, expires: int) -> str:
+    """A token for the X-Profile header that is valid until unix time `expires`."""
+    digest = hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{digest}"
+
+
+def verify(secret: str, token: str, now: float = None) -> bool:
+    """Whether a token was made by sign() with `secret` and hasn't expired."""
+    if not secret or not token:
+        return False
+    expires, _, _ = token.partition('.')
+    if not expires.isdigit() or int(expires) < (time.time() if now is None else now):
+        return False
+    return hmac.compare_digest(token.encode(), sign(secret, int(expires)).encode())
+
+
+def route_slug(route: str) -> str:
+    """A URL rule as a file name part: /api/cocktails/<cocktail_id> -> api.cocktails.cocktail_id"""
+    return '.'.join(re.sub(r'[^\w-]', '', part) for part in route.strip('/').split('/')) or 'root'
+
+
+class ProfileSession:
+    """A request being profiled."""
+
+    __slots__ = ('profile', 'memory', 'started')
+
+    def __init__(self, profile, memory: bool):
+        self.profile = profile
+        # Whether this session started tracemalloc (and so stops it)
+        self.memory = memory
+        self.started = time.perf_counter()
+
+
+class Profiler:
+    """Profiles one request at a time and writes its dumps to `directory`."""
+
+    def __init__(self, directory: str = DEFAULT_DIR, memory: bool = DEFAULT_MEMORY, keep: int = DEFAULT_KEEP):
+        self.directory = directory
+        self.memory = memory
+        self.keep = keep
+        self._active = threading.Lock()
+        self._seq = itertools.count()
+
+    def start(self):
+        """Start profiling the calling thread; None if another request is being profiled."""
+        if not self._active.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) owns the hooks
+            self._active.release()
+            return None
+        memory = self.memory and not tracemalloc.is_tracing()
+        if memory:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        return ProfileSession(profile, memory)
+
+    def stop(self, session: ProfileSession, method: str, route: str) -> str:
+        """
+        Stop a session and write its dumps.
+
+        Returns:
+            the dump's file name without extension, or None if writing failed
+        """
+        try:
+            session.profile.disable()
+            elapsed_ms = round((time.perf_counter() - session.started) * 1000)
+            snapshot = tracemalloc.take_snapshot() if session.memory else None
+            if session.memory:
+                tracemalloc.stop()
+        finally:
+            self._active.release()
+
+        name = '-'.join((
+            time.strftime('%Y%m%dT%H%M%S'), str(os.getpid()), str(next(self._seq)),
+            method.upper(), route_slug(route), f"{elapsed_ms}ms",
+        ))
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            session.profile.dump_stats(os.path.join(self.directory, name + '.pstats'))
+            if snapshot is not None:
+                snapshot.dump(os.path.join(self.directory, name + '.tracemalloc'))
+        except OSError:
+            logger.exception("Writing profile %s to %s failed", name, self.directory)
+            return None
+        self._prune()
+        return name
+
+    def _prune(self):
+        dumps = list_dumps(self.directory)
+        for dump in dumps[self.keep:]:
+            for ext in dump["files"]:
+                try:
+                    os.unlink(os.path.join(self.directory, dump["name"] + ext))
+                except OSError:
+                    pass
+
+
+def list_dumps(directory: str, limit: int = None) -> list:
+    """
+    The dumps in `directory`, newest first, as {"name", "created", "method",
+    "route", "duration_ms", "pid", "files", "bytes"}.
+    """
+    dumps = {}
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return []
+    for entry in entries:
+        match = DUMP_NAME.match(entry.name)
+        if match is None:
+            continue
+        name = entry.name[:-len(match['ext'])]
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        dump = dumps.get(name)
+        if dump is None:
+            dump = dumps[name] = {
+                "name": name,
+                "created": st.st_mtime,
+                "method": match['method'],
+                "route": '/' + match['route'].replace('.', '/'),
+                "duration_ms": int(match['ms']),
+                "pid": int(match['pid']),
+                "files": [],
+                "bytes": 0,
+            }
+        dump["files"].append(match['ext'])
+        dump["bytes"] += st.st_size
+    newest = sorted(dumps.values(), key=lambda dump: (dump["created"], dump["name"]), reverse=True)
+    for dump in newest:
+        dump["files"].sort()
+    return newest[:limit] if limit is not None else newest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Request profiling tools.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    sign_parser = commands.add_parser('sign', help="print an X-Profile token (needs PROFILE_SECRET)")
+    sign_parser.add_argument('--ttl', type=int, default=300, help="seconds the token is valid for")
+    list_parser = commands.add_parser('list', help="list the dumps in PROFILE_DIR")
+    list_parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.command == 'sign':
+        if not DEFAULT_SECRET:
+            parser.error("PROFILE_SECRET is not set")
+        print(sign(DEFAULT_SECRET, int(time.time()) + args.ttl))
+    else:
+        for dump in list_dumps(DEFAULT_DIR, args.limit):
+            print(f"{dump['name']}  {dump['method']} {dump['route']}  {dump['duration_ms']} ms  {','.join(dump['files'])}")
+
+
+if __name__ == '__main__':
+    main()
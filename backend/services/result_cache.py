@@ -0,0 +1,130 @@
+"""
+Bounded LRU cache for calculation results.
+
+Most calculate traffic repeats a handful of combinations (presets x common
+batch sizes x popular brands), so results are cached by a canonical form of
+the request plus the catalog version they were computed against.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = int(os.environ.get('CALCULATE_CACHE_SIZE', 4096))
+DEFAULT_TTL = float(os.environ.get('CALCULATE_CACHE_TTL', 3600))
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with an optional per-entry TTL.
+
+    A maxsize of 0 disables caching; a ttl of 0 or None keeps entries until
+    they are evicted. Hits, misses and evictions are counted for sizing.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def configure(self, maxsize: int = None, ttl: float = None):
+        """Resize the cache or change the TTL, dropping excess entries."""
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+            self._evict()
+
+    def get(self, key):
+        """Return the cached value for key, or None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries if full."""
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            self._evict()
+
+    def clear(self):
+        """Drop every entry. Statistics are kept."""
+        with self._lock:
+            self._data.clear()
+
+    def _evict(self):
+        while len(self._data) > max(self.maxsize, 0):
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Current size, configuration and hit-rate counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def calculation_key(data: dict, catalog_version: str):
+    """
+    Canonical cache key for a validated calculate payload.
+
+    Spirit selections are order-independent (callers echo each request's
+    own), but 750 and 750.0 are keyed apart because results echo the target
+    volume and ABV in the form they were sent. Returns None for payloads
+    that can't be keyed (e.g. unhashable brand values, or ints too large
+    for a float), which are simply not cached.
+    """
+    volume, abv = data['target_volume_ml'], data['target_abv']
+    try:
+        spirits = tuple(sorted(data['spirits'].items()))
+        key = (
+            catalog_version,
+            data['cocktail'],
+            data['variation'],
+            spirits,
+            float(volume),
+            isinstance(volume, float),
+            float(abv),
+            isinstance(abv, float),
+        )
+        hash(key)
+    except (TypeError, OverflowError):
+        return None
+    return key
+
+
+calculation_cache = LRUCache()
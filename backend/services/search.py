@@ -0,0 +1,191 @@
+"""
+Brand search for autocomplete.
+
+Every brand is normalized once (NFKD, accents stripped, casefolded) and
+indexed per spirit category three ways: its name and the rest of it from
+each later word ("extra dry" and "dry" of "noilly prat extra dry") in
+sorted lists, for prefix lookups with bisect, and trigram posting lists for
+substring and fuzzy matches. A search walks the match tiers in rank order
+and stops as soon as `limit` results are found; prefix tiers read only the
+first `limit` entries of a sorted range, so lookups stay well under a
+millisecond with thousands of brands.
+
+The index belongs to a Catalog snapshot. When a new snapshot is loaded,
+categories whose brands and ABVs are unchanged reuse the previous
+snapshot's index, so only edited categories are re-indexed.
+"""
+
+import heapq
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from itertools import islice
+
+from services.models import json_number
+
+# Minimum trigram similarity for a fuzzy (misspelled) match
+FUZZY_THRESHOLD = 0.3
+
+# Match tiers, best first
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+
+
+def normalize(text: str) -> str:
+    """Case- and accent-insensitive form: "Ménage  à Trois" -> "menage a trois"."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def name_tails(name: str) -> list:
+    """The name from each of its later words on: "a b c" -> ["b c", "c"]."""
+    words = name.split(' ')
+    return [' '.join(words[i:]) for i in range(1, len(words))]
+
+
+class CategoryIndex:
+    """Prefix and trigram index over the brands of one SpiritCategory."""
+
+    __slots__ = ('category', 'names', 'sorted_names', 'words', 'postings', 'gram_counts')
+
+    def __init__(self, category):
+        self.category = category
+        self.names = [normalize(brand) for brand in category.brands]
+        # (name, position) and (tail, name, position), sorted for bisect,
+        # where a tail is the name from one of its later words on, so
+        # multi-word queries match from any word
+        self.sorted_names = sorted((name, position) for position, name in enumerate(self.names))
+        self.words = sorted(
+            (tail, name, position)
+            for position, name in enumerate(self.names)
+            for tail in set(name_tails(name))
+        )
+        postings = {}
+        self.gram_counts = []
+        for position, name in enumerate(self.names):
+            # Padded so the start and end of the name are trigrams too
+            grams = trigrams(f' {name} ')
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        self.postings = {gram: tuple(positions) for gram, positions in postings.items()}
+
+    def prefix_matches(self, query: str, limit: int) -> list:
+        """The first `limit` names starting with query, as (tier, sort key, position)."""
+        start = bisect_left(self.sorted_names, (query,))
+        found = []
+        for name, position in islice(self.sorted_names, start, start + limit):
+            if not name.startswith(query):
+                break
+            found.append((EXACT if name == query else PREFIX, (name,), position))
+        return found
+
+    def word_prefix_matches(self, query: str, limit: int) -> list:
+        """The first `limit` names with a later word starting with query."""
+        start = bisect_left(self.words, (query,))
+        found = []
+        seen = set()
+        for tail, name, position in islice(self.words, start, None):
+            if not tail.startswith(query) or len(found) == limit:
+                break
+            if position not in seen and not name.startswith(query):
+                seen.add(position)
+                found.append((WORD_PREFIX, (tail, name), position))
+        return found
+
+    def substring_matches(self, query: str, limit: int) -> list:
+        """Names containing query elsewhere than at the start of a word."""
+        lists = sorted((self.postings.get(gram, ()) for gram in trigrams(query)), key=len)
+        if len(query) < 3 or not lists[0]:
+            return []
+        found = (
+            (SUBSTRING, (name,), position)
+            for position in set(lists[0]).intersection(*lists[1:])
+            for name in (self.names[position],)
+            if query in name and not name.startswith(query) and f' {query}' not in name
+        )
+        return heapq.nsmallest(limit, found)
+
+    def fuzzy_matches(self, query: str, limit: int) -> list:
+        """Close misspellings of query, by trigram similarity."""
+        # Padded like the names, so the ends of the query count too
+        grams = trigrams(f' {query} ')
+        if len(query) < 3:
+            return []
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        found = []
+        for position, count in shared.items():
+            similarity = count / (len(grams) + self.gram_counts[position] - count)
+            name = self.names[position]
+            if similarity >= FUZZY_THRESHOLD and query not in name:
+                found.append((FUZZY, (-similarity, name), position))
+        return heapq.nsmallest(limit, found)
+
+
+class SpiritSearch:
+    """Search index over every category of a Catalog's spirits."""
+
+    def __init__(self, spirits: dict, previous: 'SpiritSearch' = None):
+        """
+        Args:
+            spirits: category -> SpiritCategory, as on a Catalog
+            previous: the index of the previous snapshot; unchanged
+                categories reuse its CategoryIndex objects
+        """
+        reusable = previous.categories if previous else {}
+        self.categories = {}
+        self.reused = 0
+        for name, category in spirits.items():
+            old = reusable.get(name)
+            if old is not None and (old.category is category or (
+                    old.category.brands == category.brands and old.category.abvs == category.abvs)):
+                self.categories[name] = old
+                self.reused += 1
+            else:
+                self.categories[name] = CategoryIndex(category)
+
+    def search(self, query: str, category: str = None, limit: int = 10) -> list:
+        """
+        Ranked brands matching a query.
+
+        Exact matches come first, then brands starting with the query (A-Z),
+        then brands with a later word starting with it (by that word), then
+        other substring matches and finally close misspellings.
+
+        Returns:
+            list of {"brand", "category", "abv"}, at most `limit` long
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        indexes = [self.categories[category]] if category else list(self.categories.values())
+
+        found = []
+        tiers = (
+            CategoryIndex.prefix_matches,
+            CategoryIndex.word_prefix_matches,
+            CategoryIndex.substring_matches,
+            CategoryIndex.fuzzy_matches,
+        )
+        for tier in tiers:
+            # Lower tiers can't outrank what the tiers above already found
+            if len(found) >= limit:
+                break
+            for index in indexes:
+                found.extend((rank, key, index, position) for rank, key, position in tier(index, query, limit))
+
+        results = []
+        for _, _, index, position in heapq.nsmallest(limit, found, key=lambda row: row[:2]):
+            spirits = index.category
+            results.append({
+                "brand": spirits.brands[position],
+                "category": spirits.name,
+                "abv": json_number(spirits.abvs[position]),
+            })
+        return results
@@ -0,0 +1,181 @@
+"""
+Precompiled catalog snapshots.
+
+Parsing the catalog and building its model and search index happens on
+every cold start. The build step instead validates the data once and
+pickles the finished Catalog next to it:
+
+    cd backend
+    python -m services.snapshot data
+
+At boot the CatalogStore loads the snapshot in place of the backend, as
+long as it was compiled from the same data files by the same model code;
+otherwise it falls back to the backend and logs why. Snapshots are pickles,
+so only ever load one built by the deploy itself.
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import time
+
+from services.catalog import DATA_DIR, DEFAULT_BACKEND, SNAPSHOT_FILE, Catalog, get_backend
+from services.models import is_number
+
+logger = logging.getLogger(__name__)
+
+# Bump when the header layout changes
+SNAPSHOT_FORMAT = 1
+
+# Ingredients a recipe may use without a spirits.json category; they count
+# as 0% ABV
+ZERO_ABV_INGREDIENTS = frozenset({'water'})
+
+# Modules defining the classes pickled in a snapshot
+MODEL_MODULES = ('catalog.py', 'models.py', 'search.py')
+
+# Errors meaning a snapshot file is unusable rather than stale
+LOAD_ERRORS = (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError)
+
+
+def validate_catalog(recipes: dict, spirits: dict) -> list:
+    """
+    Check recipes.json and spirits.json data for mistakes.
+
+    Every spirit needs a brand and an ABV between 0 and 100, and every
+    recipe ingredient must be a spirit category or a zero-ABV ingredient
+    (otherwise it silently counts as 0% in every calculation).
+
+    Returns:
+        list of error messages, empty if the data is valid
+    """
+    errors = []
+    for category, spirit_list in spirits.items():
+        if not isinstance(spirit_list, list) or not spirit_list:
+            errors.append(f"spirits.{category}: must be a non-empty list")
+            continue
+        for i, spirit in enumerate(spirit_list):
+            if not isinstance(spirit, dict) or not isinstance(spirit.get('brand'), str):
+                errors.append(f"spirits.{category}[{i}]: missing brand")
+            elif not is_number(spirit.get('abv')) or not 0 <= spirit['abv'] <= 100:
+                errors.append(f"spirits.{category}[{i}] ({spirit['brand']}): abv must be 0-100")
+
+    for cocktail_id, cocktail in recipes.items():
+        variations = cocktail.get('variations') if isinstance(cocktail, dict) else None
+        if not isinstance(variations, dict) or not variations:
+            errors.append(f"recipes.{cocktail_id}: no variations")
+            continue
+        for variation_id, variation in variations.items():
+            where = f"recipes.{cocktail_id}.{variation_id}"
+            ingredients = variation.get('ingredients') if isinstance(variation, dict) else None
+            if not isinstance(ingredients, dict) or not ingredients:
+                errors.append(f"{where}: no ingredients")
+                continue
+            for ingredient, parts in ingredients.items():
+                if ingredient not in spirits and ingredient not in ZERO_ABV_INGREDIENTS:
+                    errors.append(f"{where}: unknown ingredient {ingredient!r}")
+                if not is_number(parts) or parts < 0:
+                    errors.append(f"{where}: parts of {ingredient!r} must be a non-negative number")
+    return errors
+
+
+def _file_digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def snapshot_header(backend: str, paths) -> dict:
+    """
+    What a snapshot built now from `paths` would be stamped with.
+
+    A snapshot is only loaded if its header equals the current one: same
+    format, Python version, backend, model code and source file contents.
+    """
+    model_dir = os.path.dirname(__file__)
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "python": sys.version_info[:2],
+        "backend": backend,
+        "code": [_file_digest(os.path.join(model_dir, name)) for name in MODEL_MODULES],
+        "sources": [_file_digest(path) for path in paths],
+    }
+
+
+def compile_snapshot(data_dir: str = DATA_DIR, output: str = None, backend: str = None) -> Catalog:
+    """
+    Validate the catalog and write it as a snapshot.
+
+    Args:
+        output: snapshot file; defaults to CATALOG_SNAPSHOT in data_dir
+        backend: "json" or "sqlite"; defaults to CATALOG_BACKEND
+
+    Raises:
+        ValueError: listing every problem validate_catalog() found
+    """
+    backend = backend or DEFAULT_BACKEND
+    source = get_backend(data_dir, backend)
+    output = output or os.path.join(data_dir, SNAPSHOT_FILE)
+    # Stamped before reading, so data edited meanwhile leaves it stale
+    header = snapshot_header(backend, source.paths())
+    recipes, spirits = source.load_recipes(), source.load_spirits()
+
+    errors = validate_catalog(recipes, spirits)
+    if errors:
+        raise ValueError("Invalid catalog:\n  " + "\n  ".join(errors))
+
+    catalog = Catalog(recipes, spirits)
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, output)
+    return catalog
+
+
+def load_snapshot(path: str, backend: str, paths) -> Catalog:
+    """
+    Load a snapshot compiled from the data files `paths`.
+
+    Returns:
+        the Catalog, or None if there is no snapshot or it is stale or
+        unreadable
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = pickle.load(f)
+            if header != snapshot_header(backend, paths):
+                logger.info("Catalog snapshot %s is stale, loading from %s", path, backend)
+                return None
+            catalog = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except LOAD_ERRORS:
+        logger.exception("Catalog snapshot %s is unreadable, loading from %s", path, backend)
+        return None
+    catalog.loaded_at = time.time()
+    return catalog
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate the catalog and compile it into a boot snapshot.")
+    parser.add_argument('data_dir', nargs='?', default=DATA_DIR, help="data directory (default: backend/data)")
+    parser.add_argument('--output', help=f"snapshot file (default: DATA_DIR/{SNAPSHOT_FILE})")
+    parser.add_argument('--backend', choices=('json', 'sqlite'), help="catalog backend (default: CATALOG_BACKEND)")
+    args = parser.parse_args(argv)
+
+    try:
+        catalog = compile_snapshot(args.data_dir, args.output, args.backend)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    output = args.output or os.path.join(args.data_dir, SNAPSHOT_FILE)
+    print(f"Compiled catalog {catalog.version} ({len(catalog.cocktails)} cocktails, "
+          f"{len(catalog.spirits)} spirit categories) into {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""
+SQLite storage for the catalog.
+
+Spirits and recipes live in one database file with indexes on category and
+brand, so single bottles can be added or changed in place instead of
+rewriting spirits.json. Numbers are stored with NUMERIC affinity, which
+keeps 40 and 47.3 as the integer and float they were in the JSON, so the
+data (and catalog version) read back is identical to what was imported.
+
+Create or refresh the database from the JSON files with:
+
+    cd backend
+    python -m services.sqlite_catalog data data/catalog.db
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+
+# Read-only connections kept open per process
+DEFAULT_POOL_SIZE = int(os.environ.get('CATALOG_DB_POOL_SIZE', 4))
+
+SCHEMA = """
+CREATE TABLE categories (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+CREATE TABLE spirits (
+    category TEXT NOT NULL REFERENCES categories(name),
+    position INTEGER NOT NULL,
+    brand TEXT NOT NULL,
+    abv NUMERIC NOT NULL,
+    PRIMARY KEY (category, position)
+);
+CREATE INDEX spirits_brand ON spirits (brand, category);
+
+CREATE TABLE cocktails (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    base_spirit TEXT,
+    serving_size_ml NUMERIC,
+    garnish TEXT
+);
+CREATE TABLE presets (
+    cocktail_id TEXT NOT NULL REFERENCES cocktails(id),
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    abv NUMERIC,
+    PRIMARY KEY (cocktail_id, position)
+);
+CREATE TABLE variations (
+    cocktail_id TEXT NOT NULL REFERENCES cocktails(id),
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (cocktail_id, position)
+);
+CREATE TABLE variation_ingredients (
+    cocktail_id TEXT NOT NULL,
+    variation_position INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    ingredient TEXT NOT NULL,
+    parts NUMERIC NOT NULL,
+    PRIMARY KEY (cocktail_id, variation_position, position)
+);
+CREATE INDEX variation_ingredients_ingredient ON variation_ingredients (ingredient);
+"""
+
+
+def import_json(recipes: dict, spirits: dict, db_path: str):
+    """
+    Write recipes/spirits dicts to a new database at db_path.
+
+    The database is built next to db_path and renamed over it, so readers
+    never see a half-written file and pick up the new one as a change.
+    """
+    tmp_path = f'{db_path}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    connection = sqlite3.connect(tmp_path)
+    try:
+        with connection:
+            connection.executescript(SCHEMA)
+            connection.executemany(
+                "INSERT INTO categories VALUES (?, ?)",
+                ((name, position) for position, name in enumerate(spirits)),
+            )
+            connection.executemany(
+                "INSERT INTO spirits VALUES (?, ?, ?, ?)",
+                (
+                    (category, position, spirit['brand'], spirit['abv'])
+                    for category, spirit_list in spirits.items()
+                    for position, spirit in enumerate(spirit_list)
+                ),
+            )
+            for position, (cocktail_id, cocktail) in enumerate(recipes.items()):
+                connection.execute(
+                    "INSERT INTO cocktails VALUES (?, ?, ?, ?, ?, ?)",
+                    (cocktail_id, position, cocktail['name'], cocktail.get('base_spirit'),
+                     cocktail.get('serving_size_ml'), cocktail.get('garnish')),
+                )
+                connection.executemany(
+                    "INSERT INTO presets VALUES (?, ?, ?, ?, ?)",
+                    (
+                        (cocktail_id, i, preset_id, preset.get('name'), preset.get('abv'))
+                        for i, (preset_id, preset) in enumerate(cocktail.get('presets', {}).items())
+                    ),
+                )
+                for i, (variation_id, variation) in enumerate(cocktail['variations'].items()):
+                    connection.execute(
+                        "INSERT INTO variations VALUES (?, ?, ?, ?)",
+                        (cocktail_id, i, variation_id, variation['name']),
+                    )
+                    connection.executemany(
+                        "INSERT INTO variation_ingredients VALUES (?, ?, ?, ?, ?)",
+                        (
+                            (cocktail_id, i, j, ingredient, parts)
+                            for j, (ingredient, parts) in enumerate(variation['ingredients'].items())
+                        ),
+                    )
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+    os.replace(tmp_path, db_path)
+
+
+def put_spirit(db_path: str, category: str, brand: str, abv: float):
+    """
+    Set the ABV of a brand in place, adding the brand (and category) if new.
+
+    New brands go to the end of their category. Running workers see the
+    change on their next catalog check, as the file's mtime changes.
+    """
+    connection = sqlite3.connect(db_path)
+    try:
+        with connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO categories VALUES (?, (SELECT COUNT(*) FROM categories))",
+                (category,),
+            )
+            updated = connection.execute(
+                "UPDATE spirits SET abv = ? WHERE brand = ? AND category = ?", (abv, brand, category)
+            ).rowcount
+            if not updated:
+                connection.execute(
+                    "INSERT INTO spirits VALUES "
+                    "(?, (SELECT COALESCE(MAX(position) + 1, 0) FROM spirits WHERE category = ?), ?, ?)",
+                    (category, category, brand, abv),
+                )
+    finally:
+        connection.close()
+
+
+class SqliteBackend:
+    """
+    Reads the catalog from a SQLite database through pooled connections.
+
+    Connections are opened read-only and kept per process: a forked worker
+    never reuses its parent's connections, it opens its own. When the file
+    is replaced (a re-import) the pool is dropped so the next load reads
+    the new database.
+    """
+
+    # Errors a load raises for a missing, locked or half-written database
+    errors = (OSError, ValueError, sqlite3.Error)
+
+    def __init__(self, db_path: str, pool_size: int = DEFAULT_POOL_SIZE):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self._pool = []
+        self._pool_key = None
+        self._lock = threading.Lock()
+
+    def paths(self) -> tuple:
+        """Files whose mtime changes when the catalog does."""
+        return (self.db_path,)
+
+    def _open(self):
+        uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a read-only connection from this process's pool."""
+        key = (os.getpid(), os.stat(self.db_path).st_ino)
+        with self._lock:
+            if key != self._pool_key:
+                # Forked or re-imported: the pooled connections belong to
+                # another process or point at the replaced file.
+                stale, self._pool = self._pool, []
+                if self._pool_key and self._pool_key[0] == key[0]:
+                    for connection in stale:
+                        connection.close()
+                self._pool_key = key
+            connection = self._pool.pop() if self._pool else None
+        if connection is None:
+            connection = self._open()
+        try:
+            yield connection
+        finally:
+            with self._lock:
+                if self._pool_key == key and len(self._pool) < self.pool_size:
+                    self._pool.append(connection)
+                    connection = None
+            if connection is not None:
+                connection.close()
+
+    def load_spirits(self) -> dict:
+        """The catalog's spirits in the spirits.json form."""
+        with self.connection() as connection:
+            spirits = {
+                name: [] for (name,) in connection.execute("SELECT name FROM categories ORDER BY position")
+            }
+            rows = connection.execute(
+                "SELECT category, brand, abv FROM spirits ORDER BY category, position"
+            )
+            for category, brand, abv in rows:
+                spirits[category].append({"brand": brand, "abv": abv})
+        return spirits
+
+    def load_recipes(self) -> dict:
+        """The catalog's recipes in the recipes.json form."""
+        with self.connection() as connection:
+            recipes = {}
+            rows = connection.execute(
+                "SELECT id, name, base_spirit, serving_size_ml, garnish FROM cocktails ORDER BY position"
+            )
+            for cocktail_id, name, base_spirit, serving_size_ml, garnish in rows:
+                cocktail = {"name": name}
+                if base_spirit is not None:
+                    cocktail["base_spirit"] = base_spirit
+                if serving_size_ml is not None:
+                    cocktail["serving_size_ml"] = serving_size_ml
+                cocktail["presets"] = {}
+                cocktail["variations"] = {}
+                if garnish is not None:
+                    cocktail["garnish"] = garnish
+                recipes[cocktail_id] = cocktail
+
+            rows = connection.execute(
+                "SELECT cocktail_id, id, name, abv FROM presets ORDER BY cocktail_id, position"
+            )
+            for cocktail_id, preset_id, name, abv in rows:
+                recipes[cocktail_id]["presets"][preset_id] = {"name": name, "abv": abv}
+
+            variations = {}
+            rows = connection.execute(
+                "SELECT cocktail_id, position, id, name FROM variations ORDER BY cocktail_id, position"
+            )
+            for cocktail_id, position, variation_id, name in rows:
+                variation = {"name": name, "ingredients": {}}
+                recipes[cocktail_id]["variations"][variation_id] = variation
+                variations[(cocktail_id, position)] = variation
+
+            rows = connection.execute(
+                "SELECT cocktail_id, variation_position, ingredient, parts FROM variation_ingredients "
+                "ORDER BY cocktail_id, variation_position, position"
+            )
+            for cocktail_id, variation_position, ingredient, parts in rows:
+                variations[(cocktail_id, variation_position)]["ingredients"][ingredient] = parts
+
+        for cocktail in recipes.values():
+            if not cocktail["presets"]:
+                del cocktail["presets"]
+        return recipes
+
+    def save(self, recipes: dict, spirits: dict):
+        """Replace the database with recipes/spirits data (see import_json)."""
+        import_json(recipes, spirits, self.db_path)
+
+
+def main(argv=None):
+    from services.catalog import JsonBackend
+
+    parser = argparse.ArgumentParser(description="Import recipes.json and spirits.json into a SQLite catalog.")
+    parser.add_argument('data_dir', help="directory with recipes.json and spirits.json")
+    parser.add_argument('db_path', help="database file to create or replace")
+    args = parser.parse_args(argv)
+
+    source = JsonBackend(args.data_dir)
+    recipes, spirits = source.load_recipes(), source.load_spirits()
+    import_json(recipes, spirits, args.db_path)
+    bottles = sum(len(spirit_list) for spirit_list in spirits.values())
+    print(f"Imported {len(recipes)} cocktails and {bottles} spirits into {args.db_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
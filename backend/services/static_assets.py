@@ -0,0 +1,151 @@
+"""
+In-memory store of the built frontend.
+
+The static folder is scanned once at startup: every file is read into
+memory with a content-hash ETag, and compressible files get gzip (and,
+when the optional brotli package is installed, brotli) variants built
+there and then, so no request ever compresses or touches the disk. Variants
+already on disk next to a file (app.js.gz, app.js.br) are used as they are.
+With gunicorn's preload_app the store is built once in the master and
+shared by every worker.
+
+Vite puts content-hashed bundles under assets/ (index-DzC1x2_a.js); their
+contents never change under the same name, so they can be cached forever.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # optional: serve gzip only
+    brotli = None
+
+INDEX_FILE = 'index.html'
+
+# Directory Vite writes content-hashed bundles to
+HASHED_ASSET_DIR = 'assets'
+HASHED_NAME = re.compile(r'-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+
+# Smaller files aren't worth a compressed variant
+MIN_COMPRESS_BYTES = 256
+
+COMPRESSIBLE_TYPES = {
+    'application/javascript',
+    'application/json',
+    'application/manifest+json',
+    'application/wasm',
+    'application/xml',
+    'image/svg+xml',
+    'image/x-icon',
+    'text/javascript',
+}
+
+# Content-Encoding -> file suffix of a precompressed variant on disk
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def is_compressible(mimetype: str) -> bool:
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+def is_hashed(path: str) -> bool:
+    """Whether a path is a content-hashed bundle that can be cached forever."""
+    return path.startswith(HASHED_ASSET_DIR + '/') and HASHED_NAME.search(path) is not None
+
+
+class Asset:
+    """One static file and its encoded variants, all held in memory."""
+
+    __slots__ = ('path', 'mimetype', 'etag', 'immutable', 'variants')
+
+    def __init__(self, path: str, body: bytes, variants: dict = None):
+        """
+        Args:
+            path: path relative to the static folder, with / separators
+            body: the file's contents
+            variants: Content-Encoding -> precompressed body, if any were
+                built ahead of time; otherwise they are built here
+        """
+        self.path = path
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.etag = hashlib.sha1(body).hexdigest()[:20]
+        self.immutable = is_hashed(path)
+        self.variants = {'identity': body}
+        if variants is None:
+            variants = self._compress(body)
+        for encoding, data in variants.items():
+            # A variant that doesn't save anything only costs memory
+            if len(data) < len(body):
+                self.variants[encoding] = data
+
+    def _compress(self, body: bytes) -> dict:
+        if len(body) < MIN_COMPRESS_BYTES or not is_compressible(self.mimetype):
+            return {}
+        # mtime=0 keeps the bytes, and so the ETag, identical across workers
+        variants = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['br'] = brotli.compress(body, quality=11)
+        return variants
+
+    def variant(self, accepted) -> tuple:
+        """
+        The best variant for a request's Accept-Encoding.
+
+        Args:
+            accepted: werkzeug Accept for the Accept-Encoding header
+
+        Returns:
+            (encoding, body, etag); encoding is None for the plain file
+        """
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accepted[encoding] > 0:
+                return encoding, self.variants[encoding], f"{self.etag}-{encoding}"
+        return None, self.variants['identity'], self.etag
+
+    @property
+    def compressed(self) -> bool:
+        return len(self.variants) > 1
+
+    def __repr__(self):
+        return f"<Asset {self.path}>"
+
+
+class StaticAssets:
+    """Every file under a static folder, by path."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                full_path = os.path.join(directory, name)
+                if name.endswith(tuple(ENCODINGS.values())) and os.path.exists(os.path.splitext(full_path)[0]):
+                    continue  # a precompressed variant, picked up with its file
+                path = os.path.relpath(full_path, root).replace(os.sep, '/')
+                self.files[path] = self._load(full_path, path)
+
+    @staticmethod
+    def _load(full_path: str, path: str) -> Asset:
+        with open(full_path, 'rb') as f:
+            body = f.read()
+        prebuilt = {}
+        for encoding, suffix in ENCODINGS.items():
+            if os.path.exists(full_path + suffix):
+                with open(full_path + suffix, 'rb') as f:
+                    prebuilt[encoding] = f.read()
+        return Asset(path, body, prebuilt or None)
+
+    def get(self, path: str) -> Asset:
+        return self.files.get(path)
+
+    @property
+    def index(self) -> Asset:
+        """index.html, served for / and for every client-side route."""
+        return self.files.get(INDEX_FILE)
+
+    def __len__(self):
+        return len(self.files)
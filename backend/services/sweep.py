@@ -0,0 +1,112 @@
+"""
+Parameter sweeps over target ABV and batch volume.
+
+A sweep evaluates one recipe over the grid volumes x ABVs with the
+vectorized calculator, a block of rows at a time, so arbitrarily large
+grids can be streamed with flat memory.
+
+numpy is imported on the first sweep rather than with the module, so it
+stays off the app's startup path.
+"""
+
+import math
+
+from services.models import is_number
+
+# Largest grid a single sweep may produce
+MAX_SWEEP_ROWS = 100_000
+
+# Rows computed per vectorized pass
+CHUNK_ROWS = 2048
+
+
+def expand_range(spec, field: str) -> list:
+    """
+    Expand a sweep axis into a list of values.
+
+    Args:
+        spec: a number, a list of numbers, or {"start", "stop", "step"}
+            with an inclusive stop
+        field: name of the field, for error messages
+
+    Raises:
+        ValueError: if the spec is malformed or too large, or has a value
+            of 0 or below
+    """
+    # Zero and negative targets have no meaningful recipe (and make
+    # infinite amounts)
+    not_positive = f"Field {field} values must be above 0"
+    if is_number(spec):
+        if spec <= 0:
+            raise ValueError(not_positive)
+        return [spec]
+    if isinstance(spec, list):
+        if not spec or not all(is_number(v) for v in spec):
+            raise ValueError(f"Field {field} must be a non-empty list of numbers")
+        if min(spec) <= 0:
+            raise ValueError(not_positive)
+        return spec
+    if isinstance(spec, dict):
+        start, stop, step = spec.get('start'), spec.get('stop'), spec.get('step')
+        if not all(is_number(v) for v in (start, stop, step)):
+            raise ValueError(f"Field {field} needs numeric start, stop and step")
+        if step <= 0 or stop < start:
+            raise ValueError(f"Field {field} needs step > 0 and stop >= start")
+        if start <= 0:
+            raise ValueError(not_positive)
+        count = math.floor((stop - start) / step + 1e-9) + 1
+        if count > MAX_SWEEP_ROWS:
+            raise ValueError(f"Field {field} has too many values (max {MAX_SWEEP_ROWS})")
+        # Computed from the start each time so steps like 0.1 don't drift
+        return [round(start + i * step, 10) for i in range(count)]
+    raise ValueError(f"Field {field} must be a number, a list or a range")
+
+
+def sweep_rows(recipe_ingredients: dict, spirit_abvs: dict, volumes: list, abvs: list):
+    """
+    Yield one calculate_recipe()-style dict per (volume, ABV) grid point.
+
+    Rows are ordered by volume, then ABV, and include the targets and the oz
+    conversions that /api/calculate returns.
+    """
+    import numpy as np
+
+    from services.vectorized import calculate_recipes, ml_to_oz
+
+    names = list(recipe_ingredients)
+    parts = np.array([recipe_ingredients[name] for name in names], dtype=np.float64)
+    ingredient_abvs = np.array([spirit_abvs.get(name, 0) for name in names], dtype=np.float64)
+    volumes = np.asarray(volumes, dtype=np.float64)
+    abvs = np.asarray(abvs, dtype=np.float64)
+    total = len(volumes) * len(abvs)
+
+    for start in range(0, total, CHUNK_ROWS):
+        index = np.arange(start, min(start + CHUNK_ROWS, total))
+        target_volume_ml = volumes[index // len(abvs)]
+        target_abv = abvs[index % len(abvs)]
+        result = calculate_recipes(parts, ingredient_abvs, target_volume_ml, target_abv)
+
+        ingredients = result["ingredients"].tolist()
+        ingredients_oz = ml_to_oz(result["ingredients"]).tolist()
+        water_ml = result["water_ml"].tolist()
+        water_oz = ml_to_oz(result["water_ml"]).tolist()
+        initial_abv = result["initial_abv"].tolist()
+        final_abv = result["final_abv"].tolist()
+        total_volume_ml = result["total_volume_ml"].tolist()
+        total_volume_oz = ml_to_oz(result["total_volume_ml"]).tolist()
+        target_volume_ml = target_volume_ml.tolist()
+        target_abv = target_abv.tolist()
+
+        for i in range(len(index)):
+            yield {
+                "target_volume_ml": target_volume_ml[i],
+                "target_abv": target_abv[i],
+                "ingredients": dict(zip(names, ingredients[i])),
+                "ingredients_oz": dict(zip(names, ingredients_oz[i])),
+                "water_ml": water_ml[i],
+                "water_oz": water_oz[i],
+                "initial_abv": initial_abv[i],
+                "final_abv": final_abv[i],
+                "total_volume_ml": total_volume_ml[i],
+                "total_volume_oz": total_volume_oz[i],
+            }
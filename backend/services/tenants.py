@@ -0,0 +1,286 @@
+"""
+Per-tenant catalogs: a bar's own bottles and specs over the shared catalog.
+
+A tenant's overlay is a JSON file in the tenants directory (CATALOG_TENANTS,
+default "tenants" in the data directory) named after the tenant, e.g.
+tenants/harbour-bar.json:
+
+    {
+      "spirits": {"gin": [{"brand": "Harbour House Gin", "abv": 44}]},
+      "recipes": {
+        "martini": {
+          "variations": {"house": {"name": "House (3:1)", "ingredients": {"gin": 2.25, "vermouth_dry": 0.75}}},
+          "presets": {"house": {"name": "House", "abv": 27}}
+        }
+      }
+    }
+
+Spirits add brands to a category (or create it) or change a listed brand's
+ABV; recipes add or replace variations and presets of the shared cocktails.
+The overlay is applied to the current base snapshot as catalog changes (see
+services.catalog_changes), so a tenant catalog holds new objects only for
+what its overlay touches and shares every other Cocktail, SpiritCategory
+and brand search index with the base. Its version is derived from the
+base's, so responses, ETags and cached calculations are per tenant.
+
+Resolved tenant catalogs are kept in a bounded LRU (TENANT_CACHE_SIZE,
+default 256), so a worker holds the tenants it is serving rather than every
+tenant there is; an evicted tenant is rebuilt from its file on its next
+request.
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from services.catalog import catalog_store
+from services.catalog_changes import apply_changes
+from services.metrics import registry as metrics
+
+logger = logging.getLogger(__name__)
+
+TENANTS_DIR = os.environ.get('CATALOG_TENANTS', 'tenants')
+DEFAULT_MAXSIZE = int(os.environ.get('TENANT_CACHE_SIZE', 256))
+
+# Tenant ids are file names, so nothing that could leave the directory
+TENANT_ID = re.compile(r'[A-Za-z0-9][A-Za-z0-9_-]{0,63}\Z')
+
+
+def overlay_changes(overlay: dict) -> list:
+    """
+    The catalog changes an overlay makes, spirits first so that its
+    variations can use its own categories.
+
+    Raises:
+        ValueError: if the overlay isn't shaped as described above
+    """
+    if not isinstance(overlay, dict):
+        raise ValueError("Overlay must be a JSON object")
+    spirits = overlay.get('spirits', {})
+    recipes = overlay.get('recipes', {})
+    if not isinstance(spirits, dict) or not isinstance(recipes, dict):
+        raise ValueError("Overlay spirits and recipes must be objects")
+
+    changes = []
+    for category, brands in spirits.items():
+        if not isinstance(brands, list):
+            raise ValueError(f"Spirits of {category!r} must be a list")
+        for entry in brands:
+            if not isinstance(entry, dict):
+                raise ValueError(f"Spirits of {category!r} must be {{brand, abv}} objects")
+            changes.append({
+                "op": "put_spirit", "category": category, "brand": entry.get('brand'), "abv": entry.get('abv'),
+            })
+    for cocktail_id, recipe in recipes.items():
+        if not isinstance(recipe, dict):
+            raise ValueError(f"Recipe {cocktail_id!r} must be an object")
+        for variation_id, variation in recipe.get('variations', {}).items():
+            if not isinstance(variation, dict):
+                raise ValueError(f"Variation {cocktail_id}.{variation_id} must be an object")
+            changes.append({
+                "op": "put_variation", "cocktail": cocktail_id, "variation": variation_id,
+                "name": variation.get('name'), "ingredients": variation.get('ingredients'),
+            })
+        for preset_id, preset in recipe.get('presets', {}).items():
+            if not isinstance(preset, dict):
+                raise ValueError(f"Preset {cocktail_id}.{preset_id} must be an object")
+            changes.append({
+                "op": "put_preset", "cocktail": cocktail_id, "preset": preset_id,
+                "name": preset.get('name'), "abv": preset.get('abv'),
+            })
+    return changes
+
+
+def deep_size(root, skip: set = None) -> tuple:
+    """
+    (bytes, ids): sys.getsizeof of every object reachable from `root` that
+    isn't in `skip`, and the ids of the objects counted.
+
+    Follows dicts, lists, tuples, sets and the attributes of model objects;
+    anything in `skip` is treated as already counted, with its contents.
+    """
+    skip = skip or set()
+    seen = set()
+    size = 0
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or id(obj) in skip:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, '__slots__'):
+            stack.extend(getattr(obj, name) for name in obj.__slots__ if hasattr(obj, name))
+        elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+            stack.extend(vars(obj).values())
+    return size, seen
+
+
+class TenantCatalogs:
+    """
+    Bounded LRU of tenant id -> tenant Catalog over `store`'s current snapshot.
+
+    An entry is rebuilt when the base snapshot changes or, checked at most
+    every `store.check_interval` seconds, when the tenant's file does. A
+    maxsize of 0 builds every request's catalog afresh.
+    """
+
+    def __init__(self, store=catalog_store, maxsize: int = DEFAULT_MAXSIZE, tenants_dir: str = None):
+        """
+        Args:
+            tenants_dir: where overlays are read from; by default TENANTS_DIR
+                in the store's data directory, as it is when asked
+        """
+        self.store = store
+        self.maxsize = maxsize
+        self.tenants_dir = tenants_dir
+        # tenant -> [catalog, base, overlay mtime, next check, overlay bytes]
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # (base, ids of the objects reachable from it), for memory stats
+        self._base_ids = (None, set())
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, maxsize: int = None, tenants_dir: str = None):
+        """Resize the cache or read overlays from elsewhere, dropping what no longer fits."""
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if tenants_dir is not None and tenants_dir != self.tenants_dir:
+                self.tenants_dir = tenants_dir
+                self._data.clear()
+            self._evict()
+
+    def path(self, tenant: str) -> str:
+        """The overlay file of a tenant."""
+        tenants_dir = self.tenants_dir or os.path.join(self.store.data_dir, TENANTS_DIR)
+        return os.path.join(tenants_dir, f"{tenant}.json")
+
+    def get(self, tenant: str):
+        """The tenant's Catalog, or None if there is no such tenant."""
+        if not isinstance(tenant, str) or not TENANT_ID.match(tenant):
+            return None
+        base = self.store.current()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(tenant)
+            fresh = entry is not None and entry[1] is base and now < entry[3]
+            if fresh:
+                self._data.move_to_end(tenant)
+                self.hits += 1
+        if fresh:
+            metrics.inc('freezer_tenant_catalog_lookups_total', (('result', 'hit'),))
+            return entry[0]
+
+        # Built outside the lock: an overlay can take a while and other
+        # tenants shouldn't wait for it
+        path = self.path(tenant)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        next_check = now + self.store.check_interval
+        if entry is not None and entry[1] is base and entry[2] == mtime:
+            catalog = entry[0]
+            result = 'hit'
+        else:
+            catalog = self._build(tenant, path, base, mtime, entry)
+            result = 'miss'
+
+        with self._lock:
+            if result == 'hit':
+                self.hits += 1
+            else:
+                self.misses += 1
+            if catalog is None:
+                self._data.pop(tenant, None)
+            elif self.maxsize > 0:
+                self._data[tenant] = [catalog, base, mtime, next_check, None]
+                self._data.move_to_end(tenant)
+                self._evict()
+        metrics.inc('freezer_tenant_catalog_lookups_total', (('result', result),))
+        return catalog
+
+    def _build(self, tenant, path, base, mtime, entry):
+        if mtime is None:
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                changes = overlay_changes(json.load(f))
+        except (OSError, ValueError):
+            # A half-written overlay shouldn't take the tenant down; keep
+            # its last good catalog while the base is the same
+            if entry is not None and entry[1] is base:
+                logger.exception("Reading tenant %s failed, keeping %r", tenant, entry[0])
+                return entry[0]
+            logger.exception("Reading tenant %s failed", tenant)
+            return None
+        return apply_changes(base, changes, strict=False)
+
+    def clear(self):
+        """Drop every tenant catalog. Statistics are kept."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """
+        Current size, configuration and hit-rate counters, with memory use.
+
+        overlay_bytes approximates what the cached tenant catalogs hold
+        beyond the base snapshot they share (their own spirit categories,
+        brand indexes, cocktails and lookup dicts); response_bytes is the
+        serialized responses memoized on them.
+        """
+        with self._lock:
+            entries = list(self._data.values())
+            lookups = self.hits + self.misses
+            stats = {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+        stats["overlay_bytes"] = sum(self._overlay_bytes(entry) for entry in entries)
+        stats["response_bytes"] = sum(
+            len(body) for entry in entries for body, _ in list(entry[0].responses.values())
+        )
+        return stats
+
+    def _overlay_bytes(self, entry) -> int:
+        catalog, base = entry[0], entry[1]
+        if entry[4] is None:
+            if self._base_ids[0] is not base:
+                self._base_ids = (base, deep_size(base, {id(base.responses)})[1])
+            # Responses are counted separately and grow with use
+            size, _ = deep_size(catalog, self._base_ids[1] | {id(catalog.responses)})
+            entry[4] = size
+        return entry[4]
+
+    def _evict(self):
+        while len(self._data) > max(self.maxsize, 0):
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+
+tenant_catalogs = TenantCatalogs()
+
+# Tenant catalogs are built over a base snapshot; once it is replaced they
+# are only rebuilt on demand, so free them straight away
+catalog_store.subscribe(lambda catalog: tenant_catalogs.clear())
@@ -0,0 +1,186 @@
+"""
+Vectorized freezer cocktail calculator.
+
+Columnar counterpart of services.calculator for bulk workloads: computes N
+recipes in one NumPy pass. Each row is one recipe with up to K ingredients;
+parts and ABVs are (N, K) arrays (shorter recipes are padded with 0 parts)
+and targets are (N,) arrays or scalars.
+
+Results match calculate_recipe() exactly, including its rounding and the
+no-dilution branch (see tests/unit/test_vectorized.py).
+"""
+
+import numpy as np
+
+ML_PER_OZ = 29.5735
+
+# How close to a .5 tie a scaled value must be before it is re-rounded with
+# Python's round(), which rounds the exact binary value rather than x * 10**n
+_TIE_TOLERANCE = 1e-6
+
+
+def round_like_python(values, ndigits: int) -> np.ndarray:
+    """
+    Round an array exactly like the builtin round(x, ndigits).
+
+    np.round scales by 10**ndigits first, which can land on the other side of
+    a .5 tie than Python's correctly-rounded result. Values close enough to a
+    tie for that to matter are handed to round() individually.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+
+    with np.errstate(invalid='ignore'):
+        ties = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < _TIE_TOLERANCE
+    if ties.any():
+        rounded[ties] = [round(v, ndigits) for v in values[ties].tolist()]
+    return rounded
+
+
+def ml_to_oz(ml) -> np.ndarray:
+    """Convert milliliters to fluid ounces, rounded like calculator.ml_to_oz."""
+    return round_like_python(np.asarray(ml, dtype=np.float64) / ML_PER_OZ, 2)
+
+
+def calculate_initial_abvs(parts, abvs) -> tuple:
+    """
+    Weighted average ABV of each row.
+
+    Columns are summed left to right, in the same order calculate_initial_abv
+    sums a recipe dict, so the floating point results are identical.
+
+    Returns:
+        (initial_abv, total_parts) as (N,) arrays
+    """
+    parts, abvs = np.broadcast_arrays(
+        np.atleast_2d(np.asarray(parts, dtype=np.float64)),
+        np.atleast_2d(np.asarray(abvs, dtype=np.float64)),
+    )
+    total_parts = np.zeros(parts.shape[0])
+    weighted_abv = np.zeros(parts.shape[0])
+    for k in range(parts.shape[1]):
+        total_parts = total_parts + parts[:, k]
+        weighted_abv = weighted_abv + parts[:, k] * abvs[:, k]
+
+    initial_abv = np.divide(
+        weighted_abv, total_parts,
+        out=np.zeros_like(weighted_abv), where=total_parts != 0,
+    )
+    return initial_abv, total_parts
+
+
+def calculate_recipes(parts, abvs, target_volume_ml, target_abv) -> dict:
+    """
+    Calculate N freezer cocktail recipes at once.
+
+    Args:
+        parts: (N, K) or (K,) ingredient parts
+        abvs: (N, K) or (K,) ABV percentage of each ingredient
+        target_volume_ml: (N,) or scalar desired final batch volume in ml
+        target_abv: (N,) or scalar target ABV percentage
+
+    Returns:
+        dict of arrays, with the same rounding as calculate_recipe():
+        - ingredients: (N, K) amount of each ingredient in ml
+        - water_ml, initial_abv, final_abv, total_volume_ml: (N,)
+        - spirit_volume_ml: (N,) unrounded total of the ingredients
+        - diluted: (N,) False where no water is needed
+    """
+    parts = np.atleast_2d(np.asarray(parts, dtype=np.float64))
+    abvs = np.atleast_2d(np.asarray(abvs, dtype=np.float64))
+    rows = max(
+        parts.shape[0], abvs.shape[0],
+        np.size(target_volume_ml), np.size(target_abv),
+    )
+    parts = np.broadcast_to(parts, (rows, parts.shape[1]))
+    abvs = np.broadcast_to(abvs, (rows, parts.shape[1]))
+    target_volume_ml = np.broadcast_to(np.asarray(target_volume_ml, dtype=np.float64), (rows,))
+    target_abv = np.broadcast_to(np.asarray(target_abv, dtype=np.float64), (rows,))
+
+    initial_abv, total_parts = calculate_initial_abvs(parts, abvs)
+    diluted = target_abv < initial_abv
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # spirit_volume = target_volume * target_abv / initial_abv
+        spirit_volume_ml = np.where(
+            diluted, target_volume_ml * target_abv / initial_abv, target_volume_ml
+        )
+        scale_factor = np.divide(
+            spirit_volume_ml, total_parts,
+            out=np.zeros_like(spirit_volume_ml), where=total_parts > 0,
+        )
+    water_ml = np.where(diluted, target_volume_ml - spirit_volume_ml, 0.0)
+
+    # Undiluted recipes are only scaled, and the scalar code leaves those
+    # ingredient amounts unrounded
+    scaled = parts * scale_factor[:, None]
+    ingredients = np.where(diluted[:, None], round_like_python(scaled, 1), scaled)
+
+    rounded_initial = round_like_python(initial_abv, 1)
+    return {
+        "ingredients": ingredients,
+        "water_ml": round_like_python(water_ml, 1),
+        "initial_abv": rounded_initial,
+        "final_abv": np.where(diluted, round_like_python(target_abv, 1), rounded_initial),
+        "total_volume_ml": round_like_python(target_volume_ml, 1),
+        "spirit_volume_ml": spirit_volume_ml,
+        "diluted": diluted,
+    }
+
+
+def pack_recipes(recipe_ingredients: list, spirit_abvs: list) -> tuple:
+    """
+    Pack recipe dicts into the columnar layout.
+
+    Args:
+        recipe_ingredients: list of ingredient -> parts dicts
+        spirit_abvs: list of ingredient -> ABV dicts, one per recipe (missing
+            ingredients are 0%, as in calculate_initial_abv)
+
+    Returns:
+        (names, parts, abvs) where names[i] lists row i's ingredients in
+        column order and parts/abvs are zero-padded (N, K) arrays
+    """
+    names = [list(ingredients) for ingredients in recipe_ingredients]
+    width = max((len(row) for row in names), default=0)
+    parts = np.zeros((len(names), width))
+    abvs = np.zeros((len(names), width))
+    for i, (ingredients, row_abvs) in enumerate(zip(recipe_ingredients, spirit_abvs)):
+        for k, (ingredient, amount) in enumerate(ingredients.items()):
+            parts[i, k] = amount
+            abvs[i, k] = row_abvs.get(ingredient, 0)
+    return names, parts, abvs
+
+
+def recipe_dicts(result: dict, names: list) -> list:
+    """
+    Convert calculate_recipes() output back to calculate_recipe() dicts.
+
+    Args:
+        result: output of calculate_recipes()
+        names: ingredient names per row, as returned by pack_recipes() (a
+            single list applies to every row)
+    """
+    rows = len(result["water_ml"])
+    if names and not isinstance(names[0], (list, tuple)):
+        names = [names] * rows
+
+    ingredients = result["ingredients"].tolist()
+    water_ml = result["water_ml"].tolist()
+    initial_abv = result["initial_abv"].tolist()
+    final_abv = result["final_abv"].tolist()
+    total_volume_ml = result["total_volume_ml"].tolist()
+    diluted = result["diluted"].tolist()
+
+    return [
+        {
+            "ingredients": dict(zip(names[i], ingredients[i])),
+            "water_ml": water_ml[i] if diluted[i] else 0,
+            "initial_abv": initial_abv[i],
+            "final_abv": final_abv[i],
+            "total_volume_ml": total_volume_ml[i],
+        }
+        for i in range(rows)
+    ]
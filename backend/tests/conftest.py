@@ -7,13 +7,13 @@ import os
 # Add backend directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import app as flask_app
+from app import create_app
 
 
 @pytest.fixture
 def app():
     """Create application for testing."""
-    flask_app.config.update({
+    flask_app = create_app({
         "TESTING": True,
     })
     yield flask_app
@@ -0,0 +1,103 @@
+"""Integration tests for the catalog admin API."""
+
+import json
+import shutil
+
+import pytest
+from app import create_app
+from services.catalog import DATA_DIR, catalog_store
+
+TOKEN = "s3cret"
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    shutil.copytree(DATA_DIR, tmp_path / "data")
+    catalog_store.configure(data_dir=str(tmp_path / "data"))
+    yield tmp_path / "data"
+    catalog_store.configure(data_dir=DATA_DIR)
+
+
+@pytest.fixture
+def admin_client(data_dir):
+    return create_app({"TESTING": True, "ADMIN_TOKEN": TOKEN, "ADMISSION_ENABLED": False}).test_client()
+
+
+class TestAdminAuth:
+    """Tests for enabling and authenticating the admin API."""
+
+    def test_disabled_without_token(self, client):
+        """Without ADMIN_TOKEN the routes don't exist."""
+        assert client.get('/api/admin/journal', headers=AUTH).status_code == 404
+
+    @pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer wrong"}, {"Authorization": TOKEN}])
+    def test_rejects_bad_credentials(self, admin_client, headers):
+        """Missing or wrong bearer tokens get a 401 challenge."""
+        response = admin_client.put('/api/admin/spirits/gin/Plymouth', json={"abv": 41.2}, headers=headers)
+        assert response.status_code == 401
+        assert response.headers['WWW-Authenticate'] == 'Bearer'
+
+
+class TestAdminEdits:
+    """Tests for editing the catalog through the admin API."""
+
+    def test_put_spirit_is_served_at_once(self, admin_client):
+        """A new brand is in the next catalog response and calculation."""
+        before = admin_client.get('/api/spirits/gin')
+        response = admin_client.put('/api/admin/spirits/gin/Sipsmith', json={"abv": 41.6}, headers=AUTH)
+        assert response.status_code == 200
+        assert response.get_json()["change"] == {
+            "op": "put_spirit", "category": "gin", "brand": "Sipsmith", "abv": 41.6,
+        }
+
+        after = admin_client.get('/api/spirits/gin')
+        assert after.get_json()[-1] == {"brand": "Sipsmith", "abv": 41.6}
+        assert after.headers['ETag'] != before.headers['ETag']
+
+        result = admin_client.post('/api/calculate', json={
+            "cocktail": "martini", "variation": "classic",
+            "spirits": {"gin": "Sipsmith", "vermouth_dry": "Dolin Dry"},
+            "target_volume_ml": 750, "target_abv": 20,
+        }).get_json()
+        assert result["initial_abv"] == round((2.4 * 41.6 + 0.6 * 17.5) / 3, 1)
+
+    def test_variations_and_presets(self, admin_client):
+        """Variations and presets can be added and removed."""
+        response = admin_client.put('/api/admin/cocktails/martini/variations/bone_dry', headers=AUTH, json={
+            "name": "Bone Dry (10:1)", "ingredients": {"gin": 3, "vermouth_dry": 0.3},
+        })
+        assert response.status_code == 200
+        cocktail = admin_client.get('/api/cocktails/martini').get_json()
+        assert cocktail["variations"]["bone_dry"] == {"name": "Bone Dry (10:1)", "ingredients": ["gin", "vermouth_dry"]}
+
+        assert admin_client.delete('/api/admin/cocktails/martini/presets/strong', headers=AUTH).status_code == 200
+        assert "strong" not in admin_client.get('/api/cocktails/martini').get_json()["presets"]
+
+    @pytest.mark.parametrize("method, path, body, status", [
+        ("put", "/api/admin/spirits/gin/Sipsmith", {"abv": "strong"}, 400),
+        ("delete", "/api/admin/spirits/gin/Sipsmith", None, 404),
+        ("put", "/api/admin/cocktails/gimlet/variations/classic", {"name": "X", "ingredients": {"gin": 1}}, 404),
+        ("put", "/api/admin/cocktails/martini/variations/x", {"name": "X", "ingredients": {"gim": 1}}, 400),
+        ("delete", "/api/admin/cocktails/martini/presets/extra", None, 404),
+    ])
+    def test_invalid_edits(self, admin_client, method, path, body, status):
+        """Invalid edits are rejected and change nothing."""
+        version = admin_client.get('/api/admin/journal', headers=AUTH).get_json()["catalog_version"]
+        response = getattr(admin_client, method)(path, json=body, headers=AUTH)
+        assert response.status_code == status
+        assert "error" in response.get_json()
+        assert admin_client.get('/api/admin/journal', headers=AUTH).get_json()["catalog_version"] == version
+
+    def test_journal_and_compaction(self, admin_client, data_dir):
+        """Edits are journaled, then compacted into the data files."""
+        admin_client.put('/api/admin/spirits/gin/Sipsmith', json={"abv": 41.6}, headers=AUTH)
+        catalog_store.flush()
+        before = admin_client.get('/api/admin/journal', headers=AUTH).get_json()
+        assert (before["pending"], before["journal_entries"]) == (0, 1)
+
+        after = admin_client.post('/api/admin/journal/compact', headers=AUTH).get_json()
+        assert after["journal_entries"] == 0
+        assert after["compactions"] == before["compactions"] + 1
+        with open(data_dir / "spirits.json") as f:
+            assert {"brand": "Sipsmith", "abv": 41.6} in json.load(f)["gin"]
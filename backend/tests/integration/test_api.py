@@ -114,6 +114,137 @@ class TestGetSpiritsByCategory:
         assert "error" in data
 
 
+class TestSpiritSearch:
+    """Tests for GET /api/spirits/search endpoint."""
+
+    def test_prefix_match_ranks_first(self, client):
+        """A brand starting with the query comes first."""
+        response = client.get('/api/spirits/search?q=tanq')
+        assert response.status_code == 200
+        assert response.get_json()[0] == {"brand": "Tanqueray", "category": "gin", "abv": 47.3}
+
+    def test_case_and_accent_insensitive(self, client):
+        """Case and accents in the query are ignored."""
+        plain = client.get('/api/spirits/search?q=cointreau').get_json()
+        assert client.get('/api/spirits/search?q=COINTR%C3%89AU').get_json() == plain
+        assert plain[0]["brand"] == "Cointreau"
+
+    def test_misspelling_still_matches(self, client):
+        """Close misspellings are matched by trigram similarity."""
+        data = client.get('/api/spirits/search?q=tanquerey').get_json()
+        assert data[0]["brand"] == "Tanqueray"
+
+    def test_category_filter(self, client):
+        """category limits results to one category."""
+        data = client.get('/api/spirits/search?q=b&category=gin&limit=50').get_json()
+        assert data
+        assert {item["category"] for item in data} == {"gin"}
+
+    def test_limit(self, client):
+        """At most `limit` results are returned."""
+        assert len(client.get('/api/spirits/search?q=e&limit=2').get_json()) == 2
+
+    def test_missing_query_returns_400(self, client):
+        """q is required and must not be blank."""
+        assert client.get('/api/spirits/search').status_code == 400
+        assert client.get('/api/spirits/search?q=%20').status_code == 400
+
+    def test_invalid_limit_returns_400(self, client):
+        """limit must be an integer from 1 to 50."""
+        for limit in ("0", "51", "ten"):
+            assert client.get(f'/api/spirits/search?q=gin&limit={limit}').status_code == 400
+
+    def test_unknown_category_returns_404(self, client):
+        """Filtering on an unknown category returns 404."""
+        response = client.get('/api/spirits/search?q=gin&category=unknown_category')
+        assert response.status_code == 404
+
+
+class TestCatalogResponseCaching:
+    """Tests for ETag/Cache-Control on the read-only catalog endpoints."""
+
+    ENDPOINTS = [
+        '/api/cocktails',
+        '/api/cocktails/martini',
+        '/api/spirits',
+        '/api/spirits/gin',
+        '/api/presets',
+    ]
+
+    @pytest.mark.parametrize('url', ENDPOINTS)
+    def test_sets_strong_etag_and_cache_control(self, client, url):
+        """Responses carry a strong ETag and Cache-Control."""
+        response = client.get(url)
+        assert response.status_code == 200
+
+        etag, weak = response.get_etag()
+        assert etag
+        assert not weak
+        assert 'max-age' in response.headers['Cache-Control']
+
+    @pytest.mark.parametrize('url', ENDPOINTS)
+    def test_if_none_match_returns_304(self, client, url):
+        """A matching If-None-Match gets an empty 304."""
+        etag = client.get(url).headers['ETag']
+
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+
+    def test_stale_etag_returns_full_body(self, client):
+        """A non-matching If-None-Match gets the full response."""
+        response = client.get('/api/spirits', headers={'If-None-Match': '"stale"'})
+        assert response.status_code == 200
+        assert "gin" in response.get_json()
+
+    def test_different_resources_have_different_etags(self, client):
+        """Each resource has its own ETag."""
+        gin = client.get('/api/spirits/gin').headers['ETag']
+        vodka = client.get('/api/spirits/vodka').headers['ETag']
+        assert gin != vodka
+
+    def test_body_is_serialized_once_per_catalog(self, client, monkeypatch):
+        """Repeated requests reuse the serialized body."""
+        import routes.api
+        import routes.tenants
+        from services.catalog import Catalog, load_recipes, load_spirits
+
+        fresh = Catalog(load_recipes(), load_spirits())
+        monkeypatch.setattr(routes.tenants, 'get_catalog', lambda: fresh)
+
+        calls = []
+        original = routes.api.cocktails_payload
+        monkeypatch.setattr(routes.api, 'cocktails_payload', lambda c: calls.append(c) or original(c))
+
+        first = client.get('/api/cocktails')
+        second = client.get('/api/cocktails')
+        assert len(calls) == 1
+        assert first.data == second.data
+
+    def test_new_catalog_version_changes_etag(self, client, monkeypatch):
+        """Changed data yields a new ETag, so old copies are not revalidated."""
+        import routes.tenants
+        from services.catalog import Catalog, load_recipes, load_spirits
+
+        etag = client.get('/api/spirits/gin').headers['ETag']
+
+        spirits = load_spirits()
+        spirits['gin'].append({"brand": "New Gin", "abv": 40})
+        monkeypatch.setattr(routes.tenants, 'get_catalog', lambda: Catalog(load_recipes(), spirits))
+
+        response = client.get('/api/spirits/gin', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert response.get_json()[-1]["brand"] == "New Gin"
+
+    def test_unknown_resources_are_not_cached(self, client):
+        """404s are not given an ETag."""
+        response = client.get('/api/spirits/unknown_category')
+        assert response.status_code == 404
+        assert 'ETag' not in response.headers
+
+
 class TestPostCalculate:
     """Tests for POST /api/calculate endpoint."""
 
@@ -167,6 +298,32 @@ class TestPostCalculate:
         data = response.get_json()
         assert "error" in data
 
+    def test_non_numeric_target_returns_400(self, client):
+        """Non-numeric volume or ABV returns 400."""
+        response = client.post('/api/calculate', json={
+            "cocktail": "martini",
+            "variation": "classic",
+            "spirits": {},
+            "target_volume_ml": "750",
+            "target_abv": 24
+        })
+        assert response.status_code == 400
+
+        data = response.get_json()
+        assert "error" in data
+
+    @pytest.mark.parametrize("field, value", [
+        ("target_abv", -1), ("target_abv", 0), ("target_abv", 101),
+        ("target_volume_ml", 0), ("target_volume_ml", 10**400), ("target_volume_ml", -750),
+    ])
+    def test_out_of_range_target_returns_400(self, client, field, value):
+        """Targets must be above 0 and within their limit."""
+        payload = {"cocktail": "martini", "variation": "classic", "spirits": {},
+                   "target_volume_ml": 750, "target_abv": 24}
+        response = client.post('/api/calculate', json=dict(payload, **{field: value}))
+        assert response.status_code == 400
+        assert field in response.get_json()["error"]
+
     def test_unknown_cocktail_returns_404(self, client):
         """Unknown cocktail returns 404."""
         response = client.post('/api/calculate', json={
@@ -234,6 +391,637 @@ class TestPostCalculate:
         assert "spirit_brands" in data
         assert data["spirit_brands"]["gin"] == "Tanqueray"
 
+    def test_selected_brand_abv_is_used(self, client):
+        """The selected brand's ABV drives the initial ABV."""
+        response = client.post('/api/calculate', json={
+            "cocktail": "martini",
+            "variation": "classic",
+            "spirits": {
+                "gin": "Plymouth",
+                "vermouth_dry": "Dolin Dry"
+            },
+            "target_volume_ml": 750,
+            "target_abv": 24
+        })
+
+        data = response.get_json()
+        # (2.4 * 41.2 + 0.6 * 17.5) / 3.0
+        assert data["initial_abv"] == 36.5
+
+    def test_unknown_brand_defaults_to_first_in_category(self, client):
+        """Unknown brands fall back to the first brand in the category."""
+        payload = {
+            "cocktail": "martini",
+            "variation": "classic",
+            "spirits": {
+                "gin": "Not A Real Gin",
+                "vermouth_dry": "Dolin Dry"
+            },
+            "target_volume_ml": 750,
+            "target_abv": 24
+        }
+        unknown = client.post('/api/calculate', json=payload).get_json()
+        payload["spirits"]["gin"] = "Tanqueray"
+        first = client.post('/api/calculate', json=payload).get_json()
+
+        assert unknown["initial_abv"] == first["initial_abv"]
+        assert unknown["ingredients"] == first["ingredients"]
+
+
+class TestPostCalculateBatch:
+    """Tests for POST /api/calculate/batch endpoint."""
+
+    MARTINI = {
+        "cocktail": "martini",
+        "variation": "classic",
+        "spirits": {
+            "gin": "Tanqueray",
+            "vermouth_dry": "Dolin Dry"
+        },
+        "target_volume_ml": 750,
+        "target_abv": 24
+    }
+
+    def test_results_match_single_calculations(self, client):
+        """Each batch result equals the single-request result."""
+        negroni = {
+            "cocktail": "negroni",
+            "variation": "classic",
+            "spirits": {"gin": "Beefeater", "campari": "Campari", "vermouth_sweet": "Dolin Rouge"},
+            "target_volume_ml": 1000,
+            "target_abv": 22
+        }
+        response = client.post('/api/calculate/batch', json=[self.MARTINI, negroni])
+        assert response.status_code == 200
+
+        data = response.get_json()
+        assert len(data) == 2
+        for payload, item in zip([self.MARTINI, negroni], data):
+            assert item["status"] == 200
+            assert item["result"] == client.post('/api/calculate', json=payload).get_json()
+
+    def test_bad_items_fail_individually(self, client):
+        """Bad items report their own errors without failing the batch."""
+        response = client.post('/api/calculate/batch', json=[
+            {"cocktail": "martini"},
+            dict(self.MARTINI, cocktail="unknown_cocktail"),
+            self.MARTINI,
+            dict(self.MARTINI, target_abv="strong"),
+            "not an object",
+        ])
+        assert response.status_code == 200
+
+        statuses = [item["status"] for item in response.get_json()]
+        assert statuses == [400, 404, 200, 400, 400]
+        assert "error" in response.get_json()[0]
+
+    def test_out_of_range_items_fail_individually(self, client):
+        """Targets the calculator can't handle only fail their own entry."""
+        response = client.post('/api/calculate/batch', json=[
+            dict(self.MARTINI, spirits={}, target_abv=-1),
+            dict(self.MARTINI, target_volume_ml=10**400),
+            self.MARTINI,
+        ])
+        assert [item["status"] for item in response.get_json()] == [400, 400, 200]
+
+    def test_calculation_errors_fail_individually(self, client, monkeypatch):
+        """An item the calculator fails on still lets the rest come back."""
+        import routes.api
+
+        build = routes.api.build_calculation
+
+        def build_calculation(data, catalog):
+            if data["target_volume_ml"] == 500:
+                raise ZeroDivisionError("float division by zero")
+            return build(data, catalog)
+
+        monkeypatch.setattr(routes.api, 'build_calculation', build_calculation)
+        response = client.post('/api/calculate/batch', json=[dict(self.MARTINI, target_volume_ml=500), self.MARTINI])
+        assert response.status_code == 200
+        assert [item["status"] for item in response.get_json()] == [400, 200]
+
+    def test_empty_batch_returns_empty_list(self, client):
+        """An empty batch is valid."""
+        response = client.post('/api/calculate/batch', json=[])
+        assert response.status_code == 200
+        assert response.get_json() == []
+
+    def test_non_array_body_returns_400(self, client):
+        """The body must be an array of payloads."""
+        response = client.post('/api/calculate/batch', json=self.MARTINI)
+        assert response.status_code == 400
+        assert "error" in response.get_json()
+
+    def test_oversized_batch_returns_413(self, client):
+        """Batches over the size limit are rejected."""
+        from routes.api import MAX_BATCH_SIZE
+
+        response = client.post('/api/calculate/batch', json=[self.MARTINI] * (MAX_BATCH_SIZE + 1))
+        assert response.status_code == 413
+
+
+class TestPostCalculateSweep:
+    """Tests for POST /api/calculate/sweep endpoint."""
+
+    PAYLOAD = {
+        "cocktail": "martini",
+        "variation": "classic",
+        "spirits": {
+            "gin": "Tanqueray",
+            "vermouth_dry": "Dolin Dry"
+        },
+        "target_volume_ml": [750, 1000],
+        "target_abv": {"start": 20, "stop": 40, "step": 0.5}
+    }
+
+    @staticmethod
+    def parse(response):
+        import json
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def test_streams_ndjson_grid(self, client):
+        """Returns one NDJSON line per grid point."""
+        response = client.post('/api/calculate/sweep', json=self.PAYLOAD)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.is_streamed
+
+        rows = self.parse(response)
+        assert len(rows) == 2 * 41
+        assert rows[0]["target_volume_ml"] == 750
+        assert rows[-1]["target_abv"] == 40
+
+    def test_rows_match_calculate(self, client):
+        """Sweep rows agree with /api/calculate for the same inputs."""
+        rows = self.parse(client.post('/api/calculate/sweep', json=self.PAYLOAD))
+        for row in rows[::10]:
+            single = client.post('/api/calculate', json=dict(
+                self.PAYLOAD, target_volume_ml=row["target_volume_ml"], target_abv=row["target_abv"]
+            )).get_json()
+            for field in ("ingredients", "ingredients_oz", "water_ml", "water_oz",
+                          "initial_abv", "final_abv", "total_volume_ml", "total_volume_oz"):
+                assert row[field] == single[field]
+
+    def test_unknown_variation_returns_404(self, client):
+        """Unknown variation returns 404 before streaming."""
+        response = client.post('/api/calculate/sweep', json=dict(self.PAYLOAD, variation="unknown"))
+        assert response.status_code == 404
+        assert "error" in response.get_json()
+
+    def test_bad_range_returns_400(self, client):
+        """A malformed range returns 400."""
+        response = client.post('/api/calculate/sweep', json=dict(
+            self.PAYLOAD, target_abv={"start": 40, "stop": 20, "step": 1}
+        ))
+        assert response.status_code == 400
+        assert "error" in response.get_json()
+
+    @pytest.mark.parametrize("field, spec", [
+        ("target_abv", [-1, 0, 24]),
+        ("target_volume_ml", {"start": 0, "stop": 750, "step": 250}),
+    ])
+    def test_non_positive_targets_return_400(self, client, field, spec):
+        """Zero or negative targets are rejected before streaming."""
+        response = client.post('/api/calculate/sweep', json=dict(self.PAYLOAD, spirits={}, **{field: spec}))
+        assert response.status_code == 400
+        assert field in response.get_json()["error"]
+
+    def test_oversized_grid_returns_413(self, client):
+        """Grids over the row limit are rejected."""
+        response = client.post('/api/calculate/sweep', json=dict(
+            self.PAYLOAD,
+            target_volume_ml={"start": 1, "stop": 1000, "step": 1},
+            target_abv={"start": 1, "stop": 200, "step": 1}
+        ))
+        assert response.status_code == 413
+
+
+class TestPostCalculateCompare:
+    """Tests for POST /api/calculate/compare endpoint."""
+
+    PAYLOAD = {
+        "cocktail": "martini",
+        "variation": "classic",
+        "target_volume_ml": 750,
+        "target_abv": 24
+    }
+
+    def test_every_brand_combination(self, client):
+        """Without spirits, every brand of every spirit ingredient is compared."""
+        from services.catalog import get_catalog
+
+        spirits = get_catalog().spirits
+        data = client.post('/api/calculate/compare', json=self.PAYLOAD).get_json()
+        assert data["axes"] == ["gin", "vermouth_dry"]
+        assert data["brands"]["gin"] == list(dict.fromkeys(spirits["gin"].brands))
+        assert data["shape"] == [len(data["brands"]["gin"]), len(data["brands"]["vermouth_dry"])]
+        assert data["strides"] == [data["shape"][1], 1]
+        assert len(data["columns"]["water_ml"]) == data["shape"][0] * data["shape"][1]
+
+    def test_rows_match_calculate(self, client):
+        """Every row agrees with /api/calculate for its brands."""
+        spirits = {"gin": ["Tanqueray", "Plymouth"], "vermouth_dry": ["Dolin Dry", "Noilly Prat Extra Dry"]}
+        data = client.post('/api/calculate/compare', json=dict(self.PAYLOAD, spirits=spirits)).get_json()
+        assert data["shape"] == [2, 2]
+        columns = data["columns"]
+        for gin, vermouth in [(0, 0), (0, 1), (1, 0), (1, 1)]:
+            row = gin * data["strides"][0] + vermouth * data["strides"][1]
+            single = client.post('/api/calculate', json=dict(self.PAYLOAD, spirits={
+                "gin": data["brands"]["gin"][gin], "vermouth_dry": data["brands"]["vermouth_dry"][vermouth],
+            })).get_json()
+            for field in ("ingredients", "ingredients_oz"):
+                assert {name: column[row] for name, column in columns[field].items()} == single[field]
+            for field in ("water_ml", "water_oz", "initial_abv", "final_abv"):
+                assert columns[field][row] == single[field]
+            assert data["total_volume_ml"] == single["total_volume_ml"]
+            assert data["total_volume_oz"] == single["total_volume_oz"]
+
+    def test_fixed_brand(self, client):
+        """A single brand holds that ingredient fixed."""
+        data = client.post('/api/calculate/compare', json=dict(
+            self.PAYLOAD, spirits={"vermouth_dry": "Dolin Dry"}
+        )).get_json()
+        assert data["brands"]["vermouth_dry"] == ["Dolin Dry"]
+        assert data["shape"][1] == 1
+
+    @pytest.mark.parametrize("spirits, status", [
+        ({"gin": ["Nope"]}, 400),
+        ({"gin": "Nope"}, 400),
+        ({"gin": {"a": 1}}, 400),
+        ({"vodka": ["Absolut"]}, 400),
+        ({"gin": []}, 400),
+        ([], 400),
+    ])
+    def test_invalid_selections(self, client, spirits, status):
+        """Unknown brands and ingredients are rejected."""
+        response = client.post('/api/calculate/compare', json=dict(self.PAYLOAD, spirits=spirits))
+        assert response.status_code == status
+        assert "error" in response.get_json()
+
+    def test_unknown_variation_returns_404(self, client):
+        """Unknown variation returns 404."""
+        response = client.post('/api/calculate/compare', json=dict(self.PAYLOAD, variation="unknown"))
+        assert response.status_code == 404
+
+    def test_empty_category_returns_400(self, client, monkeypatch):
+        """A category with no brands to compare is named in a 400."""
+        import routes.tenants
+        from services.catalog import Catalog, load_recipes, load_spirits
+
+        spirits = dict(load_spirits(), vermouth_dry=[])
+        monkeypatch.setattr(routes.tenants, 'get_catalog', lambda: Catalog(load_recipes(), spirits))
+
+        response = client.post('/api/calculate/compare', json=self.PAYLOAD)
+        assert response.status_code == 400
+        assert "'vermouth_dry'" in response.get_json()["error"]
+
+    def test_oversized_comparison_returns_413(self, client, monkeypatch):
+        """Comparisons over the row limit are rejected."""
+        import routes.api
+
+        monkeypatch.setattr(routes.api, 'MAX_COMPARISON_ROWS', 3)
+        response = client.post('/api/calculate/compare', json=self.PAYLOAD)
+        assert response.status_code == 413
+
+
+class TestPostCalculateMaxVolume:
+    """Tests for POST /api/calculate/max-volume endpoint."""
+
+    PAYLOAD = {
+        "cocktail": "martini",
+        "variation": "classic",
+        "spirits": {
+            "gin": "Tanqueray",
+            "vermouth_dry": "Dolin Dry"
+        },
+        "target_abv": 24
+    }
+
+    def test_single_inventory(self, client):
+        """Returns the largest batch and its recipe."""
+        response = client.post('/api/calculate/max-volume', json=dict(
+            self.PAYLOAD, inventory={"gin": 700, "vermouth_dry": 375}
+        ))
+        assert response.status_code == 200
+
+        data = response.get_json()
+        assert data["limiting_ingredient"] == "gin"
+        assert data["total_volume_ml"] == data["max_volume_ml"]
+        assert 699.9 <= data["ingredients"]["gin"] <= 700
+        assert data["remaining_ml"]["vermouth_dry"] == pytest.approx(
+            375 - data["ingredients"]["vermouth_dry"], abs=0.1
+        )
+        assert data["cocktail_name"] == "Martini"
+
+    def test_matches_calculate(self, client):
+        """The recipe is what /api/calculate gives at the maximum volume."""
+        data = client.post('/api/calculate/max-volume', json=dict(
+            self.PAYLOAD, inventory={"gin": 1000, "vermouth_dry": 100}
+        )).get_json()
+        single = client.post('/api/calculate', json=dict(
+            self.PAYLOAD, target_volume_ml=data["max_volume_ml"]
+        )).get_json()
+        for field in ("ingredients", "water_ml", "initial_abv", "final_abv", "total_volume_ml"):
+            assert data[field] == single[field]
+
+    def test_many_inventories(self, client):
+        """Each inventory gets its own entry; a bad one only fails itself."""
+        response = client.post('/api/calculate/max-volume', json=dict(self.PAYLOAD, inventories=[
+            {"gin": 700, "vermouth_dry": 375},
+            {"gin": 700, "vermouth_dry": 20},
+            {"gin": -1},
+            {"olive_brine": 100},
+        ]))
+        assert response.status_code == 200
+
+        results = response.get_json()
+        assert [entry["status"] for entry in results] == [200, 200, 400, 400]
+        assert results[0]["result"]["limiting_ingredient"] == "gin"
+        assert results[1]["result"]["limiting_ingredient"] == "vermouth_dry"
+        assert "error" in results[2]
+
+    def test_overflowing_inventory_returns_400(self, client):
+        """Inventories too large to size a batch from are rejected."""
+        response = client.post('/api/calculate/max-volume', json=dict(self.PAYLOAD, inventory={"gin": 1e308}))
+        assert response.status_code == 400
+
+        response = client.post('/api/calculate/max-volume', json=dict(
+            self.PAYLOAD, inventories=[{"gin": 1e308}, {"gin": 700}]
+        ))
+        assert [entry["status"] for entry in response.get_json()] == [400, 200]
+
+    def test_tiny_target_abv_returns_400(self, client):
+        """A target ABV near 0% would need an unbounded batch."""
+        response = client.post('/api/calculate/max-volume', json=dict(
+            self.PAYLOAD, target_abv=1e-300, inventory={"gin": 700}
+        ))
+        assert response.status_code == 400
+
+    def test_never_uses_more_than_stock(self, client):
+        """Rounded amounts stay within fractional stock."""
+        data = client.post('/api/calculate/max-volume', json=dict(
+            self.PAYLOAD, inventory={"gin": 700.07}
+        )).get_json()
+        assert data["ingredients"]["gin"] <= 700.07
+        assert data["remaining_ml"]["gin"] >= 0
+
+    def test_requires_one_inventory_field(self, client):
+        """Exactly one of inventory or inventories is required."""
+        response = client.post('/api/calculate/max-volume', json=self.PAYLOAD)
+        assert response.status_code == 400
+        response = client.post('/api/calculate/max-volume', json=dict(
+            self.PAYLOAD, inventory={"gin": 700}, inventories=[]
+        ))
+        assert response.status_code == 400
+
+    def test_unknown_cocktail_returns_404(self, client):
+        """Unknown cocktail returns 404."""
+        response = client.post('/api/calculate/max-volume', json=dict(
+            self.PAYLOAD, cocktail="unknown", inventory={"gin": 700}
+        ))
+        assert response.status_code == 404
+
+    def test_too_many_inventories_returns_413(self, client):
+        """Inventory lists over the batch limit are rejected."""
+        from routes.api import MAX_BATCH_SIZE
+
+        response = client.post('/api/calculate/max-volume', json=dict(
+            self.PAYLOAD, inventories=[{"gin": 700}] * (MAX_BATCH_SIZE + 1)
+        ))
+        assert response.status_code == 413
+
+
+class TestCalculateCache:
+    """Tests for the calculate result cache and GET /api/calculate/cache."""
+
+    PAYLOAD = {
+        "cocktail": "manhattan",
+        "variation": "black",
+        "spirits": {"rye": "Rittenhouse", "amaro": "Averna", "angostura": "Angostura Bitters"},
+        "target_volume_ml": 700,
+        "target_abv": 31
+    }
+
+    def test_returns_statistics(self, client):
+        """Stats include hit/miss/eviction counters."""
+        response = client.get('/api/calculate/cache')
+        assert response.status_code == 200
+
+        data = response.get_json()
+        for field in ("hits", "misses", "evictions", "size", "maxsize", "hit_rate", "catalog_version"):
+            assert field in data
+
+    def test_repeated_request_is_a_hit(self, client):
+        """The second identical request is served from the cache."""
+        from services.result_cache import calculation_cache
+
+        calculation_cache.clear()
+        before = client.get('/api/calculate/cache').get_json()
+
+        first = client.post('/api/calculate', json=self.PAYLOAD).get_json()
+        second = client.post('/api/calculate', json=self.PAYLOAD).get_json()
+
+        after = client.get('/api/calculate/cache').get_json()
+        assert first == second
+        assert after["hits"] - before["hits"] == 1
+        assert after["misses"] - before["misses"] == 1
+
+    def test_cached_result_matches_fresh_calculation(self, client, monkeypatch):
+        """A hit returns exactly what a fresh calculation would."""
+        from services.result_cache import calculation_cache
+
+        cached = client.post('/api/calculate', json=self.PAYLOAD).get_json()
+        monkeypatch.setattr(calculation_cache, 'maxsize', 0)
+        calculation_cache.clear()
+        fresh = client.post('/api/calculate', json=self.PAYLOAD).get_json()
+        assert cached == fresh
+
+    def test_hits_echo_the_request(self, client, monkeypatch):
+        """A hit echoes the volume, ABV and selections as this request sent them."""
+        from routes.api import build_calculation
+        from services.catalog import get_catalog
+        from services.result_cache import calculation_cache
+
+        other = dict(self.PAYLOAD, target_volume_ml=700.0, target_abv=31.0,
+                     spirits=dict(reversed(self.PAYLOAD["spirits"].items())))
+        client.post('/api/calculate', json=self.PAYLOAD)
+        cached = client.post('/api/calculate', json=other).data
+        body, _ = build_calculation(other, get_catalog())
+        assert list(body["spirit_brands"]) == list(other["spirits"])
+
+        monkeypatch.setattr(calculation_cache, 'maxsize', 0)
+        calculation_cache.clear()
+        assert cached == client.post('/api/calculate', json=other).data
+
+    def test_errors_are_not_cached(self, client):
+        """Failed calculations are not stored."""
+        from services.result_cache import calculation_cache
+
+        calculation_cache.clear()
+        client.post('/api/calculate', json=dict(self.PAYLOAD, variation="unknown"))
+        assert len(calculation_cache) == 0
+
+    def test_catalog_reload_clears_cache(self, client, tmp_path):
+        """Swapping in a new catalog empties the cache."""
+        import shutil
+        from services.catalog import DATA_DIR, catalog_store
+        from services.result_cache import calculation_cache
+
+        client.post('/api/calculate', json=self.PAYLOAD)
+        assert len(calculation_cache) > 0
+
+        shutil.copytree(DATA_DIR, tmp_path / "data")
+        try:
+            catalog_store.configure(data_dir=str(tmp_path / "data"))
+            catalog_store.current()
+            assert len(calculation_cache) == 0
+        finally:
+            catalog_store.configure(data_dir=DATA_DIR)
+
+
+class TestCalculationTable:
+    """/api/calculate answered from the precomputed calculation table."""
+
+    PAYLOADS = [
+        {
+            "cocktail": "martini",
+            "variation": "classic",
+            "spirits": {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"},
+            "target_volume_ml": 750,
+            "target_abv": 30
+        },
+        {
+            "cocktail": "martini",
+            "variation": "dirty",
+            "spirits": {"gin": "Plymouth", "vermouth_dry": "Noilly Prat Extra Dry", "olive_brine": "Olive Brine"},
+            "target_volume_ml": 750.0,
+            "target_abv": 32
+        },
+        {
+            "cocktail": "martini",
+            "variation": "classic",
+            "spirits": {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"},
+            "target_volume_ml": 600,
+            "target_abv": 30
+        },
+    ]
+
+    @pytest.fixture
+    def table_client(self, tmp_path, monkeypatch):
+        from app import create_app
+        from services.calculation_table import build_table, precomputed_results
+        from services.catalog import DATA_DIR
+
+        # Restored to no table after the test
+        for name, value in (('table', None), ('hits', 0), ('misses', 0)):
+            monkeypatch.setattr(precomputed_results, name, value)
+        build_table(DATA_DIR, str(tmp_path / "calculations.table"), volumes=(750,), workers=1)
+        return create_app({
+            "TESTING": True, "CALCULATION_TABLE": str(tmp_path / "calculations.table"),
+        }).test_client()
+
+    def test_responses_match_live(self, table_client, monkeypatch):
+        """Looked-up and calculated responses are byte-for-byte the same."""
+        from services.calculation_table import precomputed_results
+        from services.result_cache import calculation_cache
+
+        monkeypatch.setattr(calculation_cache, 'maxsize', 0)
+        calculation_cache.clear()
+        from_table = [table_client.post('/api/calculate', json=payload).data for payload in self.PAYLOADS]
+        assert precomputed_results.stats()["hits"] == 2
+
+        precomputed_results.table = None
+        live = [table_client.post('/api/calculate', json=payload).data for payload in self.PAYLOADS]
+        assert from_table == live
+
+    def test_stats(self, table_client, monkeypatch):
+        """Hits and misses of the table are reported with the cache stats."""
+        from services.result_cache import calculation_cache
+
+        monkeypatch.setattr(calculation_cache, 'maxsize', 0)
+        calculation_cache.clear()
+        for payload in self.PAYLOADS:
+            table_client.post('/api/calculate', json=payload)
+
+        stats = table_client.get('/api/calculate/cache').get_json()
+        assert stats["table"]["loaded"]
+        assert stats["table"]["catalog_version"] == stats["catalog_version"]
+        assert (stats["table"]["hits"], stats["table"]["misses"]) == (2, 1)
+
+
+class TestSqliteBackend:
+    """The API served from the SQLite catalog backend."""
+
+    def test_responses_match_json_backend(self, client, tmp_path):
+        """Switching backends doesn't change what the API returns."""
+        from services.catalog import DATA_DIR, catalog_store
+        from services.sqlite_catalog import main
+
+        paths = ['/api/cocktails', '/api/cocktails/martini', '/api/spirits', '/api/spirits/gin']
+        expected = {path: client.get(path).data for path in paths}
+
+        main([DATA_DIR, str(tmp_path / "catalog.db")])
+        try:
+            catalog_store.configure(data_dir=str(tmp_path), backend='sqlite')
+            for path in paths:
+                assert client.get(path).data == expected[path]
+        finally:
+            catalog_store.configure(data_dir=DATA_DIR, backend='json')
+
+
+class TestMetrics:
+    """Tests for GET /metrics."""
+
+    def test_exposes_prometheus_text(self, client):
+        """Metrics are served as Prometheus text."""
+        client.get('/api/presets')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert '# TYPE freezer_http_requests_total counter' in response.get_data(as_text=True)
+
+    def test_counts_requests_by_route_and_status(self, client):
+        """API requests are labelled with their URL rule and status."""
+        from services.metrics import registry
+
+        registry.reset()
+        client.get('/api/cocktails/martini')
+        client.get('/api/cocktails/negroni')
+        client.get('/api/cocktails/unknown')
+
+        text = client.get('/metrics').get_data(as_text=True)
+        route = 'route="/api/cocktails/<cocktail_id>"'
+        assert f'freezer_http_requests_total{{method="GET",{route},status="200"}} 2' in text
+        assert f'freezer_http_requests_total{{method="GET",{route},status="404"}} 1' in text
+        assert f'freezer_http_request_duration_seconds_count{{method="GET",{route}}} 3' in text
+
+    def test_times_calculate_recipe(self, client):
+        """calculate_recipe calls are timed."""
+        from services.metrics import registry
+        from services.result_cache import calculation_cache
+
+        registry.reset()
+        calculation_cache.clear()
+        client.post('/api/calculate', json={
+            "cocktail": "martini",
+            "variation": "dry",
+            "spirits": {"gin": "Ford's", "vermouth_dry": "Dolin Dry"},
+            "target_volume_ml": 500,
+            "target_abv": 27
+        })
+
+        text = client.get('/metrics').get_data(as_text=True)
+        assert 'freezer_calculate_recipe_seconds_count 1' in text
+
+    def test_non_api_routes_are_not_counted(self, client):
+        """Only api blueprint routes are instrumented."""
+        from services.metrics import registry
+
+        registry.reset()
+        client.get('/')
+        client.get('/metrics')
+        assert 'freezer_http_requests_total' not in client.get('/metrics').get_data(as_text=True)
+
 
 class TestGetPresets:
     """Tests for GET /api/presets endpoint."""
@@ -258,3 +1046,145 @@ class TestGetPresets:
             assert "name" in preset
             assert "abv" in preset
             assert isinstance(preset["abv"], (int, float))
+
+
+class TestAdmissionControl:
+    """Tests for admission control on the api blueprint."""
+
+    PAYLOAD = {
+        "cocktail": "martini",
+        "variation": "classic",
+        "spirits": {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"},
+        "target_volume_ml": 750,
+        "target_abv": 24
+    }
+
+    @staticmethod
+    def make_client(**limits):
+        from app import create_app
+
+        return create_app({"TESTING": True, "ADMISSION_LIMITS": limits}).test_client()
+
+    def test_rate_limited_route_returns_429(self):
+        """Requests over a client's rate get a 429 with Retry-After."""
+        client = self.make_client(**{'/api/calculate': {'rate': 0.5, 'burst': 2}})
+        statuses = [client.post('/api/calculate', json=self.PAYLOAD).status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+
+        response = client.post('/api/calculate', json=self.PAYLOAD)
+        assert response.get_json() == {"error": "Rate limit exceeded"}
+        assert int(response.headers['Retry-After']) >= 1
+
+    def test_catalog_reads_are_not_limited(self):
+        """An exhausted calculate limit doesn't affect catalog reads."""
+        client = self.make_client(**{'/api/calculate': {'rate': 0.1, 'burst': 1}})
+        client.post('/api/calculate', json=self.PAYLOAD)
+        assert client.post('/api/calculate', json=self.PAYLOAD).status_code == 429
+        assert all(client.get('/api/cocktails').status_code == 200 for _ in range(50))
+
+    def test_busy_route_returns_503(self):
+        """A route at its in-flight cap sheds with 503."""
+        client = self.make_client(**{'/api/calculate/batch': {'max_in_flight': 1}})
+        controller = client.application.extensions['admission']
+        controller.admit('/api/calculate/batch', 'someone-else')
+
+        response = client.post('/api/calculate/batch', json=[self.PAYLOAD])
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+
+        controller.release('/api/calculate/batch')
+        assert client.post('/api/calculate/batch', json=[self.PAYLOAD]).status_code == 200
+        assert controller.in_flight('/api/calculate/batch') == 0
+
+    def test_streamed_response_holds_its_slot(self):
+        """A sweep keeps its in-flight slot until its stream is closed."""
+        client = self.make_client(**{'/api/calculate/sweep': {'max_in_flight': 1}})
+        controller = client.application.extensions['admission']
+        payload = dict(self.PAYLOAD, target_abv={"start": 20, "stop": 30, "step": 1})
+
+        stream = client.post('/api/calculate/sweep', json=payload, buffered=False)
+        assert stream.status_code == 200
+        assert client.post('/api/calculate/sweep', json=payload).status_code == 503
+
+        stream.close()
+        assert controller.in_flight('/api/calculate/sweep') == 0
+        assert client.post('/api/calculate/sweep', json=payload).status_code == 200
+
+    def test_client_header(self):
+        """With ADMISSION_CLIENT_HEADER, clients are told apart by the header."""
+        from app import create_app
+
+        client = create_app({
+            "TESTING": True,
+            "ADMISSION_LIMITS": {'/api/calculate': {'rate': 0.1, 'burst': 1}},
+            "ADMISSION_CLIENT_HEADER": "X-Forwarded-For",
+        }).test_client()
+        for forwarded in ("10.0.0.1", "10.0.0.2, 172.16.0.1"):
+            response = client.post('/api/calculate', json=self.PAYLOAD, headers={'X-Forwarded-For': forwarded})
+            assert response.status_code == 200
+
+    def test_can_be_disabled(self):
+        """ADMISSION_ENABLED=False installs no limits."""
+        from app import create_app
+
+        client = create_app({"TESTING": True, "ADMISSION_ENABLED": False}).test_client()
+        assert 'admission' not in client.application.extensions
+
+
+class TestServerTiming:
+    """Tests for the Server-Timing breakdown of POST /api/calculate."""
+
+    PAYLOAD = {
+        "cocktail": "martini",
+        "variation": "classic",
+        "spirits": {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"},
+        "target_volume_ml": 733,
+        "target_abv": 24,
+    }
+
+    @staticmethod
+    def phases(response):
+        return [entry.split(';')[0] for entry in response.headers['Server-Timing'].split(', ')]
+
+    def test_phases_of_a_live_calculation(self, client):
+        """A cache miss reports every phase it went through."""
+        from services.result_cache import calculation_cache
+
+        calculation_cache.clear()
+        response = client.post('/api/calculate', json=self.PAYLOAD)
+        assert self.phases(response) == [
+            'parse', 'catalog', 'validate', 'cache', 'lookup', 'brands', 'calculate', 'convert', 'serialize', 'total',
+        ]
+        assert all(float(entry.split('dur=')[1]) >= 0 for entry in response.headers['Server-Timing'].split(', '))
+
+    def test_phases_of_a_cache_hit(self, client):
+        """A cached result skips the calculation phases."""
+        client.post('/api/calculate', json=self.PAYLOAD)
+        response = client.post('/api/calculate', json=self.PAYLOAD)
+        assert self.phases(response) == ['parse', 'catalog', 'validate', 'cache', 'serialize', 'total']
+
+    def test_invalid_request(self, client):
+        """Rejected payloads are timed up to validation."""
+        response = client.post('/api/calculate', json={})
+        assert response.status_code == 400
+        assert self.phases(response) == ['parse', 'catalog', 'validate', 'serialize', 'total']
+
+    def test_can_be_disabled(self):
+        """SERVER_TIMING=False sends no header."""
+        from app import create_app
+
+        client = create_app({"TESTING": True, "SERVER_TIMING": False}).test_client()
+        assert 'Server-Timing' not in client.post('/api/calculate', json=self.PAYLOAD).headers
+
+    def test_structured_log(self, caplog):
+        """SERVER_TIMING_LOG logs the phases as a record attribute."""
+        from app import create_app
+
+        client = create_app({"TESTING": True, "SERVER_TIMING": False, "SERVER_TIMING_LOG": True}).test_client()
+        with caplog.at_level('INFO', logger='freezer.timing'):
+            response = client.post('/api/calculate', json=self.PAYLOAD)
+        assert 'Server-Timing' not in response.headers
+        [record] = [record for record in caplog.records if record.name == 'freezer.timing']
+        assert record.route == '/api/calculate'
+        assert record.status == 200
+        assert set(record.timing) >= {'parse', 'validate', 'serialize', 'total'}
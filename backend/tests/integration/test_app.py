@@ -0,0 +1,119 @@
+"""Integration tests for the app factory and gunicorn configuration."""
+
+import os
+import runpy
+import signal
+
+import pytest
+from app import create_app
+from services.catalog import get_catalog
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestCreateApp:
+    """Tests for create_app."""
+
+    def test_returns_independent_apps(self):
+        """Each call builds a new app."""
+        assert create_app() is not create_app()
+
+    def test_applies_test_config(self):
+        """Config passed in is applied."""
+        assert create_app({"TESTING": True, "CATALOG_MAX_AGE": 5}).config["CATALOG_MAX_AGE"] == 5
+
+    def test_registers_api_routes(self):
+        """The api blueprint is mounted under /api."""
+        client = create_app({"TESTING": True}).test_client()
+        assert client.get('/api/presets').status_code == 200
+        assert client.get('/').status_code == 200
+
+    def test_prebuilds_catalog_responses(self):
+        """Catalog responses are serialized before the first request."""
+        create_app()
+        catalog = get_catalog()
+
+        assert ('cocktails',) in catalog.responses
+        assert ('spirits',) in catalog.responses
+        assert ('presets',) in catalog.responses
+        for cocktail_id in catalog.cocktails:
+            assert ('cocktail', cocktail_id) in catalog.responses
+        for category in catalog.spirits:
+            assert ('spirits', category) in catalog.responses
+
+
+class TestProbes:
+    """Tests for /healthz and /readyz."""
+
+    def test_healthz(self, client):
+        """Liveness is always ok and never cached."""
+        response = client.get('/healthz')
+        assert response.status_code == 200
+        assert response.get_json() == {"status": "ok"}
+        assert response.headers['Cache-Control'] == 'no-store'
+
+    def test_readyz_once_warmed(self, client):
+        """Ready once create_app has loaded and warmed the catalog."""
+        response = client.get('/readyz')
+        assert response.status_code == 200
+
+        data = response.get_json()
+        assert data["status"] == "ready"
+        assert data["catalog_version"] == get_catalog().version
+        assert data["catalog_source"] in ("snapshot", "json", "sqlite")
+
+    def test_readyz_before_catalog_loads(self, app, monkeypatch):
+        """Not ready while no catalog has been loaded."""
+        from services.catalog import catalog_store
+
+        monkeypatch.setattr(catalog_store, 'peek', lambda: None)
+        response = app.test_client().get('/readyz')
+        assert response.status_code == 503
+        assert response.get_json() == {"status": "starting"}
+
+    def test_readyz_before_warmup(self, app):
+        """Not ready until the responses are pre-serialized."""
+        app.config['CATALOG_WARMED'] = False
+        assert app.test_client().get('/readyz').status_code == 503
+
+
+class TestGunicornConfig:
+    """Tests for gunicorn.conf.py."""
+
+    def load(self, monkeypatch, **env):
+        # Keep the config's os.environ.setdefault from leaking out of the test
+        monkeypatch.setenv('METRICS_MULTIPROC_DIR', os.environ.get('METRICS_MULTIPROC_DIR', ''))
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        return runpy.run_path(os.path.join(BACKEND_DIR, 'gunicorn.conf.py'))
+
+    def test_preloads_app_by_default(self, monkeypatch):
+        """The app is loaded in the master before forking."""
+        monkeypatch.delenv('GUNICORN_PRELOAD', raising=False)
+        assert self.load(monkeypatch)['preload_app'] is True
+
+    def test_preload_can_be_disabled(self, monkeypatch):
+        """GUNICORN_PRELOAD=0 turns preloading off."""
+        assert self.load(monkeypatch, GUNICORN_PRELOAD='0')['preload_app'] is False
+
+    def test_port_and_workers_from_environment(self, monkeypatch):
+        """PORT, WEB_CONCURRENCY and GUNICORN_THREADS are honoured."""
+        config = self.load(monkeypatch, PORT='9000', WEB_CONCURRENCY='6', GUNICORN_THREADS='4')
+        assert config['bind'] == '0.0.0.0:9000'
+        assert config['workers'] == 6
+        assert config['threads'] == 4
+
+    @pytest.mark.skipif(not hasattr(signal, 'SIGUSR2'), reason="needs SIGUSR2")
+    def test_post_worker_init_reinstalls_reload_signal(self, monkeypatch):
+        """Workers get the SIGUSR2 catalog reload handler back after fork."""
+        from services.catalog import catalog_store
+
+        requested = []
+        monkeypatch.setattr(catalog_store, 'request_reload', lambda: requested.append(True))
+        previous = signal.signal(signal.SIGUSR2, signal.SIG_DFL)
+        try:
+            self.load(monkeypatch)['post_worker_init'](None)
+            os.kill(os.getpid(), signal.SIGUSR2)
+            assert requested == [True]
+        finally:
+            signal.signal(signal.SIGUSR2, previous)
@@ -0,0 +1,292 @@
+"""Integration tests for the ASGI entry point."""
+
+import asyncio
+import json
+
+import pytest
+from asgi import app as asgi_app
+
+
+def asgi_request(method, path, body=b'', headers=None, query=b''):
+    """Run one HTTP request through the ASGI app and collect the response."""
+    headers = dict(headers or {}, **{'Content-Length': str(len(body))})
+    headers = [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query,
+        'root_path': '',
+        'headers': headers,
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+
+    start = sent[0]
+    response_headers = {k.decode().lower(): v.decode() for k, v in start['headers']}
+    response_body = b''.join(m.get('body', b'') for m in sent[1:])
+    return start['status'], response_headers, response_body
+
+
+def post_json(path, payload):
+    return asgi_request('POST', path, json.dumps(payload).encode(), {'Content-Type': 'application/json'})
+
+
+CALCULATE_PAYLOAD = {
+    "cocktail": "martini",
+    "variation": "classic",
+    "spirits": {
+        "gin": "Tanqueray",
+        "vermouth_dry": "Dolin Dry"
+    },
+    "target_volume_ml": 750,
+    "target_abv": 24
+}
+
+
+class TestAsyncCatalogEndpoints:
+    """The async catalog handlers match the Flask routes."""
+
+    @pytest.mark.parametrize('path', [
+        '/api/cocktails',
+        '/api/cocktails/martini',
+        '/api/spirits',
+        '/api/spirits/gin',
+        '/api/presets',
+    ])
+    def test_same_body_and_etag_as_flask(self, client, path):
+        """Body and ETag are identical to the WSGI response."""
+        expected = client.get(path)
+        status, headers, body = asgi_request('GET', path)
+
+        assert status == 200
+        assert body == expected.data
+        assert headers['etag'] == expected.headers['ETag']
+        assert headers['cache-control'] == expected.headers['Cache-Control']
+        assert headers['content-type'] == 'application/json'
+        assert headers['access-control-allow-origin'] == '*'
+
+    @pytest.mark.parametrize('path', ['/api/cocktails/martini', '/api/spirits/gin', '/api/spirits/nope'])
+    def test_catalog_is_checked_off_the_event_loop(self, monkeypatch, path):
+        """get_catalog() runs in a worker thread, not on the loop."""
+        import threading
+
+        import asgi
+
+        threads = []
+
+        def get_catalog():
+            threads.append(threading.get_ident())
+            return catalog()
+
+        catalog = asgi.get_catalog
+        monkeypatch.setattr(asgi, 'get_catalog', get_catalog)
+        asgi_request('GET', path)
+        assert threads and threading.get_ident() not in threads
+
+    def test_if_none_match_returns_304(self):
+        """A matching If-None-Match gets an empty 304."""
+        _, headers, _ = asgi_request('GET', '/api/spirits')
+        status, _, body = asgi_request('GET', '/api/spirits', headers={'If-None-Match': headers['etag']})
+        assert status == 304
+        assert body == b''
+
+    def test_unknown_category_returns_404(self):
+        """Unknown category returns a JSON 404."""
+        status, _, body = asgi_request('GET', '/api/spirits/unknown_category')
+        assert status == 404
+        assert "error" in json.loads(body)
+
+    def test_cors_echoes_origin(self):
+        """Requests with an Origin get it echoed back, like flask-cors."""
+        _, headers, _ = asgi_request('GET', '/api/presets', headers={'Origin': 'http://localhost:5173'})
+        assert headers['access-control-allow-origin'] == 'http://localhost:5173'
+        assert headers['vary'] == 'Origin'
+
+
+class TestAsyncCalculate:
+    """The async calculate handler matches POST /api/calculate."""
+
+    def test_same_result_as_flask(self, client):
+        """The result equals the Flask endpoint's."""
+        status, _, body = post_json('/api/calculate', CALCULATE_PAYLOAD)
+        assert status == 200
+        assert json.loads(body) == client.post('/api/calculate', json=CALCULATE_PAYLOAD).get_json()
+
+    def test_errors_match_flask(self, client):
+        """Validation and lookup errors use the same statuses."""
+        for payload in ({"cocktail": "martini"}, dict(CALCULATE_PAYLOAD, cocktail="unknown")):
+            status, _, body = post_json('/api/calculate', payload)
+            assert status == client.post('/api/calculate', json=payload).status_code
+            assert "error" in json.loads(body)
+
+    def test_server_timing(self, client):
+        """The same phases are reported as by the Flask endpoint."""
+        # Both served from the result cache
+        post_json('/api/calculate', CALCULATE_PAYLOAD)
+        _, headers, _ = post_json('/api/calculate', CALCULATE_PAYLOAD)
+        expected = client.post('/api/calculate', json=CALCULATE_PAYLOAD).headers['Server-Timing']
+        phases = [entry.split(';')[0] for entry in headers['server-timing'].split(', ')]
+        assert phases == [entry.split(';')[0] for entry in expected.split(', ')]
+        assert phases[0] == 'parse' and phases[-1] == 'total'
+
+    def test_calculates_off_the_event_loop(self, monkeypatch):
+        """The catalog lookup and calculation run in a worker thread."""
+        import threading
+
+        import asgi
+
+        threads = []
+
+        def build_calculation(*args):
+            threads.append(threading.get_ident())
+            return build(*args)
+
+        build = asgi.build_calculation
+        monkeypatch.setattr(asgi, 'build_calculation', build_calculation)
+        assert post_json('/api/calculate', CALCULATE_PAYLOAD)[0] == 200
+        assert threads and threads[0] != threading.get_ident()
+
+    def test_invalid_json_returns_400(self):
+        """Malformed JSON returns 400."""
+        status, _, _ = asgi_request('POST', '/api/calculate', b'{bad', {'Content-Type': 'application/json'})
+        assert status == 400
+
+    def test_wrong_content_type_returns_415(self):
+        """Non-JSON bodies return 415."""
+        status, _, _ = asgi_request('POST', '/api/calculate', b'x', {'Content-Type': 'text/plain'})
+        assert status == 415
+
+    def test_oversized_body_returns_413(self):
+        """Bodies over the limit are rejected."""
+        from asgi import MAX_BODY_BYTES
+
+        status, _, _ = asgi_request(
+            'POST', '/api/calculate', b' ' * (MAX_BODY_BYTES + 1), {'Content-Type': 'application/json'}
+        )
+        assert status == 413
+
+
+class TestAsyncSpiritSearch:
+    """The async search handler matches GET /api/spirits/search."""
+
+    @pytest.mark.parametrize("query", [b"q=tanq", b"q=gin&category=gin&limit=3", b"q=tan&category=nope", b"limit=5"])
+    def test_same_response_as_flask(self, client, query):
+        """Results and errors equal the Flask endpoint's."""
+        status, _, body = asgi_request('GET', '/api/spirits/search', query=query)
+        expected = client.get(f'/api/spirits/search?{query.decode()}')
+        assert status == expected.status_code
+        assert json.loads(body) == expected.get_json()
+
+    def test_not_treated_as_a_category(self):
+        """/api/spirits/search isn't routed to the category handler."""
+        status, _, body = asgi_request('GET', '/api/spirits/search', query=b'q=Tanqueray')
+        assert status == 200
+        assert json.loads(body)[0]["brand"] == "Tanqueray"
+
+
+class TestAsyncMetrics:
+    """The async handlers record the same request metrics as Flask."""
+
+    def test_records_route_and_status(self):
+        """Requests are counted under their URL rule."""
+        from services.metrics import registry
+
+        registry.reset()
+        asgi_request('GET', '/api/spirits/gin')
+        asgi_request('GET', '/api/spirits/unknown_category')
+
+        text = registry.render()
+        route = 'route="/api/spirits/<category>"'
+        assert f'freezer_http_requests_total{{method="GET",{route},status="200"}} 1' in text
+        assert f'freezer_http_requests_total{{method="GET",{route},status="404"}} 1' in text
+
+
+class TestAsyncAdmission:
+    """Tests for admission control on the async handlers."""
+
+    def test_shares_flask_limits(self, monkeypatch):
+        """Async calculate requests use the Flask app's controller."""
+        from asgi import flask_app
+
+        controller = flask_app.extensions['admission']
+        limit = controller.limits['/api/calculate']
+        monkeypatch.setattr(limit, 'max_in_flight', 0)
+
+        status, headers, body = post_json('/api/calculate', CALCULATE_PAYLOAD)
+        assert status == 503
+        assert headers['retry-after'] == '1'
+        assert json.loads(body) == {"error": "Server busy"}
+
+    def test_released_after_handler(self):
+        """In-flight counts return to zero after each request."""
+        from asgi import flask_app
+
+        controller = flask_app.extensions['admission']
+        assert post_json('/api/calculate', CALCULATE_PAYLOAD)[0] == 200
+        assert controller.in_flight('/api/calculate') == 0
+
+
+class TestFlaskFallback:
+    """Routes without an async handler are served by Flask."""
+
+    def test_batch_endpoint_is_delegated(self):
+        """POST /api/calculate/batch goes through Flask."""
+        status, _, body = post_json('/api/calculate/batch', [CALCULATE_PAYLOAD])
+        assert status == 200
+        assert json.loads(body)[0]["status"] == 200
+
+    def test_index_is_delegated(self):
+        """The root route goes through Flask."""
+        status, _, body = asgi_request('GET', '/')
+        assert status == 200
+        assert b"The Freezer Door API" in body
+
+    def test_unknown_path_is_delegated(self):
+        """Unknown paths get Flask's 404 handling."""
+        status, _, _ = asgi_request('GET', '/api/cocktails/martini/extra')
+        assert status == 404
+
+    @pytest.mark.parametrize('path, headers', [
+        ('/api/t/nobody/cocktails', {}),
+        ('/api/cocktails', {'X-Tenant': 'nobody'}),
+    ])
+    def test_tenant_requests_are_delegated(self, path, headers):
+        """Tenant catalogs are selected by Flask."""
+        status, _, body = asgi_request('GET', path, headers=headers)
+        assert status == 404
+        assert json.loads(body) == {"error": "Tenant not found"}
+
+
+class TestLifespan:
+    """Tests for the ASGI lifespan protocol."""
+
+    def test_startup_and_shutdown_complete(self):
+        """Startup loads the catalog and both phases complete."""
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(asgi_app({'type': 'lifespan', 'asgi': {'version': '3.0'}}, receive, send))
+        assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
@@ -0,0 +1,78 @@
+"""Integration tests for per-request profiling."""
+
+import time
+
+import pytest
+from app import create_app
+from services.profiling import sign
+
+SECRET = "profile-s3cret"
+TOKEN = "admin-s3cret"
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
+CALCULATE_PAYLOAD = {
+    "cocktail": "martini", "variation": "classic",
+    "spirits": {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"},
+    "target_volume_ml": 750, "target_abv": 24,
+}
+
+
+def profiled_client(tmp_path, **config):
+    return create_app({
+        "TESTING": True, "ADMISSION_ENABLED": False, "ADMIN_TOKEN": TOKEN,
+        "PROFILE_ENABLED": True, "PROFILE_DIR": str(tmp_path), "PROFILE_SECRET": SECRET, **config,
+    }).test_client()
+
+
+def header(expires_in=60):
+    return {"X-Profile": sign(SECRET, int(time.time()) + expires_in)}
+
+
+class TestProfiling:
+    """Tests for profiling requests."""
+
+    def test_signed_request_is_profiled(self, tmp_path):
+        """A valid token writes a dump and names it in the response."""
+        client = profiled_client(tmp_path)
+        response = client.post('/api/calculate', json=CALCULATE_PAYLOAD, headers=header())
+        assert response.status_code == 200
+        name = response.headers['X-Profile-Dump']
+        assert (tmp_path / f"{name}.pstats").exists()
+        assert "-POST-api.calculate-" in name
+
+    @pytest.mark.parametrize("headers", [{}, {"X-Profile": "1"}, header(-10)])
+    def test_unsigned_requests_are_not(self, tmp_path, headers):
+        """Missing, forged or expired tokens are ignored."""
+        client = profiled_client(tmp_path)
+        response = client.get('/api/cocktails', headers=headers)
+        assert response.status_code == 200
+        assert 'X-Profile-Dump' not in response.headers
+        assert not any(tmp_path.iterdir())
+
+    def test_sampling(self, tmp_path):
+        """A sample rate of 1 profiles every api request."""
+        client = profiled_client(tmp_path, PROFILE_SAMPLE_RATE=1)
+        assert 'X-Profile-Dump' in client.get('/api/presets').headers
+        assert 'X-Profile-Dump' not in client.get('/healthz').headers
+
+    def test_disabled_by_default(self, tmp_path, client):
+        """Without PROFILE_ENABLED a valid token does nothing."""
+        assert 'X-Profile-Dump' not in client.get('/api/cocktails', headers=header()).headers
+
+    def test_admin_lists_and_serves_dumps(self, tmp_path):
+        """Dumps are listed newest first and can be downloaded."""
+        client = profiled_client(tmp_path, PROFILE_MEMORY=True)
+        name = client.get('/api/spirits/gin', headers=header()).headers['X-Profile-Dump']
+
+        listing = client.get('/api/admin/profiles', headers=AUTH).get_json()
+        assert listing["enabled"] is True
+        [dump] = listing["profiles"]
+        assert dump["name"] == name
+        assert dump["route"] == "/api/spirits/category"
+        assert dump["files"] == [".pstats", ".tracemalloc"]
+
+        download = client.get(f'/api/admin/profiles/{name}.pstats', headers=AUTH)
+        assert download.status_code == 200
+        assert download.data == (tmp_path / f"{name}.pstats").read_bytes()
+        assert client.get('/api/admin/profiles/..%2Fapp.py', headers=AUTH).status_code == 404
+        assert client.get('/api/admin/profiles', headers={}).status_code == 401
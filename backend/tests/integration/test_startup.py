@@ -0,0 +1,65 @@
+"""Cold start time of the app, measured in a fresh interpreter."""
+
+import json
+import os
+import subprocess
+import sys
+
+from services.catalog import DATA_DIR
+from services.snapshot import compile_snapshot
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Generous enough for a loaded CI machine; a regression to eager imports or
+# per-boot indexing of a large catalog still shows up in the recorded times
+STARTUP_BUDGET_SECONDS = 2.0
+
+# Modules only needed off the hot path, which must not load at boot
+LAZY_MODULES = ('numpy', 'sqlite3', 'services.sqlite_catalog', 'services.vectorized')
+
+SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import app
+seconds = time.perf_counter() - start
+from services.catalog import catalog_store
+print(json.dumps({{
+    "seconds": seconds,
+    "source": catalog_store.source,
+    "eager": [name for name in {LAZY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+
+def cold_start(**env):
+    """Import the app in a new process; returns its timing report."""
+    result = subprocess.run(
+        [sys.executable, '-c', SCRIPT],
+        cwd=BACKEND_DIR, env=dict(os.environ, CATALOG_BACKEND='json', **env),
+        capture_output=True, text=True, timeout=60, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestColdStart:
+    """Tests for app import time."""
+
+    def test_from_backend(self, tmp_path, record_property):
+        """Without a snapshot the app parses the data and stays in budget."""
+        report = cold_start(CATALOG_SNAPSHOT=str(tmp_path / 'missing.snapshot'))
+        record_property('startup_seconds', report['seconds'])
+
+        assert report['source'] == 'json'
+        assert report['eager'] == []
+        assert report['seconds'] < STARTUP_BUDGET_SECONDS
+
+    def test_from_snapshot(self, tmp_path, record_property):
+        """A current snapshot is used at boot."""
+        path = str(tmp_path / 'catalog.snapshot')
+        compile_snapshot(DATA_DIR, output=path, backend='json')
+        report = cold_start(CATALOG_SNAPSHOT=path)
+        record_property('startup_seconds', report['seconds'])
+
+        assert report['source'] == 'snapshot'
+        assert report['eager'] == []
+        assert report['seconds'] < STARTUP_BUDGET_SECONDS
@@ -0,0 +1,77 @@
+"""Integration tests for serving the bundled frontend."""
+
+import gzip
+
+import pytest
+from app import create_app
+
+INDEX = b"<!doctype html><html><body><div id=root></div>" + b"<!-- padding -->" * 40 + b"</body></html>"
+SCRIPT = b"console.log('freezer door');\n" * 50
+
+
+@pytest.fixture
+def static_client(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_bytes(INDEX)
+    (tmp_path / "assets" / "index-DzC1x2_a.js").write_bytes(SCRIPT)
+    (tmp_path / "favicon.svg").write_bytes(b"<svg/>")
+    return create_app({"TESTING": True, "STATIC_FOLDER": str(tmp_path)}).test_client()
+
+
+class TestStaticServing:
+    """Tests for static files, compression and caching."""
+
+    def test_index_from_memory(self, static_client, tmp_path):
+        """index.html is served from memory, not re-read from disk."""
+        (tmp_path / "index.html").unlink()
+        response = static_client.get('/')
+        assert response.status_code == 200
+        assert response.data == INDEX
+        assert response.headers['Cache-Control'] == 'no-cache'
+
+    def test_spa_routes_get_index(self, static_client):
+        """Client-side routes fall back to index.html."""
+        response = static_client.get('/calculator/martini')
+        assert response.status_code == 200
+        assert response.data == INDEX
+
+    def test_missing_bundle_is_404(self, static_client):
+        """A stale bundle name is a 404, not index.html."""
+        response = static_client.get('/assets/index-OLDHASH1.js')
+        assert response.status_code == 404
+
+    def test_gzip_negotiated(self, static_client):
+        """Clients accepting gzip get the prebuilt gzip variant."""
+        response = static_client.get('/assets/index-DzC1x2_a.js', headers={'Accept-Encoding': 'gzip, deflate'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert gzip.decompress(response.data) == SCRIPT
+
+        plain = static_client.get('/assets/index-DzC1x2_a.js')
+        assert 'Content-Encoding' not in plain.headers
+        assert plain.data == SCRIPT
+        assert plain.headers['ETag'] != response.headers['ETag']
+
+    def test_hashed_assets_are_immutable(self, static_client):
+        """Hashed bundles are cacheable forever; other files revalidate."""
+        response = static_client.get('/assets/index-DzC1x2_a.js')
+        assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+        assert response.mimetype in ('text/javascript', 'application/javascript')
+
+        assert static_client.get('/favicon.svg').headers['Cache-Control'] == 'no-cache'
+
+    def test_etag_revalidation(self, static_client):
+        """A matching If-None-Match gets a bodiless 304."""
+        headers = {'Accept-Encoding': 'gzip'}
+        first = static_client.get('/assets/index-DzC1x2_a.js', headers=headers)
+        second = static_client.get('/assets/index-DzC1x2_a.js', headers=dict(
+            headers, **{'If-None-Match': first.headers['ETag']}
+        ))
+        assert second.status_code == 304
+        assert second.data == b''
+
+    def test_api_still_served(self, static_client):
+        """The API and probes are unaffected by the catch-all route."""
+        assert static_client.get('/api/presets').status_code == 200
+        assert static_client.get('/healthz').status_code == 200
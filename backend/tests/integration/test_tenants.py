@@ -0,0 +1,88 @@
+"""Integration tests for tenant-scoped catalogs."""
+
+import json
+import shutil
+
+import pytest
+from app import create_app
+from services.catalog import DATA_DIR, catalog_store
+from services.tenants import tenant_catalogs
+
+OVERLAY = {
+    "spirits": {"gin": [{"brand": "Harbour House Gin", "abv": 44}]},
+    "recipes": {"martini": {"presets": {"house": {"name": "House", "abv": 27}}}},
+}
+
+CALCULATE_PAYLOAD = {
+    "cocktail": "martini", "variation": "classic",
+    "spirits": {"gin": "Harbour House Gin", "vermouth_dry": "Dolin Dry"},
+    "target_volume_ml": 750, "target_abv": 20,
+}
+
+
+@pytest.fixture
+def tenant_client(tmp_path):
+    shutil.copytree(DATA_DIR, tmp_path / "data")
+    (tmp_path / "data" / "tenants").mkdir()
+    (tmp_path / "data" / "tenants" / "harbour.json").write_text(json.dumps(OVERLAY))
+    catalog_store.configure(data_dir=str(tmp_path / "data"))
+    yield create_app({"TESTING": True, "ADMISSION_ENABLED": False}).test_client()
+    catalog_store.configure(data_dir=DATA_DIR)
+    tenant_catalogs.clear()
+
+
+class TestTenantSelection:
+    """Tests for selecting a tenant's catalog per request."""
+
+    @pytest.mark.parametrize("path, headers", [
+        ("/api/t/harbour/spirits/gin", {}),
+        ("/api/spirits/gin", {"X-Tenant": "harbour"}),
+    ])
+    def test_by_path_or_header(self, tenant_client, path, headers):
+        """The tenant's brands are served by path prefix or header."""
+        response = tenant_client.get(path, headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()[-1] == {"brand": "Harbour House Gin", "abv": 44}
+        assert "X-Tenant" in response.headers["Vary"]
+
+    def test_shared_catalog_is_unchanged(self, tenant_client):
+        """Requests without a tenant see the shared catalog."""
+        shared = tenant_client.get('/api/spirits/gin')
+        tenant = tenant_client.get('/api/t/harbour/spirits/gin')
+        assert "Harbour House Gin" not in [entry["brand"] for entry in shared.get_json()]
+        assert shared.headers["ETag"] != tenant.headers["ETag"]
+        assert "house" not in tenant_client.get('/api/cocktails/martini').get_json()["presets"]
+        assert "house" in tenant_client.get('/api/t/harbour/cocktails/martini').get_json()["presets"]
+
+    def test_calculates_with_tenant_brands(self, tenant_client):
+        """Calculations resolve the tenant's own bottles."""
+        result = tenant_client.post('/api/t/harbour/calculate', json=CALCULATE_PAYLOAD).get_json()
+        assert result["initial_abv"] == round((2.4 * 44 + 0.6 * 17.5) / 3, 1)
+        # The shared catalog doesn't know the brand and falls back to its first gin
+        shared = tenant_client.post('/api/calculate', json=CALCULATE_PAYLOAD).get_json()
+        assert shared["initial_abv"] != result["initial_abv"]
+
+    @pytest.mark.parametrize("path, headers", [
+        ("/api/t/nobody/cocktails", {}),
+        ("/api/cocktails", {"X-Tenant": "nobody"}),
+        ("/api/cocktails", {"X-Tenant": "../data"}),
+    ])
+    def test_unknown_tenant(self, tenant_client, path, headers):
+        """Unknown tenants are a 404."""
+        response = tenant_client.get(path, headers=headers)
+        assert response.status_code == 404
+        assert response.get_json() == {"error": "Tenant not found"}
+
+    def test_only_api_routes_per_tenant(self, tenant_client):
+        """The tenant prefix doesn't reach other blueprints."""
+        assert tenant_client.get('/api/t/harbour/admin/journal').status_code == 404
+
+    def test_cache_stats(self, tenant_client):
+        """The tenant cache reports hits, size and memory."""
+        tenant_client.get('/api/t/harbour/cocktails')
+        tenant_client.get('/api/t/harbour/cocktails')
+        stats = tenant_client.get('/api/tenants/cache').get_json()
+        assert stats["size"] == 1
+        assert stats["hits"] >= 1
+        assert stats["overlay_bytes"] > 0
+        assert stats["response_bytes"] > 0
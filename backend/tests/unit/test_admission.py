@@ -0,0 +1,105 @@
+"""Unit tests for admission control."""
+
+import json
+
+import pytest
+from services.admission import DEFAULT_LIMITS, AdmissionController, RouteLimit, route_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def controller(clock):
+    return AdmissionController({
+        '/api/calculate': RouteLimit(rate=2, burst=3),
+        '/api/calculate/batch': RouteLimit(max_in_flight=2),
+    }, clock=clock)
+
+
+class TestRateLimit:
+    """Tests for the per-client token buckets."""
+
+    def test_burst_then_429(self, controller):
+        """A client gets `burst` requests at once, then a 429."""
+        for _ in range(3):
+            assert controller.admit('/api/calculate', 'a') is None
+        rejection = controller.admit('/api/calculate', 'a')
+        assert rejection.status == 429
+        assert rejection.retry_after == 1
+
+    def test_tokens_refill_at_rate(self, controller, clock):
+        """Tokens come back at `rate` per second, up to the burst."""
+        for _ in range(3):
+            controller.admit('/api/calculate', 'a')
+        clock.now += 0.5
+        assert controller.admit('/api/calculate', 'a') is None
+        assert controller.admit('/api/calculate', 'a') is not None
+
+        clock.now += 60
+        results = [controller.admit('/api/calculate', 'a') for _ in range(4)]
+        assert results[:3] == [None] * 3 and results[3].status == 429
+
+    def test_clients_are_independent(self, controller):
+        """One client's burst doesn't use up another's tokens."""
+        for _ in range(3):
+            controller.admit('/api/calculate', 'a')
+        assert controller.admit('/api/calculate', 'b') is None
+
+    def test_tracked_clients_are_bounded(self, clock):
+        """The least recently seen client's bucket is dropped."""
+        controller = AdmissionController({'/r': RouteLimit(rate=1, burst=1)}, max_clients=2, clock=clock)
+        for client in ('a', 'b', 'c'):
+            controller.admit('/r', client)
+        assert len(controller._buckets) == 2
+        assert controller.admit('/r', 'a') is None
+
+
+class TestInFlight:
+    """Tests for the per-route in-flight cap."""
+
+    def test_503_at_capacity(self, controller):
+        """Requests beyond max_in_flight are shed until one finishes."""
+        assert controller.admit('/api/calculate/batch', 'a') is None
+        assert controller.admit('/api/calculate/batch', 'b') is None
+        rejection = controller.admit('/api/calculate/batch', 'c')
+        assert (rejection.status, rejection.retry_after) == (503, 1)
+
+        controller.release('/api/calculate/batch')
+        assert controller.in_flight('/api/calculate/batch') == 1
+        assert controller.admit('/api/calculate/batch', 'c') is None
+
+    def test_unlimited_routes_are_not_counted(self, controller):
+        """Routes without limits are always admitted."""
+        for _ in range(100):
+            assert controller.admit('/api/cocktails', 'a') is None
+        controller.release('/api/cocktails')
+        assert controller.in_flight('/api/cocktails') == 0
+
+
+class TestRouteLimits:
+    """Tests for route_limits."""
+
+    def test_defaults_cover_calculate_routes(self):
+        """Only the calculate routes are limited by default."""
+        assert set(route_limits()) == set(DEFAULT_LIMITS)
+        assert all(rule.startswith('/api/calculate') for rule in DEFAULT_LIMITS)
+
+    def test_overrides(self, monkeypatch):
+        """The environment, then config, override or remove limits."""
+        monkeypatch.setenv('ADMISSION_LIMITS', json.dumps({'/api/calculate/sweep': None, '/api/presets': {'rate': 5}}))
+        limits = route_limits({'/api/calculate': {'rate': 1, 'max_in_flight': 2}})
+
+        assert '/api/calculate/sweep' not in limits
+        assert limits['/api/presets'].burst == 5
+        assert (limits['/api/calculate'].rate, limits['/api/calculate'].max_in_flight) == (1, 2)
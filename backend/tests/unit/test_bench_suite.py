@@ -0,0 +1,95 @@
+"""Unit tests for the benchmark suite."""
+
+import json
+
+import pytest
+from bench.suite import compare, main, run_benchmarks, time_function
+
+
+def report(**best):
+    return {"results": {name: {"best": value, "median": value} for name, value in best.items()}}
+
+
+class TestTimeFunction:
+    """Tests for time_function."""
+
+    def test_reports_per_call_time(self):
+        """Results include best/median per call and the loop count."""
+        result = time_function(lambda: None, repeat=3, min_time=0.001)
+        assert result["repeat"] == 3
+        assert result["loops"] >= 1
+        assert 0 < result["best"] <= result["median"]
+
+
+class TestCompare:
+    """Tests for compare."""
+
+    def test_flags_regressions_past_threshold(self):
+        """Only benchmarks slower than baseline * (1 + threshold) regress."""
+        rows = compare(report(a=1.3, b=1.2, c=0.5), report(a=1.0, b=1.0, c=1.0), threshold=0.25)
+        regressed = {name: flag for name, _, _, _, flag in rows}
+        assert regressed == {"a": True, "b": False, "c": False}
+
+    def test_ignores_benchmarks_missing_from_baseline(self):
+        """New benchmarks have nothing to compare against."""
+        assert compare(report(new=1.0), report(old=1.0)) == []
+
+
+class TestSuite:
+    """Smoke tests for running the suite."""
+
+    def test_runs_filtered_benchmarks(self):
+        """A filter limits which benchmarks run."""
+        results = run_benchmarks("ml_to_oz", repeat=1, min_time=0.001)["results"]
+        assert list(results) == ["calculator.ml_to_oz"]
+
+    def test_includes_every_variation(self):
+        """There is a calculate benchmark for each cocktail/variation."""
+        from services.catalog import get_catalog
+
+        results = run_benchmarks("POST /api/calculate ", repeat=1, min_time=0.0001)["results"]
+        for cocktail_id, cocktail in get_catalog().cocktails.items():
+            for variation_id in cocktail.variations:
+                assert f"POST /api/calculate {cocktail_id}/{variation_id}" in results
+
+    def test_calculations_bypass_the_table(self, tmp_path, monkeypatch):
+        """Calculate benchmarks time the calculator, not a table lookup."""
+        from services.calculation_table import build_table, precomputed_results
+        from services.catalog import DATA_DIR
+
+        path = str(tmp_path / "calculations.table")
+        build_table(DATA_DIR, path, volumes=(750,), workers=1)
+        # The app the suite creates maps this table; restored afterwards
+        monkeypatch.setattr("app.TABLE_FILE", path)
+        for name, value in (('table', None), ('hits', 0), ('misses', 0)):
+            monkeypatch.setattr(precomputed_results, name, value)
+
+        run_benchmarks("POST /api/calculate martini/classic", repeat=1, min_time=0.0001)
+        assert precomputed_results.hits == 0
+        assert precomputed_results.table is not None
+
+    def test_compare_mode_exits_nonzero_on_regression(self, tmp_path, capsys):
+        """--compare returns 1 when a benchmark regressed."""
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps(report(**{"calculator.ml_to_oz": 1e-12})))
+
+        status = main(["--filter", "ml_to_oz", "--repeat", "1", "--min-time", "0.001",
+                       "--compare", str(baseline)])
+        assert status == 1
+        assert "REGRESSED" in capsys.readouterr().out
+
+    def test_compare_mode_passes_within_threshold(self, tmp_path):
+        """--compare returns 0 when nothing regressed."""
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps(report(**{"calculator.ml_to_oz": 1.0})))
+
+        assert main(["--filter", "ml_to_oz", "--repeat", "1", "--min-time", "0.001",
+                     "--compare", str(baseline)]) == 0
+
+    def test_writes_json_output(self, tmp_path):
+        """--output writes the report as JSON."""
+        output = tmp_path / "results.json"
+        main(["--filter", "ml_to_oz", "--repeat", "1", "--min-time", "0.001", "--output", str(output)])
+        data = json.loads(output.read_text())
+        assert "calculator.ml_to_oz" in data["results"]
+        assert "python" in data["meta"]
@@ -0,0 +1,201 @@
+"""Unit tests for the precomputed calculation table."""
+
+import itertools
+import json
+import os
+
+import pytest
+from services.calculation_table import (
+    TABLE_FILE, CalculationTable, PrecomputedResults, build_table, main,
+)
+from services.calculator import calculate_variation, ml_to_oz
+from services.catalog import Catalog
+
+VOLUMES = (500, 750)
+
+
+@pytest.fixture
+def recipes():
+    return {
+        "martini": {
+            "name": "Martini",
+            # 40 dilutes every brand combination, 45 only some
+            "presets": {"normal": {"name": "Normal", "abv": 40}, "strong": {"name": "Strong", "abv": 45}},
+            "variations": {
+                "classic": {"name": "Classic", "ingredients": {"gin": 2.4, "vermouth_dry": 0.6}},
+                "diluted": {"name": "Diluted", "ingredients": {"gin": 2, "water": 0.5}},
+                "empty": {"name": "Empty", "ingredients": {}},
+            },
+        }
+    }
+
+
+@pytest.fixture
+def spirits():
+    return {
+        "gin": [
+            {"brand": "Tanqueray", "abv": 47.3},
+            {"brand": "Plymouth", "abv": 41.2},
+            {"brand": "Tanqueray", "abv": 43.1},
+        ],
+        "vermouth_dry": [{"brand": "Dolin Dry", "abv": 17.5}, {"brand": "Noilly Prat", "abv": 18}],
+    }
+
+
+@pytest.fixture
+def data_dir(tmp_path, recipes, spirits):
+    for name, payload in (("recipes.json", recipes), ("spirits.json", spirits)):
+        with open(tmp_path / name, "w") as f:
+            json.dump(payload, f)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def table(data_dir):
+    build_table(data_dir, volumes=VOLUMES, workers=2)
+    table = CalculationTable(os.path.join(data_dir, TABLE_FILE))
+    yield table
+    table.close()
+
+
+def live(catalog, variation, selections, volume, abv):
+    result = calculate_variation(variation, catalog.variation_abvs(variation, selections), volume, abv)
+    result['ingredients_oz'] = {name: ml_to_oz(ml) for name, ml in result['ingredients'].items()}
+    result['water_oz'] = ml_to_oz(result['water_ml'])
+    result['total_volume_oz'] = ml_to_oz(result['total_volume_ml'])
+    return result
+
+
+class TestCalculationTable:
+    """Tests for build_table and CalculationTable."""
+
+    def test_every_record_matches_live(self, table, recipes, spirits):
+        """Each lookup serializes exactly like the live calculation."""
+        catalog = Catalog(recipes, spirits)
+        brands = {category: [spirit['brand'] for spirit in entries] for category, entries in spirits.items()}
+        checked = 0
+        for variation_id in ("classic", "diluted"):
+            variation = catalog.cocktails["martini"].variations[variation_id]
+            categories = [name for name in variation.ingredients if name in brands]
+            for combo in itertools.product(*(brands[name] for name in categories)):
+                selections = dict(zip(categories, combo))
+                for abv, volume in itertools.product((40, 45), VOLUMES):
+                    result = table.lookup(catalog, "martini", variation, selections, volume, abv)
+                    expected = live(catalog, variation, selections, volume, abv)
+                    assert json.dumps(result, sort_keys=True) == json.dumps(expected, sort_keys=True)
+                    checked += 1
+        # Duplicate brand names share a record
+        assert table.records == (2 * 2 + 2) * 2 * len(VOLUMES)
+        assert checked == (3 * 2 + 3) * 2 * len(VOLUMES)
+
+    def test_float_requests_match(self, table, recipes, spirits):
+        """750.0 and 45.0 find the same records as 750 and 45, typed as sent."""
+        catalog = Catalog(recipes, spirits)
+        variation = catalog.cocktails["martini"].variations["classic"]
+        selections = {"gin": "Plymouth", "vermouth_dry": "Dolin Dry"}
+        result = table.lookup(catalog, "martini", variation, selections, 750.0, 45.0)
+        assert json.dumps(result, sort_keys=True) == json.dumps(
+            live(catalog, variation, selections, 750.0, 45.0), sort_keys=True
+        )
+
+    def test_uncovered_requests_miss(self, table, recipes, spirits):
+        """Other volumes, ABVs and brands, or missing selections, aren't covered."""
+        catalog = Catalog(recipes, spirits)
+        variation = catalog.cocktails["martini"].variations["classic"]
+        selections = {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"}
+        assert table.lookup(catalog, "martini", variation, selections, 750, 40) is not None
+        assert table.lookup(catalog, "martini", variation, selections, 751, 40) is None
+        assert table.lookup(catalog, "martini", variation, selections, 750, 41) is None
+        assert table.lookup(catalog, "martini", variation, dict(selections, gin="Beefeater"), 750, 40) is None
+        assert table.lookup(catalog, "martini", variation, {"gin": "Tanqueray"}, 750, 40) is None
+        assert table.lookup(catalog, "martini", variation, dict(selections, gin=["Tanqueray"]), 750, 40) is None
+
+    def test_other_catalog_misses(self, table, recipes, spirits):
+        """A table built from other data is never consulted."""
+        spirits["gin"][0]["abv"] = 50
+        catalog = Catalog(recipes, spirits)
+        variation = catalog.cocktails["martini"].variations["classic"]
+        selections = {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"}
+        assert table.lookup(catalog, "martini", variation, selections, 750, 40) is None
+
+    def test_positions_past_the_field_are_calculated_live(self, data_dir, recipes, spirits, monkeypatch):
+        """Brands whose position doesn't fit below NO_BRAND are left out, not mistabled."""
+        import services.calculation_table as calculation_table
+
+        monkeypatch.setattr(calculation_table, "NO_BRAND", 1)
+        build_table(data_dir, volumes=VOLUMES, workers=1)
+        table = CalculationTable(os.path.join(data_dir, TABLE_FILE))
+        catalog = Catalog(recipes, spirits)
+        variation = catalog.cocktails["martini"].variations["classic"]
+        selections = {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"}
+        try:
+            assert table.lookup(catalog, "martini", variation, selections, 750, 40) is not None
+            assert table.lookup(catalog, "martini", variation, dict(selections, gin="Plymouth"), 750, 40) is None
+            assert table.lookup(catalog, "martini", variation, dict(selections, vermouth_dry="Noilly Prat"),
+                                750, 40) is None
+        finally:
+            table.close()
+
+    def test_single_process_build_is_identical(self, data_dir, tmp_path):
+        """The pool only changes how fast the table is built."""
+        build_table(data_dir, str(tmp_path / "pool.table"), VOLUMES, workers=2)
+        build_table(data_dir, str(tmp_path / "serial.table"), VOLUMES, workers=1)
+        assert (tmp_path / "pool.table").read_bytes() == (tmp_path / "serial.table").read_bytes()
+
+    def test_not_a_table(self, tmp_path):
+        """Files without the magic are rejected."""
+        path = tmp_path / "bogus.table"
+        path.write_bytes(bytes(64))
+        with pytest.raises(ValueError):
+            CalculationTable(str(path))
+
+
+class TestPrecomputedResults:
+    """Tests for PrecomputedResults."""
+
+    def test_missing_table(self, tmp_path, recipes, spirits):
+        """Without a table every lookup falls through, uncounted."""
+        results = PrecomputedResults()
+        assert results.load(str(tmp_path / "missing.table")) is None
+        catalog = Catalog(recipes, spirits)
+        variation = catalog.cocktails["martini"].variations["classic"]
+        assert results.lookup(catalog, "martini", variation, {}, 750, 40) is None
+        assert results.stats() == {
+            "loaded": False, "records": 0, "catalog_version": None, "hits": 0, "misses": 0,
+        }
+
+    def test_corrupt_table_is_ignored(self, tmp_path):
+        """A truncated file is logged and left unloaded."""
+        path = tmp_path / "short.table"
+        path.write_bytes(b"FDCALC01")
+        results = PrecomputedResults()
+        assert results.load(str(path)) is None
+        assert results.table is None
+
+    def test_counts_hits_and_misses(self, data_dir, recipes, spirits):
+        """stats() reports the installed table and how often it answered."""
+        build_table(data_dir, volumes=VOLUMES, workers=1)
+        results = PrecomputedResults()
+        results.load(os.path.join(data_dir, TABLE_FILE))
+        catalog = Catalog(recipes, spirits)
+        variation = catalog.cocktails["martini"].variations["classic"]
+        selections = {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"}
+        results.lookup(catalog, "martini", variation, selections, 750, 40)
+        results.lookup(catalog, "martini", variation, selections, 600, 40)
+
+        stats = results.stats()
+        assert stats["loaded"]
+        assert stats["catalog_version"] == catalog.version
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+class TestMain:
+    """Tests for the command line entry point."""
+
+    def test_writes_table(self, data_dir, capsys):
+        """The CLI builds the table in the data directory."""
+        assert main([data_dir, "--volumes", "750,1000", "--workers", "1"]) == 0
+        table = CalculationTable(os.path.join(data_dir, TABLE_FILE))
+        assert table.volumes == [750, 1000]
+        assert "Wrote 24 calculations" in capsys.readouterr().out
+        table.close()
@@ -5,9 +5,13 @@ from services.calculator import (
     calculate_initial_abv,
     calculate_water_dilution,
     calculate_recipe,
+    calculate_variation,
+    max_batch_volume,
+    max_variation_volume,
     ml_to_oz,
     oz_to_ml,
 )
+from services.models import Variation
 
 
 class TestCalculateInitialABV:
@@ -177,6 +181,97 @@ class TestCalculateRecipe:
         assert gin == pytest.approx(vermouth, rel=0.01)
 
 
+class TestCalculateVariation:
+    """Tests for calculate_variation function."""
+
+    @pytest.mark.parametrize("target_volume_ml,target_abv", [(750, 24), (750, 45), (0, 24), (1000, 0)])
+    def test_matches_calculate_recipe(self, negroni_ingredients, sample_spirits, target_volume_ml, target_abv):
+        """A Variation with aligned ABVs gives exactly calculate_recipe()'s result."""
+        variation = Variation("classic", "Classic", negroni_ingredients)
+        abvs = [sample_spirits.get(name, 0) for name in variation.ingredients]
+        assert calculate_variation(variation, abvs, target_volume_ml, target_abv) == calculate_recipe(
+            negroni_ingredients, sample_spirits, target_volume_ml, target_abv
+        )
+
+    def test_matches_calculate_recipe_for_catalog(self):
+        """Every variation in the catalog agrees with calculate_recipe()."""
+        from services.catalog import get_catalog, load_recipes
+
+        catalog = get_catalog()
+        for cocktail_id, cocktail in load_recipes().items():
+            for variation_id, recipe in cocktail["variations"].items():
+                variation = catalog.cocktails[cocktail_id].variations[variation_id]
+                selections = {name: None for name in recipe["ingredients"]}
+                expected = calculate_recipe(recipe["ingredients"], catalog.spirit_abvs(selections), 750, 24)
+                abvs = catalog.variation_abvs(variation, selections)
+                assert calculate_variation(variation, abvs, 750, 24) == expected
+
+
+class TestMaxBatchVolume:
+    """Tests for max_batch_volume and max_variation_volume."""
+
+    def test_limiting_ingredient_is_used_up(self, martini_ingredients, sample_spirits):
+        """The batch at the maximum volume uses all of the limiting bottle."""
+        inventory = {"gin": 700, "vermouth_dry": 375}
+        volume, limiting = max_batch_volume(martini_ingredients, sample_spirits, inventory, 24)
+        assert limiting == "gin"
+
+        result = calculate_recipe(martini_ingredients, sample_spirits, volume, 24)
+        assert result["ingredients"]["gin"] == pytest.approx(700, abs=0.1)
+        assert result["ingredients"]["gin"] <= 700
+        assert result["ingredients"]["vermouth_dry"] < 375
+
+    def test_scarce_vermouth_limits(self, martini_ingredients, sample_spirits):
+        """Whichever bottle runs out first limits the batch."""
+        volume, limiting = max_batch_volume(martini_ingredients, sample_spirits, {"gin": 700, "vermouth_dry": 50}, 24)
+        assert limiting == "vermouth_dry"
+        result = calculate_recipe(martini_ingredients, sample_spirits, volume, 24)
+        assert result["ingredients"]["vermouth_dry"] == pytest.approx(50, abs=0.1)
+
+    def test_no_dilution_needed(self, negroni_ingredients, sample_spirits):
+        """Above the mixture's ABV the batch is just the recipe, scaled."""
+        inventory = {"gin": 500, "campari": 300, "vermouth_sweet": 1000}
+        assert max_batch_volume(negroni_ingredients, sample_spirits, inventory, 40) == (900, "campari")
+
+    def test_water_can_limit(self, martini_ingredients, sample_spirits):
+        """A water entry caps the dilution water."""
+        volume, limiting = max_batch_volume(martini_ingredients, sample_spirits, {"gin": 700, "water": 100}, 24)
+        assert limiting == "water"
+        assert calculate_recipe(martini_ingredients, sample_spirits, volume, 24)["water_ml"] <= 100
+
+    def test_unlisted_ingredients_are_unlimited(self, martini_ingredients, sample_spirits):
+        """Only listed ingredients bound the batch."""
+        with pytest.raises(ValueError):
+            max_batch_volume(martini_ingredients, sample_spirits, {"vodka": 700}, 24)
+
+    def test_zero_target_abv(self, martini_ingredients, sample_spirits):
+        """Diluting to 0% has no finite batch size."""
+        with pytest.raises(ValueError):
+            max_batch_volume(martini_ingredients, sample_spirits, {"gin": 700}, 0)
+
+    def test_oversized_batches(self, martini_ingredients, sample_spirits):
+        """Batches over MAX_BATCH_ML, overflowing ones included, are refused."""
+        with pytest.raises(ValueError):
+            max_batch_volume(martini_ingredients, sample_spirits, {"gin": 1e308}, 24)
+        with pytest.raises(ValueError):
+            max_batch_volume(martini_ingredients, sample_spirits, {"gin": 700}, 1e-300)
+
+    def test_rounded_amounts_stay_within_stock(self, martini_ingredients, sample_spirits):
+        """Amounts rounded to 0.1 ml never come out above the stock."""
+        for ml in (700.07, 699.96, 375.04):
+            volume, _ = max_batch_volume(martini_ingredients, sample_spirits, {"gin": ml}, 24)
+            assert calculate_recipe(martini_ingredients, sample_spirits, volume, 24)["ingredients"]["gin"] <= ml
+
+    def test_variation_matches_dicts(self, negroni_ingredients, sample_spirits):
+        """max_variation_volume agrees with max_batch_volume."""
+        variation = Variation("classic", "Classic", negroni_ingredients)
+        abvs = [sample_spirits.get(name, 0) for name in variation.ingredients]
+        inventory = {"gin": 700, "campari": 1000, "water": 2000}
+        assert max_variation_volume(variation, abvs, inventory, 18) == max_batch_volume(
+            negroni_ingredients, sample_spirits, inventory, 18
+        )
+
+
 class TestConversions:
     """Tests for unit conversion functions."""
 
@@ -0,0 +1,284 @@
+"""Unit tests for the in-memory catalog store."""
+
+import json
+import os
+import time
+
+import pytest
+from services.catalog import DATA_DIR, Catalog, CatalogStore, JsonBackend, catalog_version
+
+
+def write_data(data_dir, recipes, spirits, mtime_ns=None):
+    """Write recipes/spirits JSON files, optionally forcing their mtime."""
+    for name, payload in (("recipes.json", recipes), ("spirits.json", spirits)):
+        path = os.path.join(data_dir, name)
+        with open(path, "w") as f:
+            json.dump(payload, f)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def recipes():
+    return {
+        "martini": {
+            "name": "Martini",
+            "variations": {"classic": {"name": "Classic", "ingredients": {"gin": 2.4, "vermouth_dry": 0.6}}},
+        }
+    }
+
+
+@pytest.fixture
+def spirits():
+    return {
+        "gin": [{"brand": "Tanqueray", "abv": 47.3}],
+        "vermouth_dry": [{"brand": "Dolin Dry", "abv": 17.5}],
+    }
+
+
+@pytest.fixture
+def data_dir(tmp_path, recipes, spirits):
+    write_data(tmp_path, recipes, spirits, mtime_ns=1_000_000_000)
+    return str(tmp_path)
+
+
+class TestCatalog:
+    """Tests for Catalog snapshots."""
+
+    def test_version_is_content_hash(self, recipes, spirits):
+        """Equal content gives equal versions."""
+        assert Catalog(recipes, spirits).version == catalog_version(recipes, spirits)
+        assert Catalog(recipes, spirits).version == Catalog(dict(recipes), dict(spirits)).version
+
+    def test_version_changes_with_content(self, recipes, spirits):
+        """Different content gives a different version."""
+        changed = {"gin": [{"brand": "Tanqueray", "abv": 43.1}]}
+        assert Catalog(recipes, spirits).version != Catalog(recipes, changed).version
+
+
+class TestBrandIndex:
+    """Tests for brand -> ABV resolution."""
+
+    @pytest.fixture
+    def catalog(self, recipes):
+        return Catalog(recipes, {
+            "gin": [
+                {"brand": "Tanqueray", "abv": 47.3},
+                {"brand": "Plymouth", "abv": 41.2},
+                {"brand": "Plymouth", "abv": 57.0},
+            ],
+            "simple_syrup": [{"brand": "Simple Syrup (1:1)", "abv": 0}],
+            "empty": [],
+        })
+
+    def test_known_brand(self, catalog):
+        """Known brands resolve to their own ABV."""
+        assert catalog.brand_abv("gin", "Plymouth") == 41.2
+
+    def test_duplicate_brand_uses_first_entry(self, catalog):
+        """The first listing of a duplicated brand wins."""
+        assert catalog.brand_abv("gin", "Plymouth") == 41.2
+
+    def test_unknown_brand_falls_back_to_first_brand(self, catalog):
+        """Unknown brands use the category's first brand."""
+        assert catalog.brand_abv("gin", "Unknown Gin") == 47.3
+
+    def test_zero_abv_brand_is_not_treated_as_missing(self, catalog):
+        """A 0% brand resolves to 0 rather than the fallback."""
+        assert catalog.brand_abv("simple_syrup", "Simple Syrup (1:1)") == 0
+
+    def test_empty_category_is_zero(self, catalog):
+        """A category with no brands resolves to 0."""
+        assert catalog.brand_abv("empty", "Anything") == 0
+
+    def test_unknown_category_is_zero(self, catalog):
+        """Ingredients that aren't a spirit category are 0%."""
+        assert catalog.brand_abv("lemon_juice", "Fresh") == 0
+
+    def test_unhashable_brand_falls_back(self, catalog):
+        """Malformed selections fall back instead of raising."""
+        assert catalog.brand_abv("gin", ["Tanqueray"]) == 47.3
+
+    def test_spirit_abvs_resolves_all_selections(self, catalog):
+        """spirit_abvs maps each selected ingredient to an ABV."""
+        assert catalog.spirit_abvs({"gin": "Plymouth", "lemon_juice": "Fresh"}) == {
+            "gin": 41.2,
+            "lemon_juice": 0,
+        }
+
+    def test_variation_abvs_follow_ingredient_order(self, recipes, spirits):
+        """variation_abvs is aligned with the variation's ingredients."""
+        catalog = Catalog(recipes, spirits)
+        variation = catalog.cocktails["martini"].variations["classic"]
+        assert variation.ingredients == ("gin", "vermouth_dry")
+        assert list(catalog.variation_abvs(variation, {"vermouth_dry": "Dolin Dry", "gin": "?"})) == [47.3, 17.5]
+
+    def test_variation_abvs_unselected_ingredient_is_zero(self, recipes, spirits):
+        """Ingredients without a selection are 0%, as in spirit_abvs()."""
+        catalog = Catalog(recipes, spirits)
+        variation = catalog.cocktails["martini"].variations["classic"]
+        assert list(catalog.variation_abvs(variation, {"gin": "Tanqueray"})) == [47.3, 0]
+
+
+class TestCatalogStore:
+    """Tests for CatalogStore loading and reloading."""
+
+    def test_loads_data_files(self, data_dir, recipes, spirits):
+        """First access parses both data files."""
+        catalog = CatalogStore(data_dir).current()
+        assert {cid: c.to_dict() for cid, c in catalog.cocktails.items()} == recipes
+        assert {name: c.to_list() for name, c in catalog.spirits.items()} == spirits
+
+    def test_returns_same_snapshot_between_checks(self, data_dir):
+        """Repeated access returns the same snapshot object."""
+        store = CatalogStore(data_dir, check_interval=60)
+        assert store.current() is store.current()
+
+    def test_no_file_io_between_checks(self, data_dir, recipes, monkeypatch):
+        """Within the check interval the files are not touched at all."""
+        store = CatalogStore(data_dir, check_interval=60)
+        store.current()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("file I/O on the hot path")
+
+        monkeypatch.setattr("services.catalog.os.stat", fail)
+        monkeypatch.setattr("services.catalog.load_recipes", fail)
+        assert store.current().cocktails["martini"].to_dict() == recipes["martini"]
+
+    def test_reloads_when_mtime_changes(self, data_dir, recipes, spirits):
+        """A changed file is picked up on the next check."""
+        store = CatalogStore(data_dir, check_interval=0)
+        old = store.current()
+
+        spirits["gin"].append({"brand": "Plymouth", "abv": 41.2})
+        write_data(data_dir, recipes, spirits, mtime_ns=2_000_000_000)
+
+        new = store.current()
+        assert new is not old
+        assert new.version != old.version
+        assert len(new.spirits["gin"]) == 2
+        # The old snapshot is untouched for requests still holding it
+        assert len(old.spirits["gin"]) == 1
+
+    def test_subscribers_are_notified_of_new_snapshots(self, data_dir, recipes, spirits):
+        """Listeners are called with each new snapshot, not with unchanged ones."""
+        store = CatalogStore(data_dir, check_interval=0)
+        seen = []
+        store.subscribe(seen.append)
+
+        first = store.current()
+        store.reload()
+        spirits["gin"][0]["abv"] = 43.1
+        write_data(data_dir, recipes, spirits, mtime_ns=2_000_000_000)
+        second = store.current()
+
+        assert seen == [first, second]
+
+    def test_unchanged_mtime_keeps_snapshot(self, data_dir):
+        """Without a file change the snapshot is reused."""
+        store = CatalogStore(data_dir, check_interval=0)
+        assert store.current() is store.current()
+
+    def test_request_reload_forces_reload(self, data_dir, recipes, spirits):
+        """request_reload() reloads even if mtimes did not change."""
+        store = CatalogStore(data_dir, check_interval=60)
+        old = store.current()
+
+        spirits["gin"][0]["abv"] = 43.1
+        write_data(data_dir, recipes, spirits, mtime_ns=1_000_000_000)
+        assert store.current() is old
+
+        store.request_reload()
+        assert store.current().spirits["gin"].abv("Tanqueray") == 43.1
+
+    def test_invalid_file_keeps_last_good_snapshot(self, data_dir):
+        """A broken data file does not replace the current snapshot."""
+        store = CatalogStore(data_dir, check_interval=0)
+        old = store.current()
+
+        path = os.path.join(data_dir, "spirits.json")
+        with open(path, "w") as f:
+            f.write("{not json")
+        os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+
+        assert store.current() is old
+
+    def test_missing_files_raise_on_first_load(self, tmp_path):
+        """With no data at all there is nothing to serve."""
+        with pytest.raises(OSError):
+            CatalogStore(str(tmp_path)).current()
+
+
+class TestCatalogEdits:
+    """Tests for CatalogStore edits, the journal and compaction."""
+
+    PLYMOUTH = {"op": "put_spirit", "category": "gin", "brand": "Plymouth", "abv": 41.2}
+    STRONG = {"op": "put_preset", "cocktail": "martini", "preset": "strong", "name": "Strong", "abv": 32}
+
+    def test_edit_is_current_at_once(self, data_dir):
+        """An edit swaps in a new snapshot; the old one is untouched."""
+        store = CatalogStore(data_dir, check_interval=60)
+        old = store.current()
+        new = store.edit(self.PLYMOUTH)
+
+        assert store.current() is new
+        assert new.spirits["gin"].abv("Plymouth") == 41.2
+        assert "Plymouth" not in old.spirits["gin"]
+
+    def test_other_stores_replay_the_journal(self, data_dir):
+        """Once written, an edit reaches other processes with the same version."""
+        store = CatalogStore(data_dir, check_interval=0)
+        other = CatalogStore(data_dir, check_interval=0)
+        other.current()
+
+        edited = store.edit(self.PLYMOUTH)
+        store.flush()
+
+        assert other.current().version == edited.version
+        assert CatalogStore(data_dir).current().version == edited.version
+
+    def test_background_writer(self, data_dir):
+        """Edits are journaled without an explicit flush."""
+        store = CatalogStore(data_dir)
+        store.edit(self.PLYMOUTH)
+        deadline = time.monotonic() + 5
+        while store.journal_status()["journal_entries"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert store.journal_status()["journal_entries"] == 1
+
+    def test_compaction_writes_the_data_files(self, data_dir, recipes, spirits):
+        """Compacting folds the journal into the files and empties it."""
+        store = CatalogStore(data_dir, check_interval=0, compact_after=2)
+        store.edit(self.PLYMOUTH)
+        store.edit(self.STRONG)
+        store.flush()
+
+        status = store.journal_status()
+        assert (status["journal_entries"], status["compactions"]) == (0, 1)
+        with open(os.path.join(data_dir, "spirits.json")) as f:
+            assert json.load(f)["gin"][-1] == {"brand": "Plymouth", "abv": 41.2}
+        # Versioned like a fresh load, so every process agrees
+        fresh = CatalogStore(data_dir).current()
+        assert store.current().version == fresh.version == catalog_version(*fresh.to_json())
+
+    def test_compaction_keeps_other_processes_edits(self, data_dir):
+        """Edits journaled by another store survive this one's compaction."""
+        store = CatalogStore(data_dir, check_interval=60)
+        other = CatalogStore(data_dir, check_interval=60)
+        store.current()
+        other.edit(self.PLYMOUTH)
+        other.flush()
+
+        store.edit(self.STRONG)
+        catalog = store.compact()
+        assert "Plymouth" in catalog.spirits["gin"]
+        assert "strong" in catalog.cocktails["martini"].presets
+
+    def test_save_keeps_the_hand_written_layout(self, tmp_path):
+        """JsonBackend.save writes the shipped files byte for byte."""
+        source = JsonBackend(DATA_DIR)
+        JsonBackend(str(tmp_path)).save(*Catalog(source.load_recipes(), source.load_spirits()).to_json())
+        for name in ("recipes.json", "spirits.json"):
+            with open(os.path.join(DATA_DIR, name), encoding="utf-8") as expected:
+                assert (tmp_path / name).read_text(encoding="utf-8") == expected.read()
@@ -0,0 +1,125 @@
+"""Unit tests for incremental catalog changes."""
+
+import pytest
+from services.catalog import Catalog
+from services.catalog_changes import ChangeError, apply_changes, change_version
+
+
+@pytest.fixture
+def catalog():
+    return Catalog(
+        {
+            "martini": {
+                "name": "Martini",
+                "presets": {"classic": {"name": "Classic", "abv": 30}},
+                "variations": {
+                    "classic": {"name": "Classic", "ingredients": {"gin": 2.4, "vermouth_dry": 0.6}},
+                    "wet": {"name": "Wet", "ingredients": {"gin": 2, "vermouth_dry": 1}},
+                },
+            },
+            "negroni": {
+                "name": "Negroni",
+                "variations": {"classic": {"name": "Classic", "ingredients": {"gin": 1, "campari": 1}}},
+            },
+        },
+        {
+            "gin": [{"brand": "Tanqueray", "abv": 47.3}, {"brand": "Beefeater", "abv": 40}],
+            "vermouth_dry": [{"brand": "Dolin Dry", "abv": 17.5}],
+            "campari": [{"brand": "Campari", "abv": 24}],
+            "amaro": [{"brand": "Averna", "abv": 29}],
+        },
+    )
+
+
+class TestApplyChanges:
+    """Tests for apply_changes."""
+
+    def test_put_spirit_adds_and_updates(self, catalog):
+        """New brands are appended; known ones keep their place."""
+        added = apply_changes(catalog, [{"op": "put_spirit", "category": "gin", "brand": "Plymouth", "abv": 41.2}])
+        assert added.spirits["gin"].brands == ("Tanqueray", "Beefeater", "Plymouth")
+
+        updated = apply_changes(added, [{"op": "put_spirit", "category": "gin", "brand": "Tanqueray", "abv": 43.1}])
+        assert updated.spirits["gin"].to_list()[0] == {"brand": "Tanqueray", "abv": 43.1}
+
+        created = apply_changes(catalog, [{"op": "put_spirit", "category": "rum", "brand": "Havana 3", "abv": 40}])
+        assert created.spirits["rum"].to_list() == [{"brand": "Havana 3", "abv": 40}]
+
+    def test_unchanged_parts_are_shared(self, catalog):
+        """Only the edited objects are new; everything else is the old snapshot's."""
+        new = apply_changes(catalog, [{"op": "put_spirit", "category": "gin", "brand": "Plymouth", "abv": 41.2}])
+        assert new.cocktails["martini"] is catalog.cocktails["martini"]
+        assert new.spirits["campari"] is catalog.spirits["campari"]
+        assert new.spirits["gin"] is not catalog.spirits["gin"]
+        assert new.search.reused == len(catalog.spirits) - 1
+
+        new = apply_changes(catalog, [{
+            "op": "put_variation", "cocktail": "martini", "variation": "dry",
+            "name": "Dry", "ingredients": {"gin": 2.5, "vermouth_dry": 0.5},
+        }])
+        martini = new.cocktails["martini"]
+        assert list(martini.variations) == ["classic", "wet", "dry"]
+        assert martini.variations["classic"] is catalog.cocktails["martini"].variations["classic"]
+        assert new.cocktails["negroni"] is catalog.cocktails["negroni"]
+        assert new.spirits is not catalog.spirits and new.spirits == catalog.spirits
+        # The snapshot it was made from is untouched
+        assert list(catalog.cocktails["martini"].variations) == ["classic", "wet"]
+
+    def test_deletes(self, catalog):
+        """Brands, variations and presets can be removed."""
+        new = apply_changes(catalog, [
+            {"op": "delete_spirit", "category": "gin", "brand": "Beefeater"},
+            {"op": "delete_spirit", "category": "amaro", "brand": "Averna"},
+            {"op": "delete_variation", "cocktail": "martini", "variation": "wet"},
+            {"op": "delete_preset", "cocktail": "martini", "preset": "classic"},
+        ])
+        assert new.spirits["gin"].brands == ("Tanqueray",)
+        assert "amaro" not in new.spirits
+        assert list(new.cocktails["martini"].variations) == ["classic"]
+        assert new.cocktails["martini"].presets == {}
+
+    def test_put_preset(self, catalog):
+        """Presets are added or replaced by id."""
+        new = apply_changes(catalog, [
+            {"op": "put_preset", "cocktail": "martini", "preset": "strong", "name": "Strong", "abv": 32},
+        ])
+        assert new.cocktails["martini"].presets_dict() == {
+            "classic": {"name": "Classic", "abv": 30}, "strong": {"name": "Strong", "abv": 32},
+        }
+
+    @pytest.mark.parametrize("change, status", [
+        ({"op": "rename_spirit"}, 400),
+        ({"op": "put_spirit", "category": "gin", "brand": "Plymouth", "abv": 120}, 400),
+        ({"op": "put_spirit", "category": "gin", "brand": "", "abv": 40}, 400),
+        ({"op": "delete_spirit", "category": "gin", "brand": "Plymouth"}, 404),
+        ({"op": "delete_spirit", "category": "campari", "brand": "Campari"}, 409),
+        ({"op": "put_variation", "cocktail": "gimlet", "variation": "x", "name": "X", "ingredients": {"gin": 1}}, 404),
+        ({"op": "put_variation", "cocktail": "martini", "variation": "x", "name": "X", "ingredients": {"gim": 1}}, 400),
+        ({"op": "put_variation", "cocktail": "martini", "variation": "x", "name": "X", "ingredients": {"gin": -1}}, 400),
+        ({"op": "put_variation", "cocktail": "martini", "variation": "x", "name": "X", "ingredients": {}}, 400),
+        ({"op": "delete_variation", "cocktail": "negroni", "variation": "classic"}, 409),
+        ({"op": "delete_preset", "cocktail": "martini", "preset": "strong"}, 404),
+    ])
+    def test_invalid_changes(self, catalog, change, status):
+        """Invalid changes raise with the matching HTTP status."""
+        with pytest.raises(ChangeError) as excinfo:
+            apply_changes(catalog, [change])
+        assert excinfo.value.status == status
+
+    def test_replay_skips_invalid_changes(self, catalog):
+        """Non-strict application skips what no longer applies."""
+        change = {"op": "put_spirit", "category": "gin", "brand": "Plymouth", "abv": 41.2}
+        new = apply_changes(catalog, [{"op": "delete_preset", "cocktail": "martini", "preset": "strong"}, change],
+                            strict=False)
+        assert new.version == change_version(catalog.version, change)
+
+    def test_versions_are_deterministic_and_idempotent_data(self, catalog):
+        """The same changes give the same version; repeating one gives the same data."""
+        change = {"op": "put_spirit", "category": "gin", "brand": "Plymouth", "abv": 41.2}
+        once = apply_changes(catalog, [change])
+        assert once.version == apply_changes(catalog, [dict(change)]).version != catalog.version
+        assert apply_changes(once, [change]).to_json() == once.to_json()
+
+    def test_no_changes(self, catalog):
+        """An empty change list is the same snapshot."""
+        assert apply_changes(catalog, []) is catalog
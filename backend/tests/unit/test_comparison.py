@@ -0,0 +1,115 @@
+"""Unit tests for brand comparisons."""
+
+import itertools
+
+import pytest
+from services.calculator import calculate_variation, ml_to_oz
+from services.catalog import Catalog
+from services.comparison import brand_axes, compare_brands, comparison_rows
+
+
+@pytest.fixture
+def catalog():
+    return Catalog(
+        {
+            "gimlet": {
+                "name": "Gimlet",
+                "variations": {
+                    "classic": {"name": "Classic", "ingredients": {"gin": 2, "lime_juice": 0.75, "simple_syrup": 0.75}},
+                },
+            },
+            "negroni": {
+                "name": "Negroni",
+                "variations": {
+                    "classic": {"name": "Classic", "ingredients": {"gin": 1, "campari": 1, "vermouth_sweet": 1}},
+                },
+            },
+        },
+        {
+            "gin": [
+                {"brand": "Tanqueray", "abv": 47.3},
+                {"brand": "Plymouth", "abv": 41.2},
+                {"brand": "Beefeater", "abv": 40},
+            ],
+            "campari": [{"brand": "Campari", "abv": 24}, {"brand": "Campari (US)", "abv": 24}],
+            "vermouth_sweet": [{"brand": "Carpano Antica", "abv": 16.5}, {"brand": "Cocchi", "abv": 16}],
+        },
+    )
+
+
+def negroni(catalog):
+    return catalog.cocktails["negroni"].variations["classic"]
+
+
+class TestBrandAxes:
+    """Tests for brand_axes."""
+
+    def test_every_brand_by_default(self, catalog):
+        """Spirit ingredients without a selection compare all their brands."""
+        axes = brand_axes(catalog, negroni(catalog), {})
+        assert list(axes) == ["gin", "campari", "vermouth_sweet"]
+        assert axes["gin"] == [("Tanqueray", 47.3), ("Plymouth", 41.2), ("Beefeater", 40)]
+        assert comparison_rows(axes) == 12
+
+    def test_selections(self, catalog):
+        """Lists pick brands to compare; a single brand is held fixed."""
+        axes = brand_axes(catalog, negroni(catalog), {"gin": ["Plymouth", "Tanqueray"], "campari": "Campari"})
+        assert axes["gin"] == [("Plymouth", 41.2), ("Tanqueray", 47.3)]
+        assert axes["campari"] == [("Campari", 24)]
+        assert comparison_rows(axes) == 4
+
+    def test_non_spirits_have_no_axis(self, catalog):
+        """Zero-ABV ingredients aren't compared."""
+        assert list(brand_axes(catalog, catalog.cocktails["gimlet"].variations["classic"], {})) == ["gin"]
+
+    @pytest.mark.parametrize("selections", [
+        {"vodka": ["Absolut"]}, {"gin": ["Hendrick's"]}, {"gin": []}, {"gin": [1]},
+        {"gin": "Nope"}, {"gin": {"a": 1}},
+    ])
+    def test_invalid_selections(self, catalog, selections):
+        """Unknown ingredients and brands are rejected."""
+        with pytest.raises(ValueError):
+            brand_axes(catalog, negroni(catalog), selections)
+
+    def test_empty_category(self):
+        """A category with no brands has nothing to compare."""
+        catalog = Catalog(
+            {"gimlet": {"name": "Gimlet", "variations": {"classic": {"name": "Classic", "ingredients": {"gin": 2}}}}},
+            {"gin": []},
+        )
+        variation = catalog.cocktails["gimlet"].variations["classic"]
+        with pytest.raises(ValueError, match="'gin' has no brands"):
+            brand_axes(catalog, variation, {})
+
+
+class TestCompareBrands:
+    """Tests for compare_brands."""
+
+    @pytest.mark.parametrize("target_abv", [24, 20.5, 30])
+    def test_rows_match_calculate(self, catalog, target_abv):
+        """Each row is the calculator's result for its brands."""
+        variation = negroni(catalog)
+        axes = brand_axes(catalog, variation, {})
+        comparison = compare_brands(variation, axes, 750, target_abv)
+        assert comparison["axes"] == ["gin", "campari", "vermouth_sweet"]
+        assert comparison["shape"] == [3, 2, 2]
+        assert comparison["strides"] == [4, 2, 1]
+
+        columns = comparison["columns"]
+        for index in itertools.product(*(range(size) for size in comparison["shape"])):
+            row = sum(i * stride for i, stride in zip(index, comparison["strides"]))
+            abvs = [axes[name][i][1] for name, i in zip(comparison["axes"], index)]
+            expected = calculate_variation(variation, abvs, 750, target_abv)
+            assert {name: column[row] for name, column in columns["ingredients"].items()} == expected["ingredients"]
+            assert columns["water_ml"][row] == expected["water_ml"]
+            assert columns["water_oz"][row] == ml_to_oz(expected["water_ml"])
+            assert columns["initial_abv"][row] == expected["initial_abv"]
+            assert columns["final_abv"][row] == expected["final_abv"]
+
+    def test_zero_abv_ingredients(self, catalog):
+        """Ingredients without an axis count as 0%."""
+        variation = catalog.cocktails["gimlet"].variations["classic"]
+        comparison = compare_brands(variation, brand_axes(catalog, variation, {}), 700, 20)
+        expected = calculate_variation(variation, [40, 0, 0], 700, 20)
+        assert comparison["columns"]["initial_abv"][2] == expected["initial_abv"]
+        assert comparison["columns"]["ingredients"]["lime_juice"][2] == expected["ingredients"]["lime_juice"]
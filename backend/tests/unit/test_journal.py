@@ -0,0 +1,38 @@
+"""Unit tests for the catalog change journal."""
+
+from services.journal import CatalogJournal
+
+CHANGE = {"op": "put_spirit", "category": "gin", "brand": "Plymouth", "abv": 41.2}
+
+
+class TestCatalogJournal:
+    """Tests for CatalogJournal."""
+
+    def test_missing_journal_is_empty(self, tmp_path):
+        """Before the first append there is nothing to replay."""
+        journal = CatalogJournal(str(tmp_path / "catalog.journal"))
+        assert journal.read() == []
+        assert journal.stat() is None
+
+    def test_append_and_clear(self, tmp_path):
+        """Changes read back in order until the journal is cleared."""
+        journal = CatalogJournal(str(tmp_path / "catalog.journal"))
+        with journal.locked():
+            journal.append([CHANGE, dict(CHANGE, abv=42)])
+        assert journal.read() == [CHANGE, dict(CHANGE, abv=42)]
+        before = journal.stat()
+
+        with journal.locked():
+            journal.clear()
+        assert journal.read() == []
+        assert journal.stat() != before
+
+    def test_incomplete_and_malformed_lines_are_skipped(self, tmp_path):
+        """A line still being written, or a corrupt one, isn't replayed."""
+        path = tmp_path / "catalog.journal"
+        journal = CatalogJournal(str(path))
+        with journal.locked():
+            journal.append([CHANGE])
+        with open(path, "a") as f:
+            f.write('not json\n{"at": 1, "change": {"op": "put_sp')
+        assert journal.read() == [CHANGE]
@@ -0,0 +1,97 @@
+"""Unit tests for the load-test harness."""
+
+import json
+import os
+import threading
+
+import pytest
+from app import create_app
+from bench.common import BACKEND_DIR
+from bench.loadtest import RequestFactory, load_catalog_data, main, parse_mix, run_load
+from werkzeug.serving import make_server
+
+
+@pytest.fixture
+def factory():
+    return RequestFactory(*load_catalog_data(os.path.join(BACKEND_DIR, 'data')), seed=1)
+
+
+@pytest.fixture
+def app():
+    # The load generator measures capacity; keep admission limits out of it
+    return create_app({"TESTING": True, "ADMISSION_ENABLED": False})
+
+
+@pytest.fixture
+def server(app):
+    httpd = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+    thread.join()
+
+
+class TestParseMix:
+    """Tests for parse_mix."""
+
+    def test_parses_weights(self):
+        """Route weights are parsed as floats."""
+        assert parse_mix("cocktails=1, calculate=2.5") == {"cocktails": 1.0, "calculate": 2.5}
+
+    def test_rejects_unknown_routes(self):
+        """Only the routes the harness knows how to build are allowed."""
+        with pytest.raises(ValueError, match="unknown route"):
+            parse_mix("cocktails=1,search=2")
+
+    def test_rejects_all_zero_weights(self):
+        """At least one route has to be sent."""
+        with pytest.raises(ValueError):
+            parse_mix("cocktails=0")
+
+
+class TestRequestFactory:
+    """Tests for RequestFactory."""
+
+    def test_calculation_payloads_are_valid(self, client, factory):
+        """Generated calculate requests succeed against the real catalog."""
+        for _ in range(50):
+            method, path, body = factory.build('calculate')
+            response = client.post(path, data=body, content_type='application/json')
+            assert method == 'POST'
+            assert response.status_code == 200, response.get_json()
+
+    def test_spirit_categories_exist(self, client, factory):
+        """Generated category lookups hit real categories."""
+        for _ in range(20):
+            method, path, body = factory.build('spirits')
+            assert body is None
+            assert client.get(path).status_code == 200
+
+    def test_seed_makes_requests_reproducible(self, factory):
+        """The same seed produces the same request sequence."""
+        other = RequestFactory(factory.recipes, factory.spirits, seed=1)
+        assert [factory.build('calculate') for _ in range(5)] == [other.build('calculate') for _ in range(5)]
+
+
+class TestRunLoad:
+    """Smoke tests against a local server."""
+
+    def test_reports_percentiles_per_route(self, server, factory):
+        """Every route in the mix gets a row, plus an overall one."""
+        results = run_load(server, factory, {"cocktails": 1, "calculate": 1}, concurrency=2, duration=0.3)
+        assert set(results) == {"cocktails", "calculate", "all"}
+        overall = results["all"]
+        assert overall["requests"] > 0
+        assert overall["errors"] == 0
+        assert overall["p50_ms"] <= overall["p95_ms"] <= overall["p99_ms"] <= overall["max_ms"]
+
+    def test_rate_limits_requests_sent(self, server, factory):
+        """With a rate the schedule, not the server, sets the request count."""
+        results = run_load(server, factory, {"spirits": 1}, concurrency=4, duration=0.5, rate=20)
+        assert results["all"]["requests"] == 10
+
+    def test_main_prints_json(self, server, capsys):
+        """--json prints the report for a running server."""
+        assert main(['--url', server, '--duration', '0.2', '--warmup', '0', '--concurrency', '1', '--json']) == 0
+        assert json.loads(capsys.readouterr().out)["all"]["requests"] > 0
@@ -0,0 +1,89 @@
+"""Unit tests for the metrics registry."""
+
+import pytest
+from services.metrics import Registry
+
+
+@pytest.fixture
+def registry():
+    return Registry(buckets=(0.1, 1.0))
+
+
+class TestRegistry:
+    """Tests for Registry."""
+
+    def test_counter_increments(self, registry):
+        """Counters add up per label set."""
+        registry.inc('requests_total', (('status', '200'),))
+        registry.inc('requests_total', (('status', '200'),))
+        registry.inc('requests_total', (('status', '404'),))
+
+        text = registry.render()
+        assert 'requests_total{status="200"} 2' in text
+        assert 'requests_total{status="404"} 1' in text
+        assert '# TYPE requests_total counter' in text
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        """Histogram buckets count observations at or below each bound."""
+        for value in (0.05, 0.1, 0.5, 3.0):
+            registry.observe('latency_seconds', value)
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{le="1.0"} 3' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+        assert 'latency_seconds_count 4' in text
+        assert 'latency_seconds_sum 3.65' in text
+        assert '# TYPE latency_seconds histogram' in text
+
+    def test_timer_records_elapsed_time(self, registry):
+        """timer() observes the duration of the block."""
+        with registry.timer('block_seconds'):
+            pass
+        assert 'block_seconds_count 1' in registry.render()
+
+    def test_help_text(self, registry):
+        """describe() adds a HELP line."""
+        registry.describe('requests_total', "Requests served")
+        registry.inc('requests_total')
+        assert '# HELP requests_total Requests served' in registry.render()
+
+    def test_label_values_are_escaped(self, registry):
+        """Quotes and backslashes in label values are escaped."""
+        registry.inc('requests_total', (('route', 'a"b\\c'),))
+        assert 'requests_total{route="a\\"b\\\\c"} 1' in registry.render()
+
+    def test_reset(self, registry):
+        """reset() drops recorded values."""
+        registry.inc('requests_total')
+        registry.reset()
+        assert 'requests_total' not in registry.render()
+
+
+class TestMultiprocess:
+    """Tests for merging metrics across processes."""
+
+    def test_collect_merges_every_process_file(self, tmp_path, monkeypatch):
+        """Totals from other workers' files are added to this process's."""
+        worker = Registry(buckets=(0.1, 1.0), multiproc_dir=str(tmp_path))
+        worker.inc('requests_total', (('status', '200'),), 3)
+        worker.observe('latency_seconds', 0.05)
+        monkeypatch.setattr('services.metrics.os.getpid', lambda: 1001)
+        worker.flush()
+
+        scraper = Registry(buckets=(0.1, 1.0), multiproc_dir=str(tmp_path))
+        scraper.inc('requests_total', (('status', '200'),), 2)
+        scraper.observe('latency_seconds', 0.5)
+        monkeypatch.setattr('services.metrics.os.getpid', lambda: 1002)
+
+        text = scraper.render()
+        assert 'requests_total{status="200"} 5' in text
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_count 2' in text
+
+    def test_unreadable_files_are_skipped(self, tmp_path):
+        """A half-written or corrupt file doesn't break the scrape."""
+        (tmp_path / 'metrics-1.json').write_text('{broken')
+        registry = Registry(multiproc_dir=str(tmp_path))
+        registry.inc('requests_total')
+        assert 'requests_total 1' in registry.render()
@@ -0,0 +1,110 @@
+"""Unit tests for the typed catalog model."""
+
+import sys
+from array import array
+
+import pytest
+from services.catalog import load_recipes, load_spirits
+from services.models import (
+    Cocktail, SpiritCategory, Variation, cocktails_from_json, is_number, spirits_from_json,
+)
+
+
+@pytest.fixture
+def gin():
+    return SpiritCategory.from_json("gin", [
+        {"brand": "Tanqueray", "abv": 47.3},
+        {"brand": "Plymouth", "abv": 41.2},
+        {"brand": "Plymouth", "abv": 57.0},
+        {"brand": "Navy", "abv": 57},
+    ])
+
+
+class TestSpiritCategory:
+    """Tests for SpiritCategory."""
+
+    def test_abvs_are_a_float_array(self, gin):
+        """ABVs are stored contiguously, aligned with brands."""
+        assert isinstance(gin.abvs, array)
+        assert gin.abvs.typecode == 'd'
+        assert gin.brands[1] == "Plymouth" and gin.abvs[1] == 41.2
+
+    def test_abv_lookup(self, gin):
+        """Known brands resolve to their ABV, the first listing winning."""
+        assert gin.abv("Plymouth") == 41.2
+        assert gin.abv("Navy") == 57
+
+    def test_unknown_and_unhashable_brands_use_default(self, gin):
+        """Anything else falls back to the first brand."""
+        assert gin.abv("Unknown") == 47.3
+        assert gin.abv(["Plymouth"]) == 47.3
+        assert ["Plymouth"] not in gin
+
+    def test_empty_category_default_is_zero(self):
+        """An empty category has a 0% default."""
+        assert SpiritCategory.from_json("empty", []).abv("Anything") == 0
+
+    def test_strings_are_interned(self, gin):
+        """Brand and category names share one string object per value."""
+        brand = "".join(["Tanq", "ueray"])
+        assert gin.brands[0] is sys.intern(brand)
+        assert gin.name is sys.intern("".join(["g", "in"]))
+
+    def test_to_list_round_trips_json(self, gin):
+        """to_list gives back the spirits.json form, integers included."""
+        listed = gin.to_list()
+        assert listed[3] == {"brand": "Navy", "abv": 57}
+        assert isinstance(listed[3]["abv"], int)
+        assert listed[0] == {"brand": "Tanqueray", "abv": 47.3}
+
+
+class TestCocktail:
+    """Tests for Cocktail and Variation."""
+
+    def test_variation_parts_follow_ingredient_order(self):
+        """Parts are a float array aligned with the ingredient names."""
+        variation = Variation("classic", "Classic", {"gin": 2.4, "vermouth_dry": 0.6})
+        assert variation.ingredients == ("gin", "vermouth_dry")
+        assert list(variation.parts) == [2.4, 0.6]
+        assert variation.ingredient_parts() == {"gin": 2.4, "vermouth_dry": 0.6}
+
+    def test_optional_fields_default_to_none(self):
+        """Fields missing from recipes.json stay unset."""
+        cocktail = Cocktail.from_json("x", {"name": "X", "variations": {}})
+        assert cocktail.garnish is None
+        assert cocktail.serving_size_ml is None
+        assert cocktail.presets == {}
+
+    def test_uses_slots(self):
+        """Model objects carry no per-instance __dict__."""
+        variation = Variation("classic", "Classic", {"gin": 1})
+        with pytest.raises(AttributeError):
+            variation.extra = 1
+
+
+class TestFromJson:
+    """The model round-trips the real data files."""
+
+    def test_recipes_round_trip(self):
+        recipes = load_recipes()
+        cocktails = cocktails_from_json(recipes)
+        assert {cocktail_id: c.to_dict() for cocktail_id, c in cocktails.items()} == recipes
+
+    def test_spirits_round_trip(self):
+        spirits = load_spirits()
+        categories = spirits_from_json(spirits)
+        assert {name: category.to_list() for name, category in categories.items()} == spirits
+
+
+class TestIsNumber:
+    """Tests for the shared number check."""
+
+    @pytest.mark.parametrize("value", [0, 24, 47.3, -1])
+    def test_numbers(self, value):
+        """Ints and finite floats are numbers."""
+        assert is_number(value)
+
+    @pytest.mark.parametrize("value", [True, "24", None, float("nan"), float("inf"), 10**400])
+    def test_not_numbers(self, value):
+        """Bools, strings, NaN, infinities and ints too large for a float aren't numbers."""
+        assert not is_number(value)
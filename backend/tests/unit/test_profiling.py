@@ -0,0 +1,80 @@
+"""Unit tests for request profiling."""
+
+import os
+import pstats
+import tracemalloc
+
+import pytest
+from services.profiling import Profiler, list_dumps, route_slug, sign, verify
+
+
+class TestTokens:
+    """Tests for signed X-Profile tokens."""
+
+    def test_valid_until_expiry(self):
+        """A token verifies with its secret until it expires."""
+        token = sign("s3cret", 2_000)
+        assert verify("s3cret", token, now=1_999)
+        assert not verify("s3cret", token, now=2_001)
+        assert not verify("other", token, now=1_999)
+
+    @pytest.mark.parametrize("token", ["", "2000", "2000.", "x.abc", "2000.0000"])
+    def test_malformed_tokens(self, token):
+        """Malformed tokens never verify."""
+        assert not verify("s3cret", token, now=0)
+
+    def test_no_secret(self):
+        """Without a secret nothing verifies."""
+        assert not verify("", sign("", 2_000), now=0)
+
+
+class TestProfiler:
+    """Tests for Profiler."""
+
+    def test_writes_named_dumps(self, tmp_path):
+        """A session writes loadable stats named after the route and its time."""
+        profiler = Profiler(str(tmp_path), memory=True)
+        session = profiler.start()
+        sum(range(1000))
+        name = profiler.stop(session, "post", "/api/calculate/max-volume")
+
+        assert "-POST-api.calculate.max-volume-" in name
+        assert pstats.Stats(str(tmp_path / f"{name}.pstats")).total_calls > 0
+        assert tracemalloc.Snapshot.load(str(tmp_path / f"{name}.tracemalloc")) is not None
+        assert not tracemalloc.is_tracing()
+
+        [dump] = list_dumps(str(tmp_path))
+        assert dump["name"] == name
+        assert (dump["method"], dump["route"]) == ("POST", "/api/calculate/max-volume")
+        assert dump["files"] == [".pstats", ".tracemalloc"]
+
+    def test_one_session_at_a_time(self, tmp_path):
+        """A second request isn't profiled while one is."""
+        profiler = Profiler(str(tmp_path), memory=False)
+        session = profiler.start()
+        assert profiler.start() is None
+        profiler.stop(session, "GET", "/api/cocktails")
+        second = profiler.start()
+        assert second is not None
+        profiler.stop(second, "GET", "/api/cocktails")
+
+    def test_keeps_the_newest(self, tmp_path):
+        """Only the last `keep` dumps are kept."""
+        profiler = Profiler(str(tmp_path), memory=False, keep=2)
+        names = []
+        for i in range(3):
+            names.append(profiler.stop(profiler.start(), "GET", "/api/cocktails"))
+            os.utime(tmp_path / f"{names[-1]}.pstats", (1_000 + i, 1_000 + i))
+        profiler.stop(profiler.start(), "GET", "/api/presets")
+        assert [dump["route"] for dump in list_dumps(str(tmp_path))] == ["/api/presets", "/api/cocktails"]
+
+
+def test_route_slug():
+    """URL rules become file-name safe."""
+    assert route_slug("/api/cocktails/<cocktail_id>") == "api.cocktails.cocktail_id"
+    assert route_slug("/") == "root"
+
+
+def test_list_missing_directory(tmp_path):
+    """A directory that doesn't exist yet has no dumps."""
+    assert list_dumps(str(tmp_path / "missing")) == []
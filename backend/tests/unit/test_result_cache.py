@@ -0,0 +1,120 @@
+"""Unit tests for the calculate result cache."""
+
+import pytest
+from services.result_cache import LRUCache, calculation_key
+
+
+@pytest.fixture
+def payload():
+    return {
+        "cocktail": "martini",
+        "variation": "classic",
+        "spirits": {"gin": "Tanqueray", "vermouth_dry": "Dolin Dry"},
+        "target_volume_ml": 750,
+        "target_abv": 24,
+    }
+
+
+class TestLRUCache:
+    """Tests for LRUCache."""
+
+    def test_miss_then_hit(self):
+        """A stored value is returned and counted as a hit."""
+        cache = LRUCache(maxsize=2, ttl=0)
+        assert cache.get("a") is None
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        """The least recently used entry is evicted when full."""
+        cache = LRUCache(maxsize=2, ttl=0)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_expired_entries_are_misses(self, monkeypatch):
+        """Entries older than the TTL are dropped."""
+        now = [1000.0]
+        monkeypatch.setattr("services.result_cache.time.monotonic", lambda: now[0])
+        cache = LRUCache(maxsize=2, ttl=10)
+        cache.put("a", 1)
+
+        now[0] += 9
+        assert cache.get("a") == 1
+        now[0] += 2
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+        assert len(cache) == 0
+
+    def test_zero_maxsize_disables_cache(self):
+        """maxsize=0 stores nothing."""
+        cache = LRUCache(maxsize=0, ttl=0)
+        cache.put("a", 1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_configure_shrinks_cache(self):
+        """Shrinking the cache evicts the oldest entries."""
+        cache = LRUCache(maxsize=3, ttl=0)
+        for key in "abc":
+            cache.put(key, key)
+        cache.configure(maxsize=1)
+        assert len(cache) == 1
+        assert cache.get("c") == "c"
+
+    def test_clear_keeps_stats(self):
+        """clear() empties the cache but keeps the counters."""
+        cache = LRUCache(maxsize=2, ttl=0)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["hits"] == 1
+
+    def test_hit_rate(self):
+        """hit_rate is hits over lookups."""
+        cache = LRUCache(maxsize=2, ttl=0)
+        cache.put("a", 1)
+        for key in "aaab":
+            cache.get(key)
+        assert cache.stats()["hit_rate"] == 0.75
+
+
+class TestCalculationKey:
+    """Tests for calculation_key."""
+
+    def test_spirit_order_does_not_matter(self, payload):
+        """Spirit selections are compared regardless of order."""
+        reordered = dict(payload, spirits={"vermouth_dry": "Dolin Dry", "gin": "Tanqueray"})
+        assert calculation_key(payload, "v1") == calculation_key(reordered, "v1")
+
+    def test_int_and_float_targets_differ(self, payload):
+        """750 and 750.0 are keyed apart, since results echo the form sent."""
+        assert calculation_key(payload, "v1") != calculation_key(dict(payload, target_volume_ml=750.0), "v1")
+        assert calculation_key(payload, "v1") != calculation_key(dict(payload, target_abv=24.0), "v1")
+
+    def test_catalog_version_is_part_of_key(self, payload):
+        """Results from another catalog version are never reused."""
+        assert calculation_key(payload, "v1") != calculation_key(payload, "v2")
+
+    def test_different_brands_differ(self, payload):
+        """A different brand is a different key."""
+        other = dict(payload, spirits={"gin": "Plymouth", "vermouth_dry": "Dolin Dry"})
+        assert calculation_key(payload, "v1") != calculation_key(other, "v1")
+
+    def test_unhashable_selection_is_not_cached(self, payload):
+        """Unhashable selections produce no key."""
+        bad = dict(payload, spirits={"gin": ["Tanqueray"]})
+        assert calculation_key(bad, "v1") is None
+
+    def test_huge_volume_is_not_cached(self, payload):
+        """Ints too large for a float produce no key."""
+        assert calculation_key(dict(payload, target_volume_ml=10**400), "v1") is None
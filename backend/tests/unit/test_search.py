@@ -0,0 +1,119 @@
+"""Unit tests for the brand search index."""
+
+import pytest
+from services.catalog import Catalog
+from services.models import spirits_from_json
+from services.search import SpiritSearch, normalize
+
+
+@pytest.fixture
+def spirits():
+    return {
+        "gin": [
+            {"brand": "Tanqueray", "abv": 47.3},
+            {"brand": "Tanqueray No. Ten", "abv": 47.3},
+            {"brand": "The Botanist", "abv": 46},
+            {"brand": "Monkey 47", "abv": 47},
+        ],
+        "liqueur": [
+            {"brand": "Cointreau", "abv": 40},
+            {"brand": "Bénédictine", "abv": 40},
+            {"brand": "Grand Marnier", "abv": 40},
+        ],
+        "vermouth_dry": [
+            {"brand": "Noilly Prat Extra Dry", "abv": 18},
+        ],
+    }
+
+
+@pytest.fixture
+def search(spirits):
+    return SpiritSearch(spirits_from_json(spirits))
+
+
+def brands(results):
+    return [result["brand"] for result in results]
+
+
+class TestNormalize:
+    """Tests for normalize."""
+
+    def test_strips_case_accents_and_spacing(self):
+        """Case, accents and repeated whitespace are folded."""
+        assert normalize("  Ménage   À Trois ") == "menage a trois"
+
+    def test_compatibility_forms(self):
+        """NFKD folds compatibility characters like ligatures."""
+        assert normalize("ﬁne") == "fine"
+
+
+class TestSpiritSearch:
+    """Tests for SpiritSearch.search."""
+
+    def test_ranks_exact_then_prefix_then_substring(self, search):
+        """An exact name beats longer names starting with the query."""
+        assert brands(search.search("tanqueray")) == ["Tanqueray", "Tanqueray No. Ten"]
+        assert brands(search.search("tan")) == ["Tanqueray", "Tanqueray No. Ten", "The Botanist"]
+
+    def test_word_prefix_beats_substring(self, search):
+        """A later word starting with the query ranks above a mid-word hit."""
+        assert brands(search.search("mar")) == ["Grand Marnier"]
+        assert brands(search.search("ten"))[0] == "Tanqueray No. Ten"
+
+    def test_multi_word_queries_match_from_later_words(self, search):
+        """A query of several words can start at any word of the name."""
+        assert brands(search.search("extra dry")) == ["Noilly Prat Extra Dry"]
+        assert brands(search.search("prat extra")) == ["Noilly Prat Extra Dry"]
+        assert brands(search.search("no. t")) == ["Tanqueray No. Ten"]
+
+    def test_short_queries_match_word_prefixes(self, search):
+        """One- and two-letter queries use the prefix index."""
+        assert brands(search.search("b")) == ["Bénédictine", "The Botanist"]
+        assert brands(search.search("47")) == ["Monkey 47"]
+
+    def test_accent_insensitive(self, search):
+        """Accents are ignored on both sides."""
+        assert brands(search.search("benedictine")) == ["Bénédictine"]
+        assert brands(search.search("COINTRÉAU")) == ["Cointreau"]
+
+    def test_fuzzy_matches_misspellings(self, search):
+        """Close misspellings rank after real matches."""
+        assert brands(search.search("cointraeu")) == ["Cointreau"]
+        assert brands(search.search("tanqeuray"))[0] == "Tanqueray"
+        assert search.search("zzzzzz") == []
+
+    def test_category_and_limit(self, search):
+        """Results can be restricted to a category and capped."""
+        assert search.search("t", category="liqueur") == []
+        assert len(search.search("tanqueray", limit=1)) == 1
+
+    def test_result_fields(self, search):
+        """Results carry the brand, its category and ABV."""
+        assert search.search("monkey") == [{"brand": "Monkey 47", "category": "gin", "abv": 47}]
+
+    def test_blank_query(self, search):
+        """A query that normalizes to nothing matches nothing."""
+        assert search.search("   ") == []
+
+
+class TestIncrementalRebuild:
+    """Tests for reusing the previous snapshot's index."""
+
+    def test_unchanged_categories_are_reused(self, spirits):
+        """Only changed categories are re-indexed for a new snapshot."""
+        old = Catalog({}, spirits)
+        spirits["gin"].append({"brand": "Plymouth", "abv": 41.2})
+        new = Catalog({}, spirits, previous=old)
+
+        assert new.search.reused == 2
+        assert new.search.categories["liqueur"] is old.search.categories["liqueur"]
+        assert new.search.categories["gin"] is not old.search.categories["gin"]
+        assert brands(new.search.search("plym")) == ["Plymouth"]
+        assert old.search.search("plym") == []
+
+    def test_abv_change_reindexes_category(self, spirits):
+        """A changed ABV is a changed category."""
+        old = Catalog({}, spirits)
+        spirits["gin"][0]["abv"] = 43.1
+        new = Catalog({}, spirits, previous=old)
+        assert new.search.search("tanqueray")[0]["abv"] == 43.1
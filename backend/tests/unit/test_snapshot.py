@@ -0,0 +1,154 @@
+"""Unit tests for precompiled catalog snapshots."""
+
+import json
+import os
+
+import pytest
+from services.catalog import SNAPSHOT_FILE, Catalog, CatalogStore, get_backend
+from services.snapshot import compile_snapshot, load_snapshot, main, validate_catalog
+
+
+@pytest.fixture
+def recipes():
+    return {
+        "martini": {
+            "name": "Martini",
+            "variations": {
+                "classic": {"name": "Classic", "ingredients": {"gin": 2.4, "vermouth_dry": 0.6}},
+                "diluted": {"name": "Diluted", "ingredients": {"gin": 2, "water": 0.5}},
+            },
+        }
+    }
+
+
+@pytest.fixture
+def spirits():
+    return {
+        "gin": [{"brand": "Tanqueray", "abv": 47.3}, {"brand": "Monkey 47", "abv": 47}],
+        "vermouth_dry": [{"brand": "Dolin Dry", "abv": 17.5}],
+    }
+
+
+@pytest.fixture
+def data_dir(tmp_path, recipes, spirits):
+    for name, payload in (("recipes.json", recipes), ("spirits.json", spirits)):
+        with open(tmp_path / name, "w") as f:
+            json.dump(payload, f)
+    return str(tmp_path)
+
+
+def load(data_dir):
+    return load_snapshot(os.path.join(data_dir, SNAPSHOT_FILE), 'json', get_backend(data_dir, 'json').paths())
+
+
+class TestValidateCatalog:
+    """Tests for validate_catalog."""
+
+    def test_valid_catalog(self, recipes, spirits):
+        """Known categories and zero-ABV ingredients pass."""
+        assert validate_catalog(recipes, spirits) == []
+
+    def test_unknown_ingredient(self, recipes, spirits):
+        """An ingredient that is neither a category nor zero-ABV is reported."""
+        recipes["martini"]["variations"]["classic"]["ingredients"]["vermouth_blanc"] = 0.1
+        assert validate_catalog(recipes, spirits) == [
+            "recipes.martini.classic: unknown ingredient 'vermouth_blanc'"
+        ]
+
+    def test_bad_numbers(self, recipes, spirits):
+        """Negative parts and out-of-range ABVs are reported."""
+        recipes["martini"]["variations"]["classic"]["ingredients"]["gin"] = -1
+        spirits["gin"][1]["abv"] = "47"
+        errors = validate_catalog(recipes, spirits)
+        assert len(errors) == 2
+        assert "abv must be 0-100" in errors[0]
+        assert "must be a non-negative number" in errors[1]
+
+    def test_empty_category_and_variations(self, spirits):
+        """Empty categories and cocktails without variations are reported."""
+        spirits["empty"] = []
+        assert validate_catalog({"gimlet": {"name": "Gimlet", "variations": {}}}, spirits) == [
+            "spirits.empty: must be a non-empty list",
+            "recipes.gimlet: no variations",
+        ]
+
+
+class TestSnapshot:
+    """Tests for compile_snapshot and load_snapshot."""
+
+    def test_round_trip(self, data_dir, recipes, spirits):
+        """A loaded snapshot is the catalog it was compiled from, index included."""
+        compiled = compile_snapshot(data_dir, backend='json')
+        loaded = load(data_dir)
+
+        assert loaded.version == compiled.version == Catalog(recipes, spirits).version
+        assert loaded.cocktails["martini"].to_dict() == recipes["martini"]
+        assert loaded.spirits["gin"].abv("Monkey 47") == 47
+        assert loaded.search.search("monk")[0]["brand"] == "Monkey 47"
+        assert loaded.responses == {}
+
+    def test_invalid_catalog_is_not_compiled(self, data_dir, recipes, spirits):
+        """Validation errors fail the build and write nothing."""
+        recipes["martini"]["variations"]["classic"]["ingredients"]["lime"] = 1
+        with open(os.path.join(data_dir, "recipes.json"), "w") as f:
+            json.dump(recipes, f)
+
+        with pytest.raises(ValueError, match="unknown ingredient 'lime'"):
+            compile_snapshot(data_dir, backend='json')
+        assert not os.path.exists(os.path.join(data_dir, SNAPSHOT_FILE))
+
+    def test_missing_snapshot(self, data_dir):
+        """No snapshot file loads nothing."""
+        assert load(data_dir) is None
+
+    def test_stale_after_data_change(self, data_dir, spirits):
+        """Editing the data makes the snapshot stale."""
+        compile_snapshot(data_dir, backend='json')
+        spirits["gin"].append({"brand": "Plymouth", "abv": 41.2})
+        with open(os.path.join(data_dir, "spirits.json"), "w") as f:
+            json.dump(spirits, f)
+        assert load(data_dir) is None
+
+    def test_unreadable_snapshot(self, data_dir):
+        """A corrupt file is ignored rather than raised."""
+        with open(os.path.join(data_dir, SNAPSHOT_FILE), "wb") as f:
+            f.write(b"not a pickle")
+        assert load(data_dir) is None
+
+    def test_cli(self, data_dir, capsys):
+        """python -m services.snapshot compiles and reports the catalog."""
+        assert main([data_dir, "--backend", "json"]) == 0
+        assert "1 cocktails, 2 spirit categories" in capsys.readouterr().out
+        assert load(data_dir) is not None
+
+
+class TestStoreUsesSnapshot:
+    """Tests for CatalogStore's first load."""
+
+    def test_first_load_uses_snapshot(self, data_dir):
+        """A current snapshot is used instead of the backend."""
+        compile_snapshot(data_dir, backend='json')
+        store = CatalogStore(data_dir, backend='json')
+        assert store.peek() is None
+        assert store.current().cocktails["martini"].name == "Martini"
+        assert store.source == 'snapshot'
+
+    def test_falls_back_to_backend(self, data_dir):
+        """Without a snapshot the backend is read."""
+        store = CatalogStore(data_dir, backend='json')
+        store.current()
+        assert store.source == 'json'
+
+    def test_reloads_come_from_backend(self, data_dir, spirits):
+        """Only the first load uses the snapshot."""
+        compile_snapshot(data_dir, backend='json')
+        store = CatalogStore(data_dir, backend='json')
+        first = store.current()
+
+        spirits["gin"].append({"brand": "Plymouth", "abv": 41.2})
+        with open(os.path.join(data_dir, "spirits.json"), "w") as f:
+            json.dump(spirits, f)
+        reloaded = store.reload()
+        assert reloaded is not first
+        assert store.source == 'json'
+        assert reloaded.spirits["gin"].abv("Plymouth") == 41.2
@@ -0,0 +1,156 @@
+"""Unit tests for the SQLite catalog backend."""
+
+import os
+import sqlite3
+
+import pytest
+from services.catalog import DATA_DIR, CatalogStore, catalog_version, get_backend, load_recipes, load_spirits
+from services.sqlite_catalog import SqliteBackend, import_json, main, put_spirit
+
+
+@pytest.fixture
+def recipes():
+    return {
+        "martini": {
+            "name": "Martini",
+            "serving_size_ml": 104,
+            "presets": {"classic": {"name": "Classic", "abv": 30}},
+            "variations": {
+                "classic": {"name": "Classic", "ingredients": {"gin": 2.4, "vermouth_dry": 0.6}},
+                "wet": {"name": "Wet", "ingredients": {"gin": 2, "vermouth_dry": 1}},
+            },
+            "garnish": "Olive",
+        },
+        "gimlet": {
+            "name": "Gimlet",
+            "variations": {"classic": {"name": "Classic", "ingredients": {"gin": 2, "lime_cordial": 1}}},
+        },
+    }
+
+
+@pytest.fixture
+def spirits():
+    return {
+        "vermouth_dry": [{"brand": "Dolin Dry", "abv": 17.5}],
+        "gin": [{"brand": "Tanqueray", "abv": 47.3}, {"brand": "Beefeater", "abv": 40}],
+        "empty": [],
+    }
+
+
+@pytest.fixture
+def db_path(tmp_path, recipes, spirits):
+    path = str(tmp_path / "catalog.db")
+    import_json(recipes, spirits, path)
+    return path
+
+
+class TestImport:
+    """Tests for import_json and reading it back."""
+
+    def test_round_trips_json(self, db_path, recipes, spirits):
+        """The data read back equals the imported dicts, ordering included."""
+        backend = SqliteBackend(db_path)
+        assert backend.load_recipes() == recipes
+        assert backend.load_spirits() == spirits
+        assert list(backend.load_spirits()) == list(spirits)
+        assert list(backend.load_recipes()["martini"]["variations"]) == ["classic", "wet"]
+
+    def test_numbers_keep_their_type(self, db_path):
+        """Integers stay integers, so the catalog version matches the JSON one."""
+        gin = SqliteBackend(db_path).load_spirits()["gin"]
+        assert isinstance(gin[1]["abv"], int)
+        assert isinstance(gin[0]["abv"], float)
+
+    def test_version_matches_json_backend(self, db_path, recipes, spirits):
+        backend = SqliteBackend(db_path)
+        assert catalog_version(backend.load_recipes(), backend.load_spirits()) == catalog_version(recipes, spirits)
+
+    def test_real_data_round_trips(self, tmp_path):
+        """The shipped data files import losslessly."""
+        path = str(tmp_path / "catalog.db")
+        assert main([DATA_DIR, path]) == 0
+        backend = SqliteBackend(path)
+        assert backend.load_recipes() == load_recipes(backend='json')
+        assert backend.load_spirits() == load_spirits(backend='json')
+
+    def test_brand_lookups_use_index(self, db_path):
+        """Lookups by brand don't scan the table."""
+        plan = sqlite3.connect(db_path).execute(
+            "EXPLAIN QUERY PLAN SELECT abv FROM spirits WHERE brand = ? AND category = ?", ("a", "b")
+        ).fetchall()
+        assert "USING INDEX spirits_brand" in plan[0][-1]
+
+
+class TestConnections:
+    """Tests for the read-only connection pool."""
+
+    def test_connections_are_read_only(self, db_path):
+        with SqliteBackend(db_path).connection() as connection:
+            with pytest.raises(sqlite3.OperationalError):
+                connection.execute("DELETE FROM spirits")
+
+    def test_connections_are_reused(self, db_path):
+        backend = SqliteBackend(db_path)
+        with backend.connection() as first:
+            pass
+        with backend.connection() as second:
+            assert second is first
+
+    def test_pool_is_bounded(self, db_path):
+        """Connections beyond the pool size are closed when returned."""
+        backend = SqliteBackend(db_path, pool_size=1)
+        with backend.connection(), backend.connection():
+            pass
+        assert len(backend._pool) == 1
+
+    def test_reimport_drops_pool(self, db_path, recipes, spirits):
+        """A replaced database file is read through new connections."""
+        backend = SqliteBackend(db_path)
+        backend.load_spirits()
+        spirits["gin"].append({"brand": "Plymouth", "abv": 41.2})
+        import_json(recipes, spirits, db_path)
+        assert backend.load_spirits()["gin"][-1]["brand"] == "Plymouth"
+
+
+class TestPutSpirit:
+    """Tests for put_spirit."""
+
+    def test_updates_in_place(self, db_path):
+        put_spirit(db_path, "gin", "Beefeater", 40.5)
+        assert SqliteBackend(db_path).load_spirits()["gin"][1] == {"brand": "Beefeater", "abv": 40.5}
+
+    def test_appends_new_brands_and_categories(self, db_path):
+        put_spirit(db_path, "gin", "Plymouth", 41.2)
+        put_spirit(db_path, "rum", "Plantation", 40)
+        spirits = SqliteBackend(db_path).load_spirits()
+        assert spirits["gin"][-1] == {"brand": "Plymouth", "abv": 41.2}
+        assert list(spirits)[-1] == "rum"
+
+
+class TestBackendSelection:
+    """Tests for choosing a backend by configuration."""
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="Unknown catalog backend"):
+            get_backend(backend="csv")
+
+    def test_sqlite_database_lives_in_data_dir(self, tmp_path):
+        backend = get_backend(str(tmp_path), "sqlite")
+        assert backend.paths() == (os.path.join(str(tmp_path), "catalog.db"),)
+        assert get_backend(str(tmp_path), "sqlite") is backend
+
+    def test_store_reads_sqlite_and_reloads_on_change(self, db_path):
+        """A CatalogStore on the sqlite backend picks up in-place edits."""
+        store = CatalogStore(os.path.dirname(db_path), check_interval=0, backend="sqlite")
+        old = store.current()
+        assert old.brand_abv("gin", "Beefeater") == 40
+
+        put_spirit(db_path, "gin", "Beefeater", 43)
+        os.utime(db_path, ns=(5_000_000_000, 5_000_000_000))
+        new = store.current()
+        assert new is not old
+        assert new.brand_abv("gin", "Beefeater") == 43
+
+    def test_store_missing_database_raises(self, tmp_path):
+        with pytest.raises(OSError):
+            CatalogStore(str(tmp_path), backend="sqlite").current()
@@ -0,0 +1,100 @@
+"""Unit tests for the in-memory static asset store."""
+
+import gzip
+
+import pytest
+from services import static_assets
+from services.static_assets import Asset, StaticAssets, is_hashed
+from werkzeug.datastructures import Accept
+
+SCRIPT = b"console.log('freezer door');\n" * 50
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_bytes(b"<!doctype html><div id=root></div>")
+    (tmp_path / "assets" / "index-DzC1x2_a.js").write_bytes(SCRIPT)
+    (tmp_path / "assets" / "logo-B4x_9kLm.png").write_bytes(bytes(range(256)) * 4)
+    (tmp_path / "favicon.svg").write_bytes(b"<svg/>")
+    return tmp_path
+
+
+class TestIsHashed:
+    """Tests for is_hashed."""
+
+    def test_vite_bundles(self):
+        """Content-hashed files under assets/ are recognised."""
+        assert is_hashed("assets/index-DzC1x2_a.js")
+        assert is_hashed("assets/vendor-a1b2-c3d4.css")
+
+    def test_other_files(self):
+        """Unhashed names and files outside assets/ are not."""
+        assert not is_hashed("index.html")
+        assert not is_hashed("assets/logo.png")
+        assert not is_hashed("favicon-original.png")
+
+
+class TestAsset:
+    """Tests for Asset."""
+
+    def test_compressible_file_gets_gzip(self):
+        """Text assets get a gzip variant that decompresses to the file."""
+        asset = Asset("assets/index-DzC1x2_a.js", SCRIPT)
+        assert asset.compressed
+        assert gzip.decompress(asset.variants["gzip"]) == SCRIPT
+        assert asset.immutable
+
+    def test_binary_and_tiny_files_are_not_compressed(self):
+        """Images and files under the size floor are served as they are."""
+        assert not Asset("logo.png", bytes(1024)).compressed
+        assert not Asset("favicon.svg", b"<svg/>").compressed
+
+    def test_variant_follows_accept_encoding(self):
+        """The best accepted encoding is chosen, each with its own ETag."""
+        asset = Asset("app.js", SCRIPT)
+
+        encoding, body, etag = asset.variant(Accept([("gzip", 1), ("deflate", 1)]))
+        assert encoding == "gzip"
+        assert etag == f"{asset.etag}-gzip"
+
+        assert asset.variant(Accept([("gzip", 0)]))[0] is None
+        assert asset.variant(Accept())[1] == SCRIPT
+
+    def test_prebuilt_variants_are_used(self):
+        """Variants passed in are used instead of compressing."""
+        asset = Asset("app.js", SCRIPT, {"br": b"tiny"})
+        assert asset.variants == {"identity": SCRIPT, "br": b"tiny"}
+        assert asset.variant(Accept([("br", 1), ("gzip", 1)]))[0] == "br"
+
+    def test_brotli_when_installed(self, monkeypatch):
+        """brotli variants are built when the package is available."""
+        brotli = pytest.importorskip("brotli")
+        monkeypatch.setattr(static_assets, "brotli", brotli)
+        assert brotli.decompress(Asset("app.js", SCRIPT).variants["br"]) == SCRIPT
+
+    def test_etag_is_stable(self):
+        """Identical content gets the same ETag in every process."""
+        assert Asset("a.js", SCRIPT).etag == Asset("a.js", SCRIPT).etag
+        assert Asset("a.js", SCRIPT).variants["gzip"] == Asset("a.js", SCRIPT).variants["gzip"]
+
+
+class TestStaticAssets:
+    """Tests for StaticAssets."""
+
+    def test_scans_every_file(self, static_dir):
+        """Files are keyed by their /-separated path."""
+        assets = StaticAssets(str(static_dir))
+        assert sorted(assets.files) == [
+            "assets/index-DzC1x2_a.js", "assets/logo-B4x_9kLm.png", "favicon.svg", "index.html",
+        ]
+        assert assets.index.mimetype == "text/html"
+
+    def test_precompressed_files_on_disk(self, static_dir):
+        """app.js.gz next to app.js becomes its gzip variant, not a file."""
+        prebuilt = gzip.compress(SCRIPT)
+        (static_dir / "assets" / "index-DzC1x2_a.js.gz").write_bytes(prebuilt)
+
+        assets = StaticAssets(str(static_dir))
+        assert "assets/index-DzC1x2_a.js.gz" not in assets.files
+        assert assets.get("assets/index-DzC1x2_a.js").variants["gzip"] == prebuilt
@@ -0,0 +1,85 @@
+"""Unit tests for sweep.py functions."""
+
+import pytest
+from services.calculator import calculate_recipe, ml_to_oz
+from services.sweep import MAX_SWEEP_ROWS, expand_range, sweep_rows
+
+
+class TestExpandRange:
+    """Tests for expand_range."""
+
+    def test_number_is_single_value(self):
+        """A bare number is a one-value axis."""
+        assert expand_range(750, "v") == [750]
+
+    def test_list_is_used_as_is(self):
+        """A list of numbers is used unchanged."""
+        assert expand_range([750, 1000], "v") == [750, 1000]
+
+    def test_range_includes_stop(self):
+        """Ranges are inclusive of stop."""
+        assert expand_range({"start": 20, "stop": 22, "step": 0.5}, "v") == [20, 20.5, 21, 21.5, 22]
+
+    def test_range_does_not_drift(self):
+        """Fractional steps produce clean values."""
+        values = expand_range({"start": 20, "stop": 40, "step": 0.1}, "v")
+        assert len(values) == 201
+        assert values[-1] == 40
+        assert 23.3 in values
+
+    @pytest.mark.parametrize("spec", [
+        "20",
+        [],
+        [20, "x"],
+        {"start": 20, "stop": 40},
+        {"start": 20, "stop": 40, "step": 0},
+        {"start": 40, "stop": 20, "step": 1},
+        {"start": 1, "stop": MAX_SWEEP_ROWS, "step": 0.5},
+        True,
+        0,
+        [-1, 0, 24],
+        {"start": -5, "stop": 5, "step": 1},
+    ])
+    def test_rejects_malformed_specs(self, spec):
+        """Malformed, oversized or non-positive specs raise ValueError."""
+        with pytest.raises(ValueError):
+            expand_range(spec, "v")
+
+
+class TestSweepRows:
+    """Tests for sweep_rows."""
+
+    def test_rows_match_scalar_calculation(self, martini_ingredients, sample_spirits):
+        """Each grid point matches calculate_recipe and ml_to_oz."""
+        volumes = [375, 750]
+        abvs = [x / 2 for x in range(30, 100)]
+        rows = list(sweep_rows(martini_ingredients, sample_spirits, volumes, abvs))
+
+        assert len(rows) == len(volumes) * len(abvs)
+        for row in rows:
+            expected = calculate_recipe(
+                martini_ingredients, sample_spirits, row["target_volume_ml"], row["target_abv"]
+            )
+            for field, value in expected.items():
+                assert row[field] == value
+            assert row["water_oz"] == ml_to_oz(expected["water_ml"])
+            assert row["ingredients_oz"] == {k: ml_to_oz(v) for k, v in expected["ingredients"].items()}
+
+    def test_rows_are_ordered_by_volume_then_abv(self, martini_ingredients, sample_spirits):
+        """Grid order is volume-major."""
+        rows = sweep_rows(martini_ingredients, sample_spirits, [500, 1000], [20, 30])
+        assert [(r["target_volume_ml"], r["target_abv"]) for r in rows] == [
+            (500, 20), (500, 30), (1000, 20), (1000, 30)
+        ]
+
+    def test_spans_multiple_chunks(self, martini_ingredients, sample_spirits, monkeypatch):
+        """Grids larger than one chunk are complete and in order."""
+        monkeypatch.setattr("services.sweep.CHUNK_ROWS", 7)
+        abvs = list(range(10, 30))
+        rows = list(sweep_rows(martini_ingredients, sample_spirits, [500, 750], abvs))
+        assert [r["target_abv"] for r in rows] == abvs * 2
+
+    def test_is_lazy(self, martini_ingredients, sample_spirits):
+        """Rows are produced on demand rather than all at once."""
+        rows = sweep_rows(martini_ingredients, sample_spirits, list(range(1, 1000)), list(range(1, 100)))
+        assert next(rows)["target_volume_ml"] == 1
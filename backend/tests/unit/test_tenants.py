@@ -0,0 +1,134 @@
+"""Unit tests for tenant catalog overlays and their cache."""
+
+import json
+import os
+import shutil
+
+import pytest
+from services.catalog import DATA_DIR, CatalogStore
+from services.tenants import TenantCatalogs, deep_size, overlay_changes
+
+OVERLAY = {
+    "spirits": {"gin": [{"brand": "Harbour House Gin", "abv": 44}]},
+    "recipes": {
+        "martini": {
+            "variations": {"house": {"name": "House (3:1)", "ingredients": {"gin": 2.25, "vermouth_dry": 0.75}}},
+            "presets": {"house": {"name": "House", "abv": 27}},
+        },
+    },
+}
+
+
+def write_overlay(tenants_dir, tenant, overlay, mtime_ns=None):
+    path = os.path.join(tenants_dir, f"{tenant}.json")
+    with open(path, "w") as f:
+        json.dump(overlay, f)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def store(tmp_path):
+    shutil.copytree(DATA_DIR, tmp_path / "data")
+    return CatalogStore(str(tmp_path / "data"), check_interval=0)
+
+
+@pytest.fixture
+def tenants_dir(store):
+    path = os.path.join(store.data_dir, "tenants")
+    os.makedirs(path)
+    write_overlay(path, "harbour", OVERLAY)
+    return path
+
+
+class TestOverlayChanges:
+    """Tests for overlay_changes."""
+
+    def test_spirits_come_first(self):
+        """Brands are put before the variations that may use them."""
+        changes = overlay_changes(OVERLAY)
+        assert [change["op"] for change in changes] == ["put_spirit", "put_variation", "put_preset"]
+        assert changes[0] == {"op": "put_spirit", "category": "gin", "brand": "Harbour House Gin", "abv": 44}
+
+    @pytest.mark.parametrize("overlay", [[], {"spirits": []}, {"spirits": {"gin": {}}}, {"recipes": {"martini": 1}}])
+    def test_rejects_malformed_overlays(self, overlay):
+        """Overlays not shaped like the data files raise ValueError."""
+        with pytest.raises(ValueError):
+            overlay_changes(overlay)
+
+
+class TestTenantCatalogs:
+    """Tests for TenantCatalogs."""
+
+    def test_overlay_shares_the_base(self, store, tenants_dir):
+        """A tenant catalog adds its overlay and shares everything else with the base."""
+        base = store.current()
+        catalog = TenantCatalogs(store).get("harbour")
+
+        assert catalog.version != base.version
+        assert catalog.spirits["gin"].brands[-1] == "Harbour House Gin"
+        assert "house" in catalog.cocktails["martini"].variations
+        assert "house" not in base.cocktails["martini"].variations
+        assert catalog.cocktails["negroni"] is base.cocktails["negroni"]
+        assert catalog.spirits["vodka"] is base.spirits["vodka"]
+        assert catalog.search.categories["vodka"] is base.search.categories["vodka"]
+
+    @pytest.mark.parametrize("tenant", ["nobody", "../data", "", None, "a" * 65])
+    def test_unknown_tenants(self, store, tenants_dir, tenant):
+        """Missing and invalid tenant ids resolve to None."""
+        assert TenantCatalogs(store).get(tenant) is None
+
+    def test_hits_and_evictions(self, store, tenants_dir):
+        """Tenants are cached up to maxsize, least recently used first out."""
+        write_overlay(tenants_dir, "quay", {"spirits": {"vodka": [{"brand": "Quay Vodka", "abv": 40}]}})
+        tenants = TenantCatalogs(store, maxsize=1)
+        store.check_interval = 60
+
+        harbour = tenants.get("harbour")
+        assert tenants.get("harbour") is harbour
+        tenants.get("quay")
+        assert tenants.get("harbour") is not harbour
+
+        stats = tenants.stats()
+        assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 3, 2)
+        assert stats["hit_rate"] == 0.25
+
+    def test_rebuilt_when_overlay_changes(self, store, tenants_dir):
+        """A changed overlay file is picked up on the next check."""
+        tenants = TenantCatalogs(store)
+        old = tenants.get("harbour")
+        assert tenants.get("harbour") is old
+
+        write_overlay(tenants_dir, "harbour", {"spirits": {"gin": [{"brand": "Harbour House Gin", "abv": 46}]}},
+                      mtime_ns=2_000_000_000)
+        new = tenants.get("harbour")
+        assert new.brand_abv("gin", "Harbour House Gin") == 46
+        assert "house" not in new.cocktails["martini"].variations
+
+    def test_broken_overlay_keeps_last_good(self, store, tenants_dir):
+        """A half-written overlay doesn't take the tenant down."""
+        tenants = TenantCatalogs(store)
+        good = tenants.get("harbour")
+        with open(os.path.join(tenants_dir, "harbour.json"), "w") as f:
+            f.write('{"spirits": ')
+        os.utime(os.path.join(tenants_dir, "harbour.json"), ns=(2_000_000_000, 2_000_000_000))
+        assert tenants.get("harbour") is good
+
+    def test_rebuilt_over_a_new_base(self, store, tenants_dir):
+        """Edits to the shared catalog reach every tenant."""
+        tenants = TenantCatalogs(store)
+        tenants.get("harbour")
+        store.edit({"op": "put_spirit", "category": "vodka", "brand": "New Vodka", "abv": 40})
+        assert "New Vodka" in tenants.get("harbour").spirits["vodka"]
+
+    def test_memory_stats(self, store, tenants_dir):
+        """Overlay bytes count what the tenant doesn't share with the base."""
+        tenants = TenantCatalogs(store)
+        catalog = tenants.get("harbour")
+        stats = tenants.stats()
+        base_size, _ = deep_size(store.current())
+        assert 0 < stats["overlay_bytes"] < base_size / 2
+        assert stats["response_bytes"] == 0
+
+        catalog.responses[("spirits",)] = (b"[]", "etag")
+        assert tenants.stats()["response_bytes"] == 2
@@ -0,0 +1,30 @@
+"""Unit tests for request phase timers."""
+
+from services.timing import NO_TIMER, PhaseTimer, report_timing, request_timer
+
+
+class TestPhaseTimer:
+    """Tests for PhaseTimer."""
+
+    def test_laps_add_up_to_the_total(self):
+        """Each lap is the time since the previous one."""
+        timer = PhaseTimer()
+        timer.lap('parse')
+        timer.lap('calculate')
+        assert [name for name, _ in timer.phases] == ['parse', 'calculate']
+        assert abs(sum(seconds for _, seconds in timer.phases) - timer.total()) < 1e-9
+
+    def test_header_format(self):
+        """Durations are milliseconds, with the total last."""
+        timer = PhaseTimer()
+        timer.started, timer.last, timer.phases = 0.0, 0.0035, [('parse', 0.001), ('calculate', 0.0025)]
+        assert timer.header() == 'parse;dur=1.000, calculate;dur=2.500, total;dur=3.500'
+        assert timer.fields() == {'parse': 1.0, 'calculate': 2.5, 'total': 3.5}
+
+
+def test_disabled_timer_does_nothing():
+    """With the header and logging off, no timer is kept."""
+    timer = request_timer({'SERVER_TIMING': False, 'SERVER_TIMING_LOG': False})
+    assert timer is NO_TIMER
+    timer.lap('parse')
+    assert report_timing(timer, {}, 'POST', '/api/calculate', 200) is None
@@ -0,0 +1,145 @@
+"""Unit tests for the vectorized calculator, checked against calculator.py."""
+
+import itertools
+import json
+import os
+import random
+
+import numpy as np
+import pytest
+from services.calculator import calculate_recipe, ml_to_oz
+from services.vectorized import (
+    calculate_initial_abvs,
+    calculate_recipes,
+    ml_to_oz as ml_to_oz_array,
+    pack_recipes,
+    recipe_dicts,
+    round_like_python,
+)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
+
+
+def load(name):
+    with open(os.path.join(DATA_DIR, name)) as f:
+        return json.load(f)
+
+
+def real_catalog_cases():
+    """Every variation x every brand combination x a grid of targets."""
+    recipes = load('recipes.json')
+    spirits = load('spirits.json')
+    volumes = [90, 104, 375, 500, 700, 750, 1000, 1750]
+    abvs = [x / 2 for x in range(20, 100)]  # 10% to 49.5% in 0.5 steps
+
+    cases = []
+    for cocktail in recipes.values():
+        for variation in cocktail["variations"].values():
+            ingredients = variation["ingredients"]
+            choices = [[s["abv"] for s in spirits.get(name, [])] or [0] for name in ingredients]
+            for combo in itertools.product(*choices):
+                spirit_abvs = dict(zip(ingredients, combo))
+                for volume, abv in itertools.product(volumes, abvs):
+                    cases.append((ingredients, spirit_abvs, volume, abv))
+    return cases
+
+
+def random_cases(count, seed=1234):
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        width = rng.randint(1, 5)
+        ingredients = {f"i{k}": round(rng.uniform(0, 3), rng.choice([0, 1, 2])) for k in range(width)}
+        spirit_abvs = {name: round(rng.uniform(0, 60), 1) for name in ingredients}
+        cases.append((ingredients, spirit_abvs, rng.choice([rng.uniform(1, 3000), 750]), round(rng.uniform(5, 55), 1)))
+    return cases
+
+
+def assert_matches_scalar(cases):
+    names, parts, abvs = pack_recipes([c[0] for c in cases], [c[1] for c in cases])
+    result = calculate_recipes(parts, abvs, [c[2] for c in cases], [c[3] for c in cases])
+    for case, got in zip(cases, recipe_dicts(result, names)):
+        expected = calculate_recipe(*case)
+        assert got == expected, case
+
+
+class TestRoundLikePython:
+    """Tests for round_like_python."""
+
+    def test_matches_builtin_round_on_ties(self):
+        """Decimal ties round the same way as round()."""
+        values = [x / 100 for x in range(-1000, 1000)] + [2.675, 0.285, 1.005, 0.125, 0.375]
+        for ndigits in (1, 2):
+            got = round_like_python(values, ndigits).tolist()
+            assert got == [round(v, ndigits) for v in values]
+
+    def test_matches_builtin_round_on_random_values(self):
+        """Arbitrary values round the same way as round()."""
+        rng = np.random.default_rng(7)
+        values = rng.uniform(-2000, 2000, 20000)
+        for ndigits in (1, 2):
+            got = round_like_python(values, ndigits).tolist()
+            assert got == [round(v, ndigits) for v in values.tolist()]
+
+
+class TestCalculateInitialABVs:
+    """Tests for calculate_initial_abvs."""
+
+    def test_weighted_average(self):
+        """Rows are weighted averages of their ABVs."""
+        initial, total = calculate_initial_abvs([[2.4, 0.6], [1, 1]], [[47.3, 17.5], [40, 0]])
+        assert initial.tolist() == [(2.4 * 47.3 + 0.6 * 17.5) / 3.0, 20.0]
+        assert total.tolist() == [3.0, 2.0]
+
+    def test_zero_parts_returns_zero(self):
+        """Rows without any parts are 0% rather than NaN."""
+        initial, _ = calculate_initial_abvs([[0, 0]], [[40, 20]])
+        assert initial.tolist() == [0]
+
+
+class TestCalculateRecipes:
+    """Differential tests against calculate_recipe."""
+
+    def test_matches_scalar_for_real_catalog(self):
+        """Every recipe, brand, volume and ABV combination matches exactly."""
+        assert_matches_scalar(real_catalog_cases())
+
+    def test_matches_scalar_for_random_recipes(self):
+        """Random recipes and targets match exactly."""
+        assert_matches_scalar(random_cases(5000))
+
+    def test_no_dilution_branch(self, sample_spirits):
+        """Target above initial ABV scales without water, unrounded."""
+        cases = [({"vermouth_dry": 1.0, "gin": 0.1}, sample_spirits, 333, 30)]
+        names, parts, abvs = pack_recipes([cases[0][0]], [cases[0][1]])
+        result = calculate_recipes(parts, abvs, 333, 30)
+
+        assert result["diluted"].tolist() == [False]
+        assert recipe_dicts(result, names)[0] == calculate_recipe(*cases[0])
+        assert recipe_dicts(result, names)[0]["water_ml"] == 0
+
+    def test_broadcasts_one_recipe_over_many_targets(self, martini_ingredients, sample_spirits):
+        """A single recipe row broadcasts over target arrays."""
+        names = list(martini_ingredients)
+        parts = list(martini_ingredients.values())
+        abvs = [sample_spirits[name] for name in names]
+        volumes = [375, 750, 1000]
+        result = calculate_recipes(parts, abvs, volumes, 24)
+
+        for volume, got in zip(volumes, recipe_dicts(result, names)):
+            assert got == calculate_recipe(martini_ingredients, sample_spirits, volume, 24)
+
+    def test_spirit_volume_plus_water_is_total(self, martini_ingredients, sample_spirits):
+        """Unrounded spirit volume plus water makes up the batch."""
+        result = calculate_recipes(list(martini_ingredients.values()), [47.3, 17.5], 750, 24)
+        total = result["spirit_volume_ml"] + result["water_ml"]
+        assert total.tolist() == pytest.approx([750], abs=0.05)
+
+
+class TestMlToOz:
+    """Tests for the vectorized ml_to_oz."""
+
+    def test_matches_scalar_conversion(self):
+        """Array conversion matches calculator.ml_to_oz."""
+        values = [x / 10 for x in range(0, 20000, 7)]
+        assert ml_to_oz_array(values).tolist() == [ml_to_oz(v) for v in values]